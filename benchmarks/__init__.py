@@ -0,0 +1,7 @@
+"""
+Benchmarks for edx_recommendations.
+
+Benchmarks run outside of edx-platform, so the platform modules the plugin imports are replaced
+by the stand-ins in benchmarks.platform_stubs whenever they cannot be imported. The endpoint
+benchmark (benchmarks.endpoints) additionally answers upstream calls from benchmarks.fakes.
+"""
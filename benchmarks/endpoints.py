@@ -0,0 +1,306 @@
+"""
+Benchmark of every endpoint in edx_recommendations.api.urls against the fakes in benchmarks.fakes.
+
+For each endpoint this reports latency percentiles, throughput, upstream calls per request and
+the peak memory allocated per request:
+
+    python -m benchmarks.endpoints --requests 200 --catalog-latency 20 --amplitude-latency 50
+
+Results can be saved as a baseline and later runs compared against it; the comparison exits
+with status 1 when an endpoint's p50 or p99 latency, upstream calls or allocations regress by
+more than --max-regression:
+
+    python -m benchmarks.endpoints --save-baseline baseline.json
+    python -m benchmarks.endpoints --baseline baseline.json
+
+--cold clears every cache before each request, to measure the uncached paths.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+from benchmarks.platform_stubs import install_api_stubs
+
+COURSE_ID = "course-v1:edX+Course0+2024"
+# Users per bulk request; every other one comes with a country code.
+BULK_USERS = 20
+# (url name, url kwargs, POST payload or None for a GET).
+ENDPOINTS = [
+    ("course_about_page_amplitude", {"course_id": COURSE_ID}, None),
+    ("course_about_page_cross_product", {"course_id": COURSE_ID}, None),
+    ("learner_dashboard_amplitude", {}, None),
+    ("learner_dashboard_amplitude_v2", {}, None),
+    ("learner_dashboard_amplitude_bulk", {}, "bulk"),
+    ("learner_dashboard_cross_product", {"course_id": COURSE_ID}, None),
+]
+FLAGS = [
+    "edx_recommendations.enable_course_about_page_recommendations",
+    "edx_recommendations.enable_dashboard_recommendations",
+    "edx_recommendations.enable_fallback_recommendations",
+]
+# Metrics where a higher value is a regression.
+COMPARED_METRICS = ("p50_ms", "p99_ms", "upstream_calls", "peak_alloc_kib")
+
+
+def _percentile(values, percentile):
+    values = sorted(values)
+    return values[min(int(len(values) * percentile / 100), len(values) - 1)]
+
+
+def _setup_database(user_count):
+    """
+    Creates the database tables, the waffle flags and the benchmark users, the first of them staff
+    so that it may call the bulk endpoint.
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from waffle.models import Flag
+
+    call_command("migrate", verbosity=0)
+    for flag in FLAGS:
+        Flag.objects.update_or_create(name=flag, defaults={"everyone": True})
+    user_model = get_user_model()
+    return [
+        user_model.objects.get_or_create(
+            username=f"benchmark{index}", defaults={"email": f"b{index}@example.com", "is_staff": index == 0}
+        )[0]
+        for index in range(user_count)
+    ]
+
+
+def _bulk_payload(users):
+    """
+    Returns the bulk endpoint request for the first BULK_USERS benchmark users.
+    """
+    user_ids = [user.id for user in users[:BULK_USERS]]
+    return {"user_ids": user_ids, "countries": {str(user_id): "US" for user_id in user_ids[::2]}}
+
+
+def _clear_caches():
+    """
+    Empties the shared cache and every process-local cache of edx_recommendations.
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.core.cache import cache
+
+    from edx_recommendations.api import catalog, fragments, geoip
+
+    cache.clear()
+    catalog.get_local_course_cache().clear()
+    fragments.get_fragment_cache().clear()
+    geoip.get_geoip_cache().clear()
+
+
+class EndpointRunner:
+    """
+    Calls the view behind an endpoint the way the LMS middleware would.
+    """
+
+    def __init__(self, name, kwargs, payload, users, cold):
+        # pylint: disable=import-outside-toplevel
+        from django.urls import resolve, reverse
+        from rest_framework.test import APIRequestFactory
+
+        self.name = name
+        self.path = reverse(f"edx_recommendations:{name}", kwargs=kwargs)
+        self.match = resolve(self.path)
+        self.factory = APIRequestFactory()
+        self.payload = _bulk_payload(users) if payload == "bulk" else payload
+        # Bulk requests are made by the staff user for the same fixed set of users every time.
+        self.users = users[:1] if self.payload else users
+        self.cold = cold
+
+    def __call__(self, index):
+        # pylint: disable=import-outside-toplevel
+        import crum
+        from edx_django_utils.cache import RequestCache
+        from rest_framework.test import force_authenticate
+
+        if self.cold:
+            _clear_caches()
+        user = self.users[index % len(self.users)]
+        remote_addr = f"10.0.{index % 256 // 64}.{index % 256}"
+        if self.payload:
+            request = self.factory.post(self.path, self.payload, format="json", REMOTE_ADDR=remote_addr)
+        else:
+            request = self.factory.get(self.path, REMOTE_ADDR=remote_addr)
+        force_authenticate(request, user=user)
+        request.user = user
+        RequestCache.clear_all_namespaces()
+        crum.set_current_request(request)
+        try:
+            response = self.match.func(request, *self.match.args, **self.match.kwargs)
+            if hasattr(response, "render"):
+                response.render()
+            if response.streaming:
+                # Streamed records are only computed as they are read.
+                b"".join(response.streaming_content)
+        finally:
+            crum.set_current_request(None)
+        if response.status_code != 200:
+            raise RuntimeError(f"{self.name} returned {response.status_code}: {response.content[:200]}")
+
+
+def benchmark_endpoint(runner, upstreams, requests, warmup, concurrency, alloc_requests):
+    """
+    Returns the metrics of one endpoint.
+    """
+    for index in range(warmup):
+        runner(index)
+
+    calls_before = upstreams.calls.snapshot()
+    latencies = []
+
+    def timed(index):
+        started = time.perf_counter()
+        runner(index)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(timed, range(warmup, warmup + requests)))
+    else:
+        for index in range(warmup, warmup + requests):
+            timed(index)
+    elapsed = time.perf_counter() - started
+    calls_after = upstreams.calls.snapshot()
+
+    peak_allocations = []
+    tracemalloc.start()
+    for index in range(alloc_requests):
+        tracemalloc.reset_peak()
+        allocated_before = tracemalloc.get_traced_memory()[0]
+        runner(warmup + index)
+        peak_allocations.append(tracemalloc.get_traced_memory()[1] - allocated_before)
+    tracemalloc.stop()
+
+    calls = {
+        upstream: round((calls_after[upstream] - calls_before[upstream]) / requests, 2)
+        for upstream in calls_after
+    }
+    return {
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p90_ms": round(_percentile(latencies, 90), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "calls_per_request": calls,
+        # Segment events are sent by a background thread, so their count is reported but not compared.
+        "upstream_calls": round(sum(count for upstream, count in calls.items() if upstream != "segment"), 2),
+        "peak_alloc_kib": round(statistics.median(peak_allocations) / 1024, 1) if peak_allocations else None,
+    }
+
+
+def _print_results(results):
+    print(
+        f"{'endpoint':<34} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'req/s':>8} {'alloc KiB':>10}  calls/request"
+    )
+    for name, metrics in results.items():
+        calls = " ".join(f"{upstream}={count:g}" for upstream, count in metrics["calls_per_request"].items() if count)
+        print(
+            f"{name:<34} {metrics['p50_ms']:>8.2f} {metrics['p90_ms']:>8.2f} {metrics['p99_ms']:>8.2f} "
+            f"{metrics['throughput_rps']:>8.1f} {metrics['peak_alloc_kib'] or 0:>10.1f}  {calls}"
+        )
+
+
+def compare_to_baseline(results, baseline, max_regression):
+    """
+    Prints the change of every compared metric and returns the regressions beyond max_regression.
+    """
+    regressions = []
+    print(f"\n{'endpoint':<34} {'metric':<16} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, metrics in results.items():
+        baseline_metrics = baseline["results"].get(name)
+        if not baseline_metrics:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = baseline_metrics.get(metric), metrics.get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before if before else 0.0
+            print(f"{name:<34} {metric:<16} {before:>10.2f} {after:>10.2f} {change:>+8.1%}")
+            if change > max_regression:
+                regressions.append((name, metric, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", nargs="+", default=[name for name, _, _ in ENDPOINTS])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--alloc-requests", type=int, default=20, help="Requests traced for allocations")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--cold", action="store_true", help="Clear all caches before every request")
+    parser.add_argument("--catalog-size", type=int, default=200)
+    parser.add_argument("--recommendations", type=int, default=20, help="Course keys returned by Amplitude")
+    parser.add_argument("--enrollments", type=int, default=10, help="Enrollments per user")
+    for upstream in ("amplitude", "catalog", "enrollments", "programs", "geoip", "segment"):
+        parser.add_argument(f"--{upstream}-latency", type=float, default=0, help="Milliseconds per call")
+    parser.add_argument("--save-baseline", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare the results with this JSON file")
+    parser.add_argument("--max-regression", type=float, default=0.1)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    install_api_stubs()
+    django.setup()
+
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+
+    from benchmarks.fakes import UPSTREAMS, FakeUpstreams
+
+    upstreams = FakeUpstreams(
+        latencies={upstream: getattr(args, f"{upstream}_latency") / 1000 for upstream in UPSTREAMS},
+        catalog_size=args.catalog_size,
+        recommendations=args.recommendations,
+        enrollments=args.enrollments,
+    )
+    upstreams.install(settings)
+    users = _setup_database(args.users)
+
+    results = {}
+    try:
+        for name, kwargs, payload in ENDPOINTS:
+            if name not in args.endpoints:
+                continue
+            _clear_caches()
+            runner = EndpointRunner(name, kwargs, payload, users, args.cold)
+            results[name] = benchmark_endpoint(
+                runner, upstreams, args.requests, args.warmup, args.concurrency, args.alloc_requests
+            )
+    finally:
+        if os.path.exists(settings.DATABASES["default"]["NAME"]):
+            os.remove(settings.DATABASES["default"]["NAME"])
+
+    _print_results(results)
+    config = {key: value for key, value in vars(args).items() if key not in ("save_baseline", "baseline")}
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump({"config": config, "results": results}, baseline_file, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline["config"] != config:
+            print("\nWarning: the baseline was recorded with different options", file=sys.stderr)
+        regressions = compare_to_baseline(results, baseline, args.max_regression)
+        if regressions:
+            for name, metric, change in regressions:
+                print(f"Regression: {name} {metric} {change:+.1%}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
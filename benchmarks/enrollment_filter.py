@@ -0,0 +1,114 @@
+"""
+Micro-benchmark for the enrollment and country restriction checks of filter_recommended_courses.
+
+Compares the previous list based checks with the set based ones, run over candidates carrying
+the restriction compiled by the catalog cache, as the number of enrollments grows:
+
+    DJANGO_SETTINGS_MODULE=test_settings python -m benchmarks.enrollment_filter
+"""
+import argparse
+import timeit
+
+import django
+
+from benchmarks.platform_stubs import install_platform_stubs
+
+COUNTRIES = [f"C{index:03d}" for index in range(250)]
+
+
+def _list_is_enrolled_in_course(course_runs, enrolled_course_keys):
+    return any(course_run.get("key", None) in enrolled_course_keys for course_run in course_runs)
+
+
+def _list_has_country_restrictions(product, user_country):
+    if not user_country:
+        return False
+
+    allow_list, block_list = [], []
+    location_restriction = product.get("location_restriction", None)
+    if location_restriction:
+        restriction_type = location_restriction.get("restriction_type")
+        countries = location_restriction.get("countries")
+        if restriction_type == "allowlist":
+            allow_list = countries
+        elif restriction_type == "blocklist":
+            block_list = countries
+
+    return user_country in block_list or (bool(allow_list) and user_country not in allow_list)
+
+
+def _candidates(candidate_count, runs_per_course):
+    """
+    Returns catalog-shaped candidates, half of them with a large allow list.
+    """
+    return [
+        {
+            "key": f"edX+Candidate{course}",
+            "course_runs": [
+                {"key": f"course-v1:edX+Candidate{course}+{run}"} for run in range(runs_per_course)
+            ],
+            "location_restriction": (
+                {"restriction_type": "allowlist", "countries": COUNTRIES} if course % 2 else None
+            ),
+        }
+        for course in range(candidate_count)
+    ]
+
+
+def run(enrollment_counts, candidate_count, runs_per_course, repeat):
+    """
+    Prints the time per filter pass for the list and set based implementations.
+    """
+    # pylint: disable=import-outside-toplevel
+    from edx_recommendations.api.restrictions import COUNTRY_RESTRICTION_FIELD, compile_country_restriction
+    from edx_recommendations.api.utils import _has_country_restrictions, _is_enrolled_in_course
+
+    candidates = _candidates(candidate_count, runs_per_course)
+    # Candidates as returned by the catalog cache, with their restriction compiled on the way in.
+    cached_candidates = [
+        dict(course, **{COUNTRY_RESTRICTION_FIELD: compile_country_restriction(course["location_restriction"])})
+        for course in candidates
+    ]
+    user_country = COUNTRIES[-1]
+
+    print(f"{'enrollments':>12} {'list (us)':>12} {'set (us)':>12} {'speedup':>9}")
+    for enrollment_count in enrollment_counts:
+        enrolled_list = [f"course-v1:edX+Enrolled{index}+run" for index in range(enrollment_count)]
+        enrolled_set = set(enrolled_list)
+
+        # pylint: disable=cell-var-from-loop
+        def list_pass():
+            return [
+                course for course in candidates
+                if not _list_is_enrolled_in_course(course["course_runs"], enrolled_list)
+                and not _list_has_country_restrictions(course, user_country)
+            ]
+
+        def set_pass():
+            return [
+                course for course in cached_candidates
+                if not _is_enrolled_in_course(course["course_runs"], enrolled_set)
+                and not _has_country_restrictions(course, user_country)
+            ]
+
+        assert [course["key"] for course in list_pass()] == [course["key"] for course in set_pass()]
+        list_time = min(timeit.repeat(list_pass, number=repeat, repeat=5)) / repeat * 1e6
+        set_time = min(timeit.repeat(set_pass, number=repeat, repeat=5)) / repeat * 1e6
+        print(f"{enrollment_count:>12} {list_time:>12.1f} {set_time:>12.1f} {list_time / set_time:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--enrollments", type=int, nargs="+", default=[10, 100, 500, 1000, 5000])
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--runs-per-course", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    install_platform_stubs()
+    django.setup()
+    run(args.enrollments, args.candidates, args.runs_per_course, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Deterministic in-process stand-ins for the upstream services of the recommendation views.
+
+Each fake sleeps for a configurable latency and counts its calls. Amplitude is faked at the
+transport of the shared Amplitude session, so requests still go through the Amplitude cache and
+circuit breaker; the catalog, enrollment, program and geo-IP fakes replace the platform functions
+edx_recommendations imports.
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from types import SimpleNamespace
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+COUNTRIES = ["US", "IN", "GB", "PK", "CU", "BR", "NG", "DE"]
+UPSTREAMS = ("amplitude", "catalog", "enrollments", "programs", "geoip", "segment")
+
+
+class CallCounter:
+    """
+    Thread-safe call counts per upstream.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def increment(self, upstream):
+        with self._lock:
+            self._counts[upstream] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {upstream: self._counts[upstream] for upstream in UPSTREAMS}
+
+
+class FakeAmplitudeAdapter(HTTPAdapter):
+    """
+    Transport adapter answering Amplitude recommendation requests from FakeUpstreams.
+    """
+
+    def __init__(self, upstreams):
+        super().__init__()
+        self.upstreams = upstreams
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        self.upstreams.wait("amplitude")
+        params = dict(param.split("=", 1) for param in request.url.split("?", 1)[1].split("&"))
+        response = Response()
+        response.status_code = 200
+        response.request = request
+        response.url = request.url
+        response._content = json.dumps(  # pylint: disable=protected-access
+            {"userData": {"recommendations": [self.upstreams.amplitude_recommendations(int(params["user_id"]))]}}
+        ).encode("utf-8")
+        return response
+
+
+class FakeUpstreams:
+    """
+    A generated catalog and the fake upstream services answering from it.
+
+    Args:
+        latencies: {upstream: seconds} added to every call of that upstream
+        catalog_size: number of courses in the catalog
+        recommendations: number of course keys Amplitude returns per user
+        enrollments: number of catalog courses each user is enrolled in
+        restricted_every: every n-th course gets a location restriction
+        control_every: every n-th user is in the control group
+    """
+
+    def __init__(
+        self,
+        latencies=None,
+        catalog_size=200,
+        recommendations=20,
+        enrollments=10,
+        restricted_every=4,
+        control_every=5,
+    ):
+        self.latencies = latencies or {}
+        self.recommendations = recommendations
+        self.enrollments = enrollments
+        self.control_every = control_every
+        self.calls = CallCounter()
+        self.course_keys = [f"edX+Course{index}" for index in range(catalog_size)]
+        self.courses = {
+            course_key: self._course(index, course_key, restricted_every)
+            for index, course_key in enumerate(self.course_keys)
+        }
+
+    def _course(self, index, course_key, restricted_every):
+        location_restriction = None
+        if restricted_every and index % restricted_every == 0:
+            location_restriction = {
+                "restriction_type": "allowlist" if index % 2 else "blocklist",
+                "countries": COUNTRIES[index % 3:index % 3 + 3],
+            }
+        run_key = f"course-v1:{course_key}+2024"
+        return {
+            "key": course_key,
+            "uuid": str(uuid.uuid5(uuid.NAMESPACE_URL, course_key)),
+            "title": f"Course {index}",
+            "owners": [{"key": "edX", "name": "edX", "logo_image_url": "https://example.com/edx.png"}],
+            "image": {"src": f"https://example.com/course{index}.png"},
+            "url_slug": f"course-{index}",
+            "course_type": "verified-audit",
+            "course_runs": [
+                {
+                    "key": run_key,
+                    "uuid": str(uuid.uuid5(uuid.NAMESPACE_URL, run_key)),
+                    "marketing_url": f"https://example.com/course{index}",
+                    "availability": "Current",
+                    "is_enrollable": True,
+                    "is_marketable": True,
+                    "status": "published",
+                }
+            ],
+            "advertised_course_run_uuid": str(uuid.uuid5(uuid.NAMESPACE_URL, run_key)),
+            "location_restriction": location_restriction,
+            "level_type": "Introductory",
+            "marketing_url": f"https://example.com/course{index}",
+        }
+
+    def wait(self, upstream):
+        self.calls.increment(upstream)
+        latency = self.latencies.get(upstream, 0)
+        if latency:
+            time.sleep(latency)
+
+    def amplitude_recommendations(self, user_id):
+        return {
+            "is_control": bool(self.control_every) and user_id % self.control_every == 0,
+            "has_is_control": True,
+            "items": random.Random(user_id).sample(self.course_keys, self.recommendations),
+        }
+
+    def get_course_data(self, course_key, fields, querystring=None):  # pylint: disable=unused-argument
+        self.wait("catalog")
+        course = self.courses.get(course_key)
+        return course and {field: course[field] for field in fields if field in course}
+
+    def enrollments_for_user(self, user):
+        self.wait("enrollments")
+        course_keys = random.Random(-user.id).sample(self.course_keys, self.enrollments)
+        return [SimpleNamespace(course_id=f"course-v1:{course_key}+2024") for course_key in course_keys]
+
+    def fetch_program_enrollments_by_student(
+        self, user=None, program_enrollment_statuses=None  # pylint: disable=unused-argument
+    ):
+        self.wait("programs")
+        return []
+
+    def get_programs(self, uuids=None):  # pylint: disable=unused-argument
+        self.wait("programs")
+        return []
+
+    def country_code_from_ip(self, ip_address):
+        self.wait("geoip")
+        return COUNTRIES[int(ip_address.rsplit(".", 1)[-1]) % len(COUNTRIES)].lower()
+
+    def track(self, user_id, event_name, properties=None):  # pylint: disable=unused-argument
+        self.wait("segment")
+
+    def install(self, settings):
+        """
+        Points edx_recommendations at the fakes and configures the settings that depend on the catalog.
+        """
+        # pylint: disable=import-outside-toplevel
+        from edx_recommendations.api import amplitude, catalog, course_recommendations, events, geoip, utils
+
+        catalog.get_course_data = self.get_course_data
+        utils.CourseEnrollment = SimpleNamespace(enrollments_for_user=self.enrollments_for_user)
+        utils.fetch_program_enrollments_by_student = self.fetch_program_enrollments_by_student
+        utils.get_programs = self.get_programs
+        geoip.country_code_from_ip = self.country_code_from_ip
+        events.segment = SimpleNamespace(track=self.track)
+        course_recommendations.is_enterprise_learner = lambda user: False
+        amplitude.get_amplitude_session().mount(settings.AMPLITUDE_URL, FakeAmplitudeAdapter(self))
+
+        settings.CROSS_PRODUCT_RECOMMENDATIONS_KEYS = {
+            course_key: self.course_keys[index + 1:index + 4] for index, course_key in enumerate(self.course_keys)
+        }
+        settings.GENERAL_RECOMMENDATIONS = [
+            {
+                "course_key": course_key,
+                "title": self.courses[course_key]["title"],
+                "logo_image_url": "https://example.com/edx.png",
+                "marketing_url": self.courses[course_key]["marketing_url"],
+                "course_type": "verified-audit",
+                "image": self.courses[course_key]["image"],
+                "owners": self.courses[course_key]["owners"],
+                "url_slug": self.courses[course_key]["url_slug"],
+            }
+            for course_key in self.course_keys[:5]
+        ]
@@ -0,0 +1,143 @@
+"""
+Stand-ins for the edx-platform modules imported by edx_recommendations.
+"""
+import contextlib
+import importlib
+import sys
+import types
+
+
+def _stub_module(name, **attributes):
+    """
+    Registers an empty module (and its parent packages) under name unless it can be imported.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        pass
+
+    parts = name.split(".")
+    for index in range(1, len(parts) + 1):
+        module_name = ".".join(parts[:index])
+        if module_name not in sys.modules:
+            module = types.ModuleType(module_name)
+            module.__path__ = []
+            sys.modules[module_name] = module
+            if index > 1:
+                setattr(sys.modules[".".join(parts[:index - 1])], parts[index - 1], module)
+
+    module = sys.modules[name]
+    for attribute, value in attributes.items():
+        setattr(module, attribute, value)
+    return module
+
+
+def _not_configured(name):
+    """
+    Returns a stand-in for the edx-platform function name that fails if the benchmark did not replace it.
+    """
+    def not_configured(*args, **kwargs):
+        raise RuntimeError(f"{name} was called, but the benchmark did not replace this edx-platform stand-in.")
+    return not_configured
+
+
+class _CourseEnrollment:
+    enrollments_for_user = staticmethod(
+        _not_configured("common.djangoapps.student.models.CourseEnrollment.enrollments_for_user")
+    )
+
+
+class _ProgramEnrollmentStatuses:
+    __ACTIVE__ = ("enrolled", "pending")
+
+
+class _CourseKey:
+    """
+    Parses "course-v1:org+course+run" and "org/course/run" course ids like opaque_keys.
+    """
+
+    def __init__(self, org, course, run):
+        self.org = org
+        self.course = course
+        self.run = run
+
+    @classmethod
+    def from_string(cls, course_id):
+        return cls(*course_id.replace("course-v1:", "", 1).replace("/", "+").split("+"))
+
+    def __str__(self):
+        return f"course-v1:{self.org}+{self.course}+{self.run}"
+
+
+class _Tracker:
+    """
+    eventtracking tracker without any context.
+    """
+
+    def resolve_context(self):
+        return {}
+
+    @contextlib.contextmanager
+    def context(self, name, context):  # pylint: disable=unused-argument
+        yield
+
+
+_tracker = _Tracker()
+
+
+def _drf_stand_ins():
+    """
+    Returns stand-ins for the edx-drf-extensions authentication and permission classes.
+    """
+    # pylint: disable=import-outside-toplevel
+    from rest_framework.authentication import BaseAuthentication
+    from rest_framework.permissions import BasePermission
+
+    class _NoAuthentication(BaseAuthentication):
+        def authenticate(self, request):
+            return None
+
+    class _AllowAll(BasePermission):
+        pass
+
+    return _NoAuthentication, _AllowAll
+
+
+def _stub_functions(module_name, *function_names):
+    """
+    Stubs module_name with a stand-in for each of function_names that fails until the benchmark replaces it.
+    """
+    _stub_module(
+        module_name, **{name: _not_configured(f"{module_name}.{name}") for name in function_names}
+    )
+
+
+def install_platform_stubs():
+    """
+    Makes the edx-platform imports of edx_recommendations resolvable.
+    """
+    _stub_module("common.djangoapps.student.models", CourseEnrollment=_CourseEnrollment)
+    _stub_functions("common.djangoapps.track.segment", "track")
+    _stub_functions("lms.djangoapps.program_enrollments.api", "fetch_program_enrollments_by_student")
+    _stub_module("lms.djangoapps.program_enrollments.constants", ProgramEnrollmentStatuses=_ProgramEnrollmentStatuses)
+    _stub_functions("openedx.core.djangoapps.catalog.utils", "get_course_data", "get_programs")
+    _stub_functions("openedx.core.djangoapps.geoinfo.api", "country_code_from_ip")
+    _stub_functions("openedx.features.enterprise_support.utils", "is_enterprise_learner")
+    _stub_module("opaque_keys.edx.keys", CourseKey=_CourseKey)
+    _stub_module("eventtracking.tracker", get_tracker=lambda: _tracker)
+    sys.modules["eventtracking"].tracker = sys.modules["eventtracking.tracker"]
+
+
+def install_api_stubs():
+    """
+    Additionally makes the view modules importable, replacing edx-drf-extensions authentication with
+    classes that leave authentication to the benchmark.
+    """
+    install_platform_stubs()
+    authentication, permission = _drf_stand_ins()
+    _stub_module("edx_rest_framework_extensions.auth.jwt.authentication", JwtAuthentication=authentication)
+    _stub_module(
+        "edx_rest_framework_extensions.auth.session.authentication",
+        SessionAuthenticationAllowInactiveUser=authentication,
+    )
+    _stub_module("edx_rest_framework_extensions.permissions", NotJwtRestrictedApplication=permission)
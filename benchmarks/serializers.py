@@ -0,0 +1,111 @@
+"""
+Micro-benchmark for the recommendation response serializers.
+
+Compares the DRF serializers with the plain-function renderers in fast_serializers for every
+response shape, as the number of recommended courses grows:
+
+    DJANGO_SETTINGS_MODULE=test_settings python -m benchmarks.serializers
+"""
+import argparse
+import timeit
+
+import django
+
+
+def _course(index):
+    """
+    Returns a catalog-shaped course as the views hand it to the serializers.
+    """
+    return {
+        "key": f"edX+Course{index}",
+        "uuid": f"00000000-0000-4000-8000-{index:012d}",
+        "title": f"Course {index}",
+        "image": {"src": f"https://example.com/course{index}.png"},
+        "url_slug": f"course-{index}",
+        "owners": [
+            {"key": "edX", "name": "edX", "logo_image_url": "https://example.com/edx.png"},
+            {"key": "MITx", "name": "MITx", "logo_image_url": "https://example.com/mitx.png"},
+        ],
+        "active_course_run": {"key": f"course-v1:edX+Course{index}+T1", "marketing_url": "https://example.com/run"},
+        "course_type": "verified-audit",
+        "course_key": f"edX+Course{index}",
+        "logo_image_url": "https://example.com/edx.png",
+        "marketing_url": f"https://example.com/course{index}",
+    }
+
+
+def _shapes(courses):
+    """
+    Returns (name, serializer class, renderer, response data) for every response shape.
+    """
+    # pylint: disable=import-outside-toplevel
+    from edx_recommendations.api import fast_serializers, serializers
+
+    return [
+        (
+            "about page",
+            serializers.AboutPageRecommendationsSerializer,
+            fast_serializers.render_about_page_recommendations,
+            {"courses": courses, "is_control": False},
+        ),
+        (
+            "cross product",
+            serializers.CrossProductRecommendationsSerializer,
+            fast_serializers.render_cross_product_recommendations,
+            {"courses": courses},
+        ),
+        (
+            "amplitude",
+            serializers.AmplitudeRecommendationsSerializer,
+            fast_serializers.render_amplitude_recommendations,
+            {"amplitudeCourses": courses},
+        ),
+        (
+            "product",
+            serializers.CrossProductAndAmplitudeRecommendationsSerializer,
+            fast_serializers.render_cross_product_and_amplitude_recommendations,
+            {"crossProductCourses": courses[:2], "amplitudeCourses": courses[2:]},
+        ),
+        (
+            "dashboard",
+            serializers.DashboardRecommendationsSerializer,
+            fast_serializers.render_dashboard_recommendations,
+            {"courses": courses, "is_control": False},
+        ),
+    ]
+
+
+def run(course_counts, repeat):
+    """
+    Prints the time per response for the DRF serializers and the fast renderers.
+    """
+    from rest_framework.renderers import JSONRenderer  # pylint: disable=import-outside-toplevel
+
+    renderer = JSONRenderer()
+    print(f"{'shape':>14} {'courses':>8} {'drf (us)':>10} {'fast (us)':>10} {'speedup':>9}")
+    for course_count in course_counts:
+        courses = [_course(index) for index in range(course_count)]
+        for name, serializer_class, render, data in _shapes(courses):
+            assert renderer.render(render(data)) == renderer.render(serializer_class(data).data)
+            # pylint: disable=cell-var-from-loop
+            drf_time = min(
+                timeit.repeat(lambda: serializer_class(data).data, number=repeat, repeat=5)
+            ) / repeat * 1e6
+            fast_time = min(
+                timeit.repeat(lambda: render(data), number=repeat, repeat=5)
+            ) / repeat * 1e6
+            print(f"{name:>14} {course_count:>8} {drf_time:>10.1f} {fast_time:>10.1f} {drf_time / fast_time:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, nargs="+", default=[5, 10, 50])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    django.setup()
+    run(args.courses, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Settings for the endpoint benchmarks: test_settings plus the app's plugin settings and the
+LMS settings the views read.
+"""
+import os
+import sys
+import tempfile
+
+from edx_recommendations.settings.common import plugin_settings
+from test_settings import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+# Every benchmark thread must see the same database, which rules out an in-memory SQLite database.
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(tempfile.gettempdir(), f"edx_recommendations_benchmark_{os.getpid()}.db"),
+    }
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    }
+}
+
+ROOT_URLCONF = "benchmarks.urls"
+USE_TZ = True
+ALLOWED_HOSTS = ["*"]
+COURSE_ID_PATTERN = r"(?P<course_id>[^/+]+(/|\+)[^/+]+(/|\+)[^/?]+)"
+LMS_SEGMENT_KEY = None
+
+AMPLITUDE_URL = "https://amplitude.benchmark/api/3/recommendations"
+AMPLITUDE_API_KEY = "benchmark"
+
+plugin_settings(sys.modules[__name__])
+
+COURSE_ABOUT_PAGE_AMPLITUDE_MODEL_ID = "about-page-model"
+LEARNER_DASHBOARD_AMPLITUDE_MODEL_ID = "learner-dashboard-model"
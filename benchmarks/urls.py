@@ -0,0 +1,8 @@
+"""
+URLs of the endpoint benchmarks, mounted where the LMS plugin mounts them.
+"""
+from django.urls import include, re_path
+
+urlpatterns = [
+    re_path(r"^api/edx_recommendations/", include("edx_recommendations.api.urls")),
+]
@@ -0,0 +1,334 @@
+"""
+Client and caching helpers for the Amplitude recommendations API.
+"""
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from edx_django_utils.cache import get_cache_key
+from edx_django_utils.monitoring import set_custom_attribute
+from requests.adapters import HTTPAdapter
+
+log = logging.getLogger(__name__)
+
+AMPLITUDE_CACHE_KEY_PREFIX = "edx_recommendations.amplitude"
+AMPLITUDE_CACHE_LOCK_POLL_INTERVAL = 0.05
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class AmplitudeCircuitOpenError(Exception):
+    """
+    Raised instead of calling Amplitude while its circuit breaker is open.
+    """
+
+
+class AmplitudeResponseError(Exception):
+    """
+    Raised when Amplitude answers with an error status, so that the error is neither cached nor stored.
+    """
+
+    def __init__(self, status_code):
+        super().__init__(f"Amplitude responded with status {status_code}")
+        self.status_code = status_code
+
+
+# Statuses below 500 that still mean Amplitude cannot serve us: bad credentials and rate limiting.
+FAILURE_STATUS_CODES = frozenset({401, 403, 429})
+
+
+class CircuitBreaker:
+    """
+    Process-local circuit breaker for an upstream dependency.
+
+    The breaker opens after failure_threshold consecutive failed calls; calls slower than
+    latency_threshold seconds count as failures. While open, calls are rejected without I/O.
+    After recovery_timeout seconds one probe call is let through (half-open): its success
+    closes the breaker, its failure opens it again.
+
+    before_call returns the breaker's generation, which changes with every state change; outcomes
+    recorded for an older generation are ignored, so calls that straddle a transition cannot undo it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold, latency_threshold, recovery_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0
+        self._generation = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state):
+        """
+        Moves to state, logging and reporting the change. Must be called with the lock held.
+        """
+        if state == self.state:
+            return
+        log.warning(f"{self.name} circuit breaker changed from {self.state} to {state}")
+        set_custom_attribute(f"{self.name}_circuit_transition", f"{self.state}->{state}")
+        self.state = state
+        self._generation += 1
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+        if state == self.CLOSED:
+            self._failures = 0
+
+    def before_call(self):
+        """
+        Returns the generation to pass to record_call or cancel_call, or raises AmplitudeCircuitOpenError
+        if the call must not be made.
+        """
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self._transition(self.HALF_OPEN)
+                self._probe_in_flight = False
+
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+            elif self.state != self.CLOSED:
+                set_custom_attribute(f"{self.name}_circuit_state", self.state)
+                raise AmplitudeCircuitOpenError(f"{self.name} circuit breaker is {self.state}")
+
+            set_custom_attribute(f"{self.name}_circuit_state", self.state)
+            return self._generation
+
+    def _is_stale(self, generation):
+        return generation is not None and generation != self._generation
+
+    def cancel_call(self, generation=None):
+        """
+        Records that a call let through by before_call was abandoned without an outcome.
+        """
+        with self._lock:
+            if self._is_stale(generation):
+                return
+            self._probe_in_flight = False
+
+    def record_call(self, succeeded, latency, generation=None):
+        """
+        Records the outcome of a call let through by before_call.
+        """
+        failed = not succeeded or latency > self.latency_threshold
+        with self._lock:
+            if self._is_stale(generation):
+                return
+            self._probe_in_flight = False
+            if not failed:
+                self._transition(self.CLOSED)
+                self._failures = 0
+                return
+
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._transition(self.OPEN)
+
+
+_circuit_breaker = None
+_circuit_breaker_lock = threading.Lock()
+
+
+def get_amplitude_circuit_breaker():
+    """
+    Returns the process-wide circuit breaker guarding Amplitude calls.
+    """
+    global _circuit_breaker  # pylint: disable=global-statement
+
+    if _circuit_breaker is None:
+        with _circuit_breaker_lock:
+            if _circuit_breaker is None:
+                _circuit_breaker = CircuitBreaker(
+                    "amplitude",
+                    failure_threshold=settings.AMPLITUDE_CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                    latency_threshold=settings.AMPLITUDE_CIRCUIT_BREAKER_LATENCY_THRESHOLD,
+                    recovery_timeout=settings.AMPLITUDE_CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+                )
+    return _circuit_breaker
+
+
+def _build_amplitude_session():
+    """
+    Returns a new requests session with a keep-alive connection pool sized from settings.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=settings.AMPLITUDE_HTTP_POOL_CONNECTIONS,
+        pool_maxsize=settings.AMPLITUDE_HTTP_POOL_MAXSIZE,
+        pool_block=settings.AMPLITUDE_HTTP_POOL_BLOCK,
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_amplitude_session():
+    """
+    Returns the process-wide session used for Amplitude calls.
+
+    The session is created lazily and shared between threads so that connections
+    to settings.AMPLITUDE_URL are kept alive and reused across requests.
+    """
+    global _session  # pylint: disable=global-statement
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_amplitude_session()
+    return _session
+
+
+def reset_amplitude_session():
+    """
+    Closes the shared session so that the next call builds a fresh one, e.g. after settings change.
+    """
+    global _session  # pylint: disable=global-statement
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get_amplitude_timeout():
+    """
+    Returns the (connect, read) timeout tuple for Amplitude calls.
+    """
+    return (settings.AMPLITUDE_CONNECT_TIMEOUT, settings.AMPLITUDE_READ_TIMEOUT)
+
+
+def get_amplitude_pool_stats():
+    """
+    Returns connection pool statistics for the shared Amplitude session.
+
+    The stats are meant for sizing AMPLITUDE_HTTP_POOL_MAXSIZE per worker:
+        - pool_maxsize: configured maximum number of kept-alive connections per host
+        - pools: number of host pools currently held by the session
+        - connections_opened: connections created since the pool was built
+        - requests_made: requests sent through the pool
+        - idle_connections: kept-alive connections currently available for reuse
+    """
+    stats = {
+        "pool_maxsize": settings.AMPLITUDE_HTTP_POOL_MAXSIZE,
+        "pools": 0,
+        "connections_opened": 0,
+        "requests_made": 0,
+        "idle_connections": 0,
+    }
+    if _session is None:
+        return stats
+
+    adapter = _session.get_adapter(settings.AMPLITUDE_URL)
+    pool_manager = adapter.poolmanager
+    with pool_manager.pools.lock:
+        pools = [pool_manager.pools[key] for key in pool_manager.pools.keys()]
+
+    stats["pools"] = len(pools)
+    for pool in pools:
+        stats["connections_opened"] += pool.num_connections
+        stats["requests_made"] += pool.num_requests
+        stats["idle_connections"] += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+    return stats
+
+
+def _amplitude_cache_keys(user_id, recommendation_id):
+    """
+    Returns the (value, lock) cache keys for a user's recommendations from an Amplitude model.
+    """
+    key = get_cache_key(user_id=user_id, recommendation_id=recommendation_id)
+    return f"{AMPLITUDE_CACHE_KEY_PREFIX}.{key}", f"{AMPLITUDE_CACHE_KEY_PREFIX}.lock.{key}"
+
+
+def _store_amplitude_recommendations(cache_key, recommendations):
+    """
+    Caches the recommendations tuple, using the negative-result timeout when no items were returned.
+
+    The entry carries a refresh_at timestamp ahead of its expiry so that one caller can refresh it
+    while everyone else keeps being served the cached value.
+    """
+    _, _, course_keys = recommendations
+    timeout = (
+        settings.AMPLITUDE_RECOMMENDATIONS_CACHE_TIMEOUT
+        if course_keys
+        else settings.AMPLITUDE_RECOMMENDATIONS_NEGATIVE_CACHE_TIMEOUT
+    )
+    if timeout <= 0:
+        return
+
+    early_refresh = min(settings.AMPLITUDE_RECOMMENDATIONS_CACHE_EARLY_REFRESH, timeout / 2)
+    cache.set(
+        cache_key,
+        {"recommendations": recommendations, "refresh_at": time.time() + timeout - early_refresh},
+        timeout,
+    )
+
+
+def get_cached_amplitude_recommendations(user_id, recommendation_id, fetch, deadline=None):
+    """
+    Returns Amplitude recommendations for a user from the cache, calling fetch on a miss.
+
+    Only one caller at a time refetches a given (user_id, recommendation_id) pair: whoever wins the
+    lock refreshes the entry once it is due, the others keep serving the cached value. On a cold miss
+    callers that lose the lock wait up to AMPLITUDE_RECOMMENDATIONS_CACHE_LOCK_TIMEOUT for the winner
+    before fetching themselves. Errors raised by fetch are never cached; if a refresh fails the
+    previously cached value is served until it expires.
+
+    Args:
+        user_id: The user for which the recommendations need to be pulled
+        recommendation_id: Amplitude model id
+        fetch: callable taking (user_id, recommendation_id) and returning the recommendations tuple
+        deadline: if provided, waiting for another caller's fetch stops when its budget runs out
+
+    Returns:
+        The (is_control, has_is_control, recommended_course_keys) tuple returned by fetch.
+    """
+    if settings.AMPLITUDE_RECOMMENDATIONS_CACHE_TIMEOUT <= 0:
+        return fetch(user_id, recommendation_id)
+
+    cache_key, lock_key = _amplitude_cache_keys(user_id, recommendation_id)
+    lock_timeout = settings.AMPLITUDE_RECOMMENDATIONS_CACHE_LOCK_TIMEOUT
+
+    cached = cache.get(cache_key)
+    if cached is not None:
+        if time.time() < cached["refresh_at"] or not cache.add(lock_key, True, lock_timeout):
+            set_custom_attribute("amplitude_cache", "hit")
+            return tuple(cached["recommendations"])
+        set_custom_attribute("amplitude_cache", "refresh")
+    elif not cache.add(lock_key, True, lock_timeout):
+        wait_until = time.monotonic() + (deadline.cap(lock_timeout) if deadline else lock_timeout)
+        while time.monotonic() < wait_until:
+            time.sleep(AMPLITUDE_CACHE_LOCK_POLL_INTERVAL)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                set_custom_attribute("amplitude_cache", "hit_after_wait")
+                return tuple(cached["recommendations"])
+            if cache.get(lock_key) is None:
+                break
+        set_custom_attribute("amplitude_cache", "miss_after_wait")
+        return fetch(user_id, recommendation_id)
+    else:
+        set_custom_attribute("amplitude_cache", "miss")
+
+    try:
+        recommendations = fetch(user_id, recommendation_id)
+    except Exception as err:  # pylint: disable=broad-except
+        if cached is None:
+            raise
+        log.warning(f"Amplitude refresh failed for {user_id}, serving cached recommendations: {err}")
+        return tuple(cached["recommendations"])
+    else:
+        _store_amplitude_recommendations(cache_key, recommendations)
+    finally:
+        cache.delete(lock_key)
+    return recommendations
@@ -0,0 +1,183 @@
+"""
+API to get learner dashboard recommendations for many users at once.
+"""
+
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
+from edx_django_utils.monitoring import set_custom_attribute
+from edx_rest_framework_extensions.auth.jwt.authentication import JwtAuthentication
+from edx_rest_framework_extensions.auth.session.authentication import (
+    SessionAuthenticationAllowInactiveUser,
+)
+from edx_rest_framework_extensions.permissions import NotJwtRestrictedApplication
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from edx_recommendations.api.concurrency import get_executor, submit
+from edx_recommendations.api.cross_product_recommendations import ProductRecommendationsView
+from edx_recommendations.api.fragments import (
+    render_bulk_recommendations_error,
+    render_bulk_recommendations_record,
+)
+from edx_recommendations.api.utils import (
+    filter_recommended_courses,
+    get_amplitude_course_recommendations,
+    get_stored_amplitude_course_recommendations,
+    prefetch_recommended_courses,
+)
+
+log = logging.getLogger(__name__)
+User = get_user_model()
+
+
+class BulkRecommendationsView(APIView):
+    """
+    **Example Request**
+
+    POST api/edx_recommendations/learner_dashboard/amplitude/bulk/
+
+        {"user_ids": [1, 2, 3], "countries": {"1": "US", "3": "PK"}}
+
+    **Response**
+
+    One JSON record per line (NDJSON), in the order of user_ids, with the courses
+    learner_dashboard/amplitude/v2/ would return to that user:
+
+        {"userId": 1, "amplitudeCourses": [...]}
+        {"userId": 2, "error": "user_not_found"}
+
+    countries optionally maps user ids to the country code location restrictions are checked
+    against; users without one are treated like requests whose country is unknown.
+
+    Users are handled RECOMMENDATIONS_BULK_CHUNK_SIZE at a time. For each chunk the stored Amplitude
+    recommendations are read in one query and the catalog data of all their candidates is
+    hydrated once, then the users are filtered on a pool of RECOMMENDATIONS_BULK_WORKERS threads.
+    """
+
+    authentication_classes = (
+        JwtAuthentication,
+        SessionAuthenticationAllowInactiveUser,
+    )
+    permission_classes = (IsAdminUser, NotJwtRestrictedApplication)
+
+    recommendations_count = 4
+
+    def post(self, request):
+        """
+        Streams the learner dashboard recommendations of every user in user_ids.
+        """
+        if not isinstance(request.data, dict):
+            return Response({"error": "The request body must be a JSON object"}, status=400)
+        user_ids = request.data.get("user_ids")
+        countries = request.data.get("countries") or {}
+        if (
+            not isinstance(user_ids, list)
+            or not all(isinstance(user_id, int) and not isinstance(user_id, bool) for user_id in user_ids)
+            or not isinstance(countries, dict)
+        ):
+            return Response(
+                {"error": "user_ids must be a list of user ids and countries an object of country codes"},
+                status=400,
+            )
+        if len(user_ids) > settings.RECOMMENDATIONS_BULK_MAX_USERS:
+            return Response(
+                {"error": f"At most {settings.RECOMMENDATIONS_BULK_MAX_USERS} user ids may be requested at once"},
+                status=400,
+            )
+
+        set_custom_attribute("bulk_recommendations_users", len(user_ids))
+        countries = {str(user_id): country for user_id, country in countries.items() if country}
+        return StreamingHttpResponse(
+            self._records(user_ids, countries), content_type="application/x-ndjson", status=200
+        )
+
+    def _records(self, user_ids, countries):
+        """
+        Yields the NDJSON record of every user, one chunk of users at a time.
+        """
+        chunk_size = max(settings.RECOMMENDATIONS_BULK_CHUNK_SIZE, 1)
+        counts = {"hits": 0, "misses": 0}
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            try:
+                users = User.objects.in_bulk(chunk)
+                stored_recommendations = get_stored_amplitude_course_recommendations(
+                    chunk, settings.LEARNER_DASHBOARD_AMPLITUDE_MODEL_ID
+                )
+            except Exception as err:  # pylint: disable=broad-except
+                # The response is already streaming, so the chunk's users get error records instead of a 500.
+                log.warning(f"Cannot load bulk recommendation users: {err}")
+                for user_id in chunk:
+                    yield render_bulk_recommendations_error(user_id, "unavailable")
+                continue
+            try:
+                prefetch_recommended_courses(
+                    {
+                        course_key
+                        for _, _, course_keys in stored_recommendations.values()
+                        for course_key in course_keys or []
+                    },
+                    ProductRecommendationsView.fields,
+                )
+            except Exception as err:  # pylint: disable=broad-except
+                log.warning(f"Cannot prefetch bulk recommendation courses: {err}")
+
+            args = [
+                (users.get(user_id), user_id, stored_recommendations.get(user_id), countries.get(str(user_id)))
+                for user_id in chunk
+            ]
+            if settings.RECOMMENDATIONS_BULK_WORKERS <= 1:
+                results = (self._record(*record_args) for record_args in args)
+            else:
+                executor = get_executor("bulk_recommendations", settings.RECOMMENDATIONS_BULK_WORKERS)
+                futures = [submit(executor, self._record, *record_args) for record_args in args]
+                results = (future.result() for future in futures)
+            for record, record_counts in results:
+                for counter, count in record_counts.items():
+                    counts[counter] += count
+                yield record
+
+        log.info(
+            f"Streamed bulk recommendations of {len(user_ids)} users, "
+            f"{counts['hits']} fragment cache hits, {counts['misses']} misses"
+        )
+
+    def _record(self, user, user_id, stored_recommendations, user_country_code):
+        """
+        Returns the NDJSON record of one user, with the same fallbacks as ProductRecommendationsView,
+        and its fragment cache hits and misses.
+        """
+        counts = {"hits": 0, "misses": 0}
+        if user is None:
+            return render_bulk_recommendations_error(user_id, "user_not_found"), counts
+
+        fallback_recommendations = settings.GENERAL_RECOMMENDATIONS[0:self.recommendations_count]
+        try:
+            _, _, course_keys = stored_recommendations or get_amplitude_course_recommendations(
+                user_id, settings.LEARNER_DASHBOARD_AMPLITUDE_MODEL_ID
+            )
+        except Exception as ex:  # pylint: disable=broad-except
+            log.warning(f"Cannot get recommendations from Amplitude for {user_id}: {ex}")
+            return render_bulk_recommendations_record(user_id, fallback_recommendations, counts), counts
+
+        if not course_keys:
+            return render_bulk_recommendations_record(user_id, fallback_recommendations, counts), counts
+
+        try:
+            filtered_courses = filter_recommended_courses(
+                user,
+                course_keys,
+                recommendation_count=self.recommendations_count,
+                user_country_code=user_country_code,
+                course_fields=ProductRecommendationsView.fields,
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            log.warning(f"Cannot filter bulk recommendations for {user_id}: {err}")
+            return render_bulk_recommendations_error(user_id, "unavailable"), counts
+
+        record = render_bulk_recommendations_record(user_id, filtered_courses or fallback_recommendations, counts)
+        return record, counts
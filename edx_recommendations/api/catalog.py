@@ -0,0 +1,431 @@
+"""
+Helpers for hydrating recommended course keys with catalog data.
+
+Course data is cached in two tiers: a size-bounded LRU local to the process in front of the
+shared Django cache. Entries past their freshness window are still served for
+RECOMMENDATIONS_COURSE_DATA_STALE_TIMEOUT seconds while a background thread refreshes them,
+so a slow discovery service only ever delays cold lookups.
+
+Each entry also holds the course's compiled CountryRestriction, so restriction checks on cached
+courses are set lookups and the compiled form is replaced whenever the course data is. It also
+holds the course's catalog version, a digest of the course data that keys the rendered course
+fragments of api.fragments.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.core.cache import cache
+from edx_django_utils.cache import get_cache_key
+from edx_django_utils.monitoring import set_custom_attribute
+
+from openedx.core.djangoapps.catalog.utils import get_course_data
+
+from edx_recommendations.api.concurrency import get_executor, submit
+from edx_recommendations.api.fragments import CATALOG_VERSION_FIELD
+from edx_recommendations.api.restrictions import COUNTRY_RESTRICTION_FIELD, compile_country_restriction
+from edx_recommendations.api.timing import increment
+
+log = logging.getLogger(__name__)
+
+COURSE_DATA_CACHE_KEY_PREFIX = "edx_recommendations.course"
+UNSERVABLE_COURSE_CACHE_KEY_PREFIX = "edx_recommendations.unservable_course"
+
+# Marks a discovery lookup that failed or timed out, as opposed to one that found no course.
+LOOKUP_FAILED = object()
+
+# Entries written before versions were added have no version, and are rendered without the fragment cache.
+CourseCacheEntry = namedtuple(
+    "CourseCacheEntry", ["data", "fresh_until", "stale_until", "restriction", "version"], defaults=(None,)
+)
+
+
+class LocalCourseCache:
+    """
+    Thread-safe, size-bounded LRU of CourseCacheEntry objects.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the entry for key, or None if it is missing or past its stale window.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.stale_until <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        """
+        Stores entry under key, evicting the least recently used entries beyond max_size.
+        """
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CourseCacheStats:
+    """
+    Process-wide counters for course data cache lookups.
+    """
+
+    COUNTERS = ("local_hits", "shared_hits", "stale_hits", "misses", "refreshes", "unservable_skips")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.COUNTERS, 0)
+
+    def increment(self, counter, count=1):
+        with self._lock:
+            self._counts[counter] += count
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.COUNTERS, 0)
+
+
+_local_cache = None
+_local_cache_lock = threading.Lock()
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+course_cache_stats = CourseCacheStats()
+
+
+def get_local_course_cache():
+    """
+    Returns the process-local course data cache, creating it on first use.
+    """
+    global _local_cache  # pylint: disable=global-statement
+
+    if _local_cache is None:
+        with _local_cache_lock:
+            if _local_cache is None:
+                _local_cache = LocalCourseCache(settings.RECOMMENDATIONS_COURSE_DATA_LOCAL_CACHE_SIZE)
+    return _local_cache
+
+
+def get_course_cache_stats():
+    """
+    Returns the course data cache counters along with the current size of the local tier.
+    """
+    stats = course_cache_stats.snapshot()
+    stats["local_size"] = len(get_local_course_cache())
+    return stats
+
+
+def _course_data_cache_key(course_key, fields, querystring):
+    """
+    Returns the shared cache key for a course's data with the given field projection and querystring.
+    """
+    key = get_cache_key(
+        course_key=course_key,
+        fields=",".join(fields),
+        querystring=sorted((querystring or {}).items()),
+    )
+    return f"{COURSE_DATA_CACHE_KEY_PREFIX}.{key}"
+
+
+def _unservable_course_cache_key(course_key, querystring):
+    """
+    Returns the shared cache key marking a course as unservable for the given querystring.
+    """
+    key = get_cache_key(course_key=course_key, querystring=sorted((querystring or {}).items()))
+    return f"{UNSERVABLE_COURSE_CACHE_KEY_PREFIX}.{key}"
+
+
+def _is_unservable(course_data, fields):
+    """
+    Returns True if discovery has no course, or the course has no course runs that could be recommended.
+    """
+    return not course_data or ("course_runs" in fields and not course_data.get("course_runs"))
+
+
+def exclude_unservable_course_keys(course_keys, querystring=None):
+    """
+    Returns course_keys without the courses recently found to be missing or run-less in discovery.
+
+    This costs a single shared cache call and no catalog I/O, so callers should apply it before
+    hydrating candidates.
+    """
+    course_keys = list(course_keys)
+    if settings.RECOMMENDATIONS_UNSERVABLE_COURSE_CACHE_TIMEOUT <= 0 or not course_keys:
+        return course_keys
+
+    unservable_cache_keys = {
+        course_key: _unservable_course_cache_key(course_key, querystring) for course_key in course_keys
+    }
+    unservable = cache.get_many(list(unservable_cache_keys.values()))
+    servable_course_keys = [
+        course_key for course_key in course_keys if unservable_cache_keys[course_key] not in unservable
+    ]
+
+    skipped = len(course_keys) - len(servable_course_keys)
+    if skipped:
+        course_cache_stats.increment("unservable_skips", skipped)
+    set_custom_attribute("course_cache_unservable_skips", skipped)
+    return servable_course_keys
+
+
+def _mark_unservable(course_keys, querystring):
+    """
+    Remembers course_keys as unservable for RECOMMENDATIONS_UNSERVABLE_COURSE_CACHE_TIMEOUT seconds.
+    """
+    if settings.RECOMMENDATIONS_UNSERVABLE_COURSE_CACHE_TIMEOUT <= 0 or not course_keys:
+        return
+    cache.set_many(
+        {_unservable_course_cache_key(course_key, querystring): True for course_key in course_keys},
+        settings.RECOMMENDATIONS_UNSERVABLE_COURSE_CACHE_TIMEOUT,
+    )
+
+
+def _catalog_version(course_key, course_data):
+    """
+    Returns a digest identifying a course key and its catalog data.
+    """
+    content = json.dumps([str(course_key), course_data], sort_keys=True, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _new_cache_entry(course_key, course_data):
+    """
+    Returns a shared cache entry for freshly fetched course data.
+    """
+    fresh_until = time.time() + settings.RECOMMENDATIONS_COURSE_DATA_CACHE_TIMEOUT
+    return CourseCacheEntry(
+        course_data,
+        fresh_until,
+        fresh_until + settings.RECOMMENDATIONS_COURSE_DATA_STALE_TIMEOUT,
+        compile_country_restriction(course_data.get("location_restriction")),
+        _catalog_version(course_key, course_data),
+    )
+
+
+def _course_from_entry(entry):
+    """
+    Returns a shallow copy of the entry's course data carrying its compiled country restriction
+    and catalog version.
+    """
+    course = dict(entry.data)
+    course[COUNTRY_RESTRICTION_FIELD] = entry.restriction
+    course[CATALOG_VERSION_FIELD] = entry.version
+    return course
+
+
+def _local_cache_entry(entry):
+    """
+    Returns the local tier copy of a shared entry, which goes stale no later than the local timeout.
+    """
+    fresh_until = min(entry.fresh_until, time.time() + settings.RECOMMENDATIONS_COURSE_DATA_LOCAL_CACHE_TIMEOUT)
+    return entry._replace(fresh_until=fresh_until)
+
+
+def _store_cache_entries(entries):
+    """
+    Writes {cache_key: CourseCacheEntry} to both cache tiers.
+    """
+    local_cache = get_local_course_cache()
+    for cache_key, entry in entries.items():
+        local_cache.set(cache_key, _local_cache_entry(entry))
+    cache.set_many(
+        {cache_key: tuple(entry) for cache_key, entry in entries.items()},
+        settings.RECOMMENDATIONS_COURSE_DATA_CACHE_TIMEOUT + settings.RECOMMENDATIONS_COURSE_DATA_STALE_TIMEOUT,
+    )
+
+
+def _refresh_course_data(cache_key, course_key, fields, querystring):
+    """
+    Refetches a course from discovery and rewrites its cache entries, or drops them if discovery
+    no longer has the course.
+    """
+    try:
+        course_data = get_course_data(course_key, fields, querystring=querystring)
+        if course_data:
+            _store_cache_entries({cache_key: _new_cache_entry(course_key, course_data)})
+        else:
+            get_local_course_cache().delete(cache_key)
+            cache.delete(cache_key)
+        if _is_unservable(course_data, fields):
+            _mark_unservable([course_key], querystring)
+    except Exception as err:  # pylint: disable=broad-except
+        log.warning(f"Background catalog refresh for {course_key} failed due to: {err}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(cache_key)
+
+
+def _schedule_refresh(cache_key, course_key, fields, querystring):
+    """
+    Refreshes a stale course in the background unless a refresh for it is already running.
+    """
+    with _refreshing_lock:
+        if cache_key in _refreshing:
+            return
+        _refreshing.add(cache_key)
+
+    course_cache_stats.increment("refreshes")
+    executor = get_executor("catalog_refresh", max(settings.RECOMMENDATIONS_CATALOG_FETCH_WORKERS, 1))
+    submit(executor, _refresh_course_data, cache_key, course_key, fields, querystring)
+
+
+def _fetch_courses_data(course_keys, fields, querystring, timeout):
+    """
+    Fetches course data from discovery, concurrently when RECOMMENDATIONS_CATALOG_FETCH_WORKERS > 1.
+
+    Results keep the order of course_keys. A lookup that does not finish within timeout seconds of
+    being dispatched, or that fails, yields LOOKUP_FAILED.
+    """
+    max_workers = settings.RECOMMENDATIONS_CATALOG_FETCH_WORKERS
+    if max_workers <= 1 or len(course_keys) <= 1:
+        return [get_course_data(course_key, fields, querystring=querystring) for course_key in course_keys]
+
+    executor = get_executor("catalog", max_workers)
+    dispatched_at = time.monotonic()
+    futures = [
+        submit(executor, get_course_data, course_key, fields, querystring=querystring)
+        for course_key in course_keys
+    ]
+
+    courses = []
+    for course_key, future in zip(course_keys, futures):
+        try:
+            courses.append(future.result(timeout=max(dispatched_at + timeout - time.monotonic(), 0)))
+        except FutureTimeoutError:
+            future.cancel()
+            log.warning(f"Catalog lookup for {course_key} timed out after {timeout}s")
+            courses.append(LOOKUP_FAILED)
+        except Exception as err:  # pylint: disable=broad-except
+            log.warning(f"Catalog lookup for {course_key} failed due to: {err}")
+            courses.append(LOOKUP_FAILED)
+    return courses
+
+
+def get_courses_data(course_keys, fields, querystring=None, timeout=None):
+    """
+    Returns catalog data for a batch of course keys.
+
+    Courses are served from the local tier first, then from the shared cache with a single call;
+    only the misses are fetched from discovery, in parallel, and written back to both tiers.
+    Stale entries are returned as-is and refreshed in the background.
+
+    Args:
+        course_keys: course keys to hydrate
+        fields: course fields to collect from discovery
+        querystring: extra query parameters for the discovery request
+        timeout: seconds to wait for concurrent discovery lookups, RECOMMENDATIONS_CATALOG_FETCH_TIMEOUT by default
+
+    Returns:
+        A list with the course data (or None) for each course key, in the same order as course_keys.
+        Each course is a shallow copy, so callers may add keys to it without touching the cache.
+        The compiled CountryRestriction of the course is attached under COUNTRY_RESTRICTION_FIELD
+        and its catalog version under CATALOG_VERSION_FIELD.
+    """
+    now = time.time()
+    local_cache = get_local_course_cache()
+    cache_keys = {
+        course_key: _course_data_cache_key(course_key, fields, querystring)
+        for course_key in course_keys
+    }
+    counts = dict.fromkeys(("local_hits", "shared_hits", "stale_hits", "misses"), 0)
+
+    # Fresh local entries are served directly, stale ones are kept in case the shared tier has nothing better.
+    entries, stale_local_entries = {}, {}
+    for course_key, cache_key in cache_keys.items():
+        entry = local_cache.get(cache_key)
+        if entry is None:
+            continue
+        if entry.fresh_until > now:
+            entries[course_key] = entry
+            counts["local_hits"] += 1
+        else:
+            stale_local_entries[course_key] = entry
+
+    shared_cache_keys = [cache_key for course_key, cache_key in cache_keys.items() if course_key not in entries]
+    shared_entries = cache.get_many(shared_cache_keys) if shared_cache_keys else {}
+    for course_key, cache_key in cache_keys.items():
+        if course_key in entries:
+            continue
+        if cache_key in shared_entries:
+            entry = CourseCacheEntry(*shared_entries[cache_key])
+            local_cache.set(cache_key, _local_cache_entry(entry))
+        else:
+            entry = stale_local_entries.get(course_key)
+            if entry is None:
+                continue
+
+        entries[course_key] = entry
+        if entry.fresh_until > now:
+            counts["shared_hits"] += 1
+        else:
+            counts["stale_hits"] += 1
+            _schedule_refresh(cache_key, course_key, fields, querystring)
+
+    missing_course_keys = [course_key for course_key in cache_keys if course_key not in entries]
+    counts["misses"] = len(missing_course_keys)
+    increment("catalog_lookups", len(missing_course_keys))
+
+    courses = {course_key: _course_from_entry(entry) for course_key, entry in entries.items()}
+    fetched_entries = {}
+    unservable_course_keys = []
+    for course_key, course_data in zip(
+        missing_course_keys, _fetch_courses_data(
+            missing_course_keys,
+            fields,
+            querystring,
+            settings.RECOMMENDATIONS_CATALOG_FETCH_TIMEOUT if timeout is None else timeout,
+        )
+    ):
+        if course_data is LOOKUP_FAILED:
+            courses[course_key] = None
+            continue
+
+        if course_data:
+            entry = _new_cache_entry(course_key, course_data)
+            fetched_entries[cache_keys[course_key]] = entry
+            courses[course_key] = _course_from_entry(entry)
+        else:
+            courses[course_key] = course_data
+        if _is_unservable(course_data, fields):
+            unservable_course_keys.append(course_key)
+
+    if fetched_entries:
+        _store_cache_entries(fetched_entries)
+    _mark_unservable(unservable_course_keys, querystring)
+
+    for counter, count in counts.items():
+        if count:
+            course_cache_stats.increment(counter, count)
+        set_custom_attribute(f"course_cache_{counter}", count)
+
+    return [courses[course_key] for course_key in course_keys]
@@ -0,0 +1,48 @@
+"""
+Bounded thread pools for running upstream lookups concurrently.
+"""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name, max_workers):
+    """
+    Returns the process-wide thread pool registered under name, creating it on first use.
+    """
+    executor = _executors.get(name)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix=f"edx_recommendations.{name}"
+                )
+                _executors[name] = executor
+    return executor
+
+
+def _run_in_worker(fn, *args, **kwargs):
+    """
+    Runs fn in a pool thread, releasing any database connection the thread opened once it is stale.
+    """
+    close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def submit(executor, fn, *args, **kwargs):
+    """
+    Submits fn to executor and returns its future.
+
+    fn runs in a copy of the caller's context, so context variables such as the request timing
+    collector carry over to the pool thread.
+    """
+    return executor.submit(contextvars.copy_context().run, _run_in_worker, fn, *args, **kwargs)
@@ -5,31 +5,34 @@ APIs to get course recommendations.
 import logging
 from django.conf import settings
 from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from edx_rest_framework_extensions.auth.jwt.authentication import JwtAuthentication
 from edx_rest_framework_extensions.auth.session.authentication import (
     SessionAuthenticationAllowInactiveUser,
 )
 from edx_rest_framework_extensions.permissions import NotJwtRestrictedApplication
-from ipware.ip import get_client_ip
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from common.djangoapps.track import segment
-from openedx.core.djangoapps.geoinfo.api import country_code_from_ip
 from openedx.features.enterprise_support.utils import is_enterprise_learner
 
 from edx_recommendations.toggles import (
     ENABLE_COURSE_ABOUT_PAGE_RECOMMENDATIONS,
     ENABLE_DASHBOARD_RECOMMENDATIONS,
     FALLBACK_RECOMMENDATIONS,
+    is_enabled,
 )
-from edx_recommendations.api.serializers import (
-    AboutPageRecommendationsSerializer,
-    DashboardRecommendationsSerializer,
-)
+from edx_recommendations.api.fast_serializers import render_dashboard_recommendations
+from edx_recommendations.api.fragments import render_about_page_recommendations_response
+from edx_recommendations.api.deadline import Deadline
+from edx_recommendations.api.events import RECOMMENDATIONS_VIEWED_EVENT, track_event
+from edx_recommendations.api.geoip import get_lazy_country_code
+from edx_recommendations.api.result_cache import get_filtered_recommendations
+from edx_recommendations.api.timing import timed, timed_view
 from edx_recommendations.api.utils import (
     get_amplitude_course_recommendations,
+    get_materialized_amplitude_course_recommendations,
     filter_recommended_courses,
     is_user_enrolled_in_ut_austin_masters_program,
 )
@@ -51,6 +54,8 @@ class CourseAboutPageRecommendationsView(APIView):
     permission_classes = (IsAuthenticated,)
 
     recommendations_count = 4
+    # Seconds all upstream calls of a request may take, overridable by settings.RECOMMENDATIONS_LATENCY_BUDGETS.
+    latency_budget = None
 
     def _emit_recommendations_viewed_event(
         self,
@@ -62,9 +67,9 @@ class CourseAboutPageRecommendationsView(APIView):
         """
         Emits an event to track recommendation experiment views.
         """
-        segment.track(
+        track_event(
             user_id,
-            "edx.bi.user.recommendations.viewed",
+            RECOMMENDATIONS_VIEWED_EVENT,
             {
                 "is_control": is_control,
                 "amplitude_recommendations": amplitude_recommendations,
@@ -73,23 +78,26 @@ class CourseAboutPageRecommendationsView(APIView):
             },
         )
 
+    @timed_view
     def get(self, request, course_id):
         """
         Returns
             - Amplitude course recommendations for course about page
         """
-        if not ENABLE_COURSE_ABOUT_PAGE_RECOMMENDATIONS.is_enabled():
+        if not is_enabled(ENABLE_COURSE_ABOUT_PAGE_RECOMMENDATIONS):
             return Response(status=404)
 
         if is_enterprise_learner(request.user):
             raise PermissionDenied()
 
         user = request.user
+        deadline = Deadline.for_view(self)
 
         try:
-            is_control, has_is_control, course_keys = get_amplitude_course_recommendations(
-                user.id, settings.COURSE_ABOUT_PAGE_AMPLITUDE_MODEL_ID
-            )
+            with timed("amplitude"):
+                is_control, has_is_control, course_keys = get_amplitude_course_recommendations(
+                    user.id, settings.COURSE_ABOUT_PAGE_AMPLITUDE_MODEL_ID, deadline=deadline
+                )
         except Exception as err:  # pylint: disable=broad-except
             log.warning(f"Amplitude API failed for {user.id} due to: {err}")
             return Response(status=404)
@@ -97,32 +105,27 @@ class CourseAboutPageRecommendationsView(APIView):
         is_control = is_control if has_is_control else None
         recommended_courses = []
         if not (is_control or is_control is None):
-            ip_address = get_client_ip(request)[0]
-            user_country_code = country_code_from_ip(ip_address).upper()
-            recommended_courses = filter_recommended_courses(
-                user,
-                course_keys,
-                user_country_code=user_country_code,
-                request_course_key=course_id,
-                recommendation_count=self.recommendations_count,
-            )
+            with timed("filter"):
+                recommended_courses = filter_recommended_courses(
+                    user,
+                    course_keys,
+                    user_country_code=get_lazy_country_code(request),
+                    request_course_key=course_id,
+                    recommendation_count=self.recommendations_count,
+                    deadline=deadline,
+                )
 
             for course in recommended_courses:
                 course.update({"active_course_run": course.get("course_runs")[0]})
 
-        self._emit_recommendations_viewed_event(
-            user.id, is_control, recommended_courses
-        )
+        with timed("events"):
+            self._emit_recommendations_viewed_event(
+                user.id, is_control, recommended_courses
+            )
 
-        return Response(
-            AboutPageRecommendationsSerializer(
-                {
-                    "courses": recommended_courses,
-                    "is_control": is_control,
-                }
-            ).data,
-            status=200,
-        )
+        with timed("render"):
+            content = render_about_page_recommendations_response(recommended_courses, is_control)
+        return HttpResponse(content, content_type="application/json", status=200)
 
 
 class LearnerDashboardRecommendationsView(APIView):
@@ -140,24 +143,49 @@ class LearnerDashboardRecommendationsView(APIView):
     )
     permission_classes = (IsAuthenticated, NotJwtRestrictedApplication)
 
+    recommendations_count = 5
+    # Seconds all upstream calls of a request may take, overridable by settings.RECOMMENDATIONS_LATENCY_BUDGETS.
+    latency_budget = None
+
+    @classmethod
+    def filter_recommendations(cls, user, course_keys, user_country_code, deadline=None):
+        """
+        Returns the filtered Amplitude recommendations shown to user, through the recommendation result cache.
+        """
+        return get_filtered_recommendations(
+            "learner_dashboard",
+            user,
+            settings.LEARNER_DASHBOARD_AMPLITUDE_MODEL_ID,
+            course_keys,
+            user_country_code=user_country_code,
+            recommendation_count=cls.recommendations_count,
+            deadline=deadline,
+        )
+
+    @timed_view
     def get(self, request):
         """
         Retrieves course recommendations details.
         """
-        if not ENABLE_DASHBOARD_RECOMMENDATIONS.is_enabled():
+        if not is_enabled(ENABLE_DASHBOARD_RECOMMENDATIONS):
             return Response(status=404)
 
         user_id = request.user.id
+        deadline = Deadline.for_view(self)
 
-        if is_user_enrolled_in_ut_austin_masters_program(request.user):
+        with timed("ut_austin"):
+            is_ut_austin_learner = is_user_enrolled_in_ut_austin_masters_program(request.user)
+        if is_ut_austin_learner:
             return self._recommendations_response(user_id, None, [], False)
 
-        fallback_recommendations = settings.GENERAL_RECOMMENDATIONS if FALLBACK_RECOMMENDATIONS.is_enabled() else []
+        fallback_recommendations = settings.GENERAL_RECOMMENDATIONS if is_enabled(FALLBACK_RECOMMENDATIONS) else []
 
         try:
-            is_control, has_is_control, course_keys = get_amplitude_course_recommendations(
-                user_id, settings.LEARNER_DASHBOARD_AMPLITUDE_MODEL_ID
-            )
+            deadline.check("program_enrollments")
+            with timed("amplitude"):
+                is_control, has_is_control, course_keys = get_materialized_amplitude_course_recommendations(
+                    user_id, settings.LEARNER_DASHBOARD_AMPLITUDE_MODEL_ID, deadline=deadline
+                )
         except Exception as ex:  # pylint: disable=broad-except
             log.warning(f"Cannot get recommendations from Amplitude: {ex}")
             return self._recommendations_response(user_id, None, fallback_recommendations, False)
@@ -166,14 +194,10 @@ class LearnerDashboardRecommendationsView(APIView):
         if is_control or is_control is None or not course_keys:
             return self._recommendations_response(user_id, is_control, fallback_recommendations, False)
 
-        ip_address = get_client_ip(request)[0]
-        user_country_code = country_code_from_ip(ip_address).upper()
-        filtered_courses = filter_recommended_courses(
-            request.user,
-            course_keys,
-            user_country_code=user_country_code,
-            recommendation_count=5,
-        )
+        with timed("filter"):
+            filtered_courses = self.filter_recommendations(
+                request.user, course_keys, get_lazy_country_code(request), deadline=deadline
+            )
         # If no courses are left after filtering already enrolled courses from
         # the list of amplitude recommendations, show general recommendations
         # to the user.
@@ -189,9 +213,9 @@ class LearnerDashboardRecommendationsView(APIView):
         """
         Emits an event to track Learner Home page visits.
         """
-        segment.track(
+        track_event(
             user_id,
-            "edx.bi.user.recommendations.viewed",
+            RECOMMENDATIONS_VIEWED_EVENT,
             {
                 "is_control": is_control,
                 "amplitude_recommendations": amplitude_recommendations,
@@ -208,18 +232,18 @@ class LearnerDashboardRecommendationsView(APIView):
         """
         Helper method for general recommendations response.
         """
-        self._emit_recommendations_viewed_event(
-            user_id, is_control, recommended_courses, amplitude_recommendations
-        )
-        return Response(
-            DashboardRecommendationsSerializer(
+        with timed("events"):
+            self._emit_recommendations_viewed_event(
+                user_id, is_control, recommended_courses, amplitude_recommendations
+            )
+        with timed("render"):
+            data = render_dashboard_recommendations(
                 {
                     "courses": recommended_courses,
                     "is_control": is_control,
                 }
-            ).data,
-            status=200,
-        )
+            )
+        return Response(data, status=200)
 
     def _course_data(self, course):
         """
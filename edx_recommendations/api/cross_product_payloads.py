@@ -0,0 +1,157 @@
+"""
+Precomputed CrossProductRecommendationsView payloads.
+
+The cross product recommendations of a course only depend on settings.CROSS_PRODUCT_RECOMMENDATIONS_KEYS,
+catalog data and the user's country, so they are rendered ahead of time by the
+build_cross_product_recommendations command. Countries are bucketed: only the countries named in
+the location restrictions of a source course's associated courses get their own payload, every
+other country shares OTHER_COUNTRIES_BUCKET and requests without a country use NO_COUNTRY_BUCKET.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from edx_recommendations.api.catalog import exclude_unservable_course_keys, get_courses_data
+from edx_recommendations.api.fast_serializers import render_cross_product_recommendations
+from edx_recommendations.api.fragments import CATALOG_VERSION_FIELD
+from edx_recommendations.api.restrictions import COUNTRY_RESTRICTION_FIELD, get_country_restriction
+from edx_recommendations.api.utils import (
+    _has_country_restrictions,
+    get_active_course_run,
+    get_cross_product_recommendations,
+)
+
+CROSS_PRODUCT_PAYLOAD_CACHE_KEY_PREFIX = "edx_recommendations.cross_product_payload"
+NO_COUNTRY_BUCKET = ""
+# Not an ISO country code, so it is outside every allow and block list.
+OTHER_COUNTRIES_BUCKET = "*"
+
+CROSS_PRODUCT_COURSE_FIELDS = [
+    "key",
+    "uuid",
+    "title",
+    "owners",
+    "image",
+    "url_slug",
+    "course_type",
+    "course_runs",
+    "location_restriction",
+    "advertised_course_run_uuid",
+]
+
+
+def get_cross_product_courses(associated_course_keys, timeout=None):
+    """
+    Returns the hydrated associated courses that have course runs.
+    """
+    course_data = get_courses_data(
+        exclude_unservable_course_keys(associated_course_keys), CROSS_PRODUCT_COURSE_FIELDS, timeout=timeout
+    )
+    return [course for course in course_data if course and course.get("course_runs")]
+
+
+def get_unrestricted_cross_product_courses(courses, user_country_code):
+    """
+    Returns the courses available in user_country_code that have an active course run, with that
+    run set as their active_course_run.
+    """
+    unrestricted_courses = []
+    for course in courses:
+        if _has_country_restrictions(course, user_country_code):
+            continue
+
+        active_course_run = get_active_course_run(course)
+        if active_course_run:
+            course.update({"active_course_run": active_course_run})
+            unrestricted_courses.append(course)
+    return unrestricted_courses
+
+
+def _payload_cache_key(course_key):
+    return f"{CROSS_PRODUCT_PAYLOAD_CACHE_KEY_PREFIX}.{course_key}"
+
+
+def _fingerprint(associated_course_keys, courses):
+    """
+    Returns a digest of everything a source course's payloads are rendered from.
+    """
+    catalog_data = [
+        {
+            field: value for field, value in course.items()
+            if field not in (COUNTRY_RESTRICTION_FIELD, CATALOG_VERSION_FIELD)
+        }
+        for course in courses
+    ]
+    content = json.dumps([associated_course_keys, catalog_data], sort_keys=True, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def render_cross_product_payloads(courses):
+    """
+    Returns {country bucket: rendered response body} for the hydrated courses of one source course.
+
+    When every bucket renders the same body, only OTHER_COUNTRIES_BUCKET is returned.
+    """
+    countries = set()
+    for course in courses:
+        restriction = get_country_restriction(course)
+        countries |= restriction.allowed_countries | restriction.blocked_countries
+
+    renderer = JSONRenderer()
+    payloads = {
+        bucket: renderer.render(
+            render_cross_product_recommendations(
+                {"courses": get_unrestricted_cross_product_courses(courses, bucket)}
+            )
+        )
+        for bucket in countries | {NO_COUNTRY_BUCKET, OTHER_COUNTRIES_BUCKET}
+    }
+    # Payloads that do not depend on the country are kept once, so serving them needs no geo lookup.
+    if len(set(payloads.values())) == 1:
+        return {OTHER_COUNTRIES_BUCKET: payloads[OTHER_COUNTRIES_BUCKET]}
+    return payloads
+
+
+def build_cross_product_payloads(course_key, force=False):
+    """
+    Renders and stores the payloads of a source course unless its catalog data is unchanged.
+
+    Returns:
+        True if the payloads were rebuilt, False if the stored ones were kept.
+    """
+    cache_key = _payload_cache_key(course_key)
+    timeout = settings.RECOMMENDATIONS_CROSS_PRODUCT_PAYLOAD_TIMEOUT
+    associated_course_keys = get_cross_product_recommendations(course_key) or []
+    courses = get_cross_product_courses(associated_course_keys)
+    fingerprint = _fingerprint(associated_course_keys, courses)
+
+    stored = cache.get(cache_key)
+    if not force and stored and stored["fingerprint"] == fingerprint:
+        cache.touch(cache_key, timeout)
+        return False
+
+    cache.set(
+        cache_key,
+        {"fingerprint": fingerprint, "payloads": render_cross_product_payloads(courses)},
+        timeout,
+    )
+    return True
+
+
+def get_cross_product_payload(course_key, user_country_code):
+    """
+    Returns the stored response body for a source course and country, or None if it was not built.
+    """
+    stored = cache.get(_payload_cache_key(course_key))
+    if not stored:
+        return None
+
+    payloads = stored["payloads"]
+    if len(payloads) == 1:
+        return payloads[OTHER_COUNTRIES_BUCKET]
+    if not user_country_code:
+        return payloads[NO_COUNTRY_BUCKET]
+    return payloads.get(user_country_code, payloads[OTHER_COUNTRIES_BUCKET])
@@ -4,31 +4,37 @@ APIs to get cross product recommendations.
 
 import logging
 from django.conf import settings
+from django.http import HttpResponse
 from edx_rest_framework_extensions.auth.jwt.authentication import JwtAuthentication
 from edx_rest_framework_extensions.auth.session.authentication import (
     SessionAuthenticationAllowInactiveUser,
 )
 from edx_rest_framework_extensions.permissions import NotJwtRestrictedApplication
-from ipware.ip import get_client_ip
 from opaque_keys.edx.keys import CourseKey
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from openedx.core.djangoapps.catalog.utils import get_course_data
-from openedx.core.djangoapps.geoinfo.api import country_code_from_ip
-
-from edx_recommendations.api.serializers import (
-    CrossProductAndAmplitudeRecommendationsSerializer,
-    CrossProductRecommendationsSerializer,
-    AmplitudeRecommendationsSerializer,
+from edx_recommendations.api.fast_serializers import render_cross_product_recommendations
+from edx_recommendations.api.fragments import (
+    render_amplitude_recommendations_response,
+    render_cross_product_and_amplitude_recommendations_response,
+)
+from edx_recommendations.api.catalog import exclude_unservable_course_keys, get_courses_data
+from edx_recommendations.api.concurrency import get_executor, submit
+from edx_recommendations.api.cross_product_payloads import (
+    get_cross_product_courses,
+    get_cross_product_payload,
+    get_unrestricted_cross_product_courses,
 )
+from edx_recommendations.api.deadline import Deadline
+from edx_recommendations.api.geoip import get_lazy_country_code
+from edx_recommendations.api.result_cache import get_filtered_recommendations
+from edx_recommendations.api.timing import timed, timed_view
 from edx_recommendations.api.utils import (
     _has_country_restrictions,
-    get_amplitude_course_recommendations,
-    filter_recommended_courses,
+    get_materialized_amplitude_course_recommendations,
     get_cross_product_recommendations,
-    get_active_course_run,
 )
 
 log = logging.getLogger(__name__)
@@ -41,13 +47,18 @@ class CrossProductRecommendationsView(APIView):
     GET api/edx_recommendations//cross_product/{course_id}/
     """
 
+    # Seconds all upstream calls of a request may take, overridable by settings.RECOMMENDATIONS_LATENCY_BUDGETS.
+    latency_budget = None
+
     def _empty_response(self):
         return Response({"courses": []}, status=200)
 
+    @timed_view
     def get(self, request, course_id):
         """
         Returns cross product recommendation courses
         """
+        deadline = Deadline.for_view(self)
         course_locator = CourseKey.from_string(course_id)
         course_key = f"{course_locator.org}+{course_locator.course}"
 
@@ -56,44 +67,32 @@ class CrossProductRecommendationsView(APIView):
         if not associated_course_keys:
             return self._empty_response()
 
-        fields = [
-            "key",
-            "uuid",
-            "title",
-            "owners",
-            "image",
-            "url_slug",
-            "course_type",
-            "course_runs",
-            "location_restriction",
-            "advertised_course_run_uuid",
-        ]
-        course_data = [get_course_data(key, fields) for key in associated_course_keys]
-        filtered_courses = [course for course in course_data if course and course.get("course_runs")]
-
-        ip_address = get_client_ip(request)[0]
-        user_country_code = country_code_from_ip(ip_address).upper()
-
-        unrestricted_courses = []
-
-        for course in filtered_courses:
-            if _has_country_restrictions(course, user_country_code):
-                continue
-
-            active_course_run = get_active_course_run(course)
-            if active_course_run:
-                course.update({"active_course_run": active_course_run})
-                unrestricted_courses.append(course)
+        user_country_code = get_lazy_country_code(request)
+
+        with timed("payload"):
+            payload = get_cross_product_payload(course_key, user_country_code)
+        if payload is not None:
+            return HttpResponse(payload, content_type="application/json", status=200)
+
+        with timed("catalog"):
+            filtered_courses = get_cross_product_courses(
+                associated_course_keys,
+                timeout=deadline.cap(settings.RECOMMENDATIONS_CATALOG_FETCH_TIMEOUT),
+            )
+        if deadline.expired():
+            deadline.exhaust("catalog")
+
+        with timed("restrictions"):
+            unrestricted_courses = get_unrestricted_cross_product_courses(filtered_courses, user_country_code)
 
         if not unrestricted_courses:
             return self._empty_response()
 
-        return Response(
-            CrossProductRecommendationsSerializer(
+        with timed("render"):
+            data = render_cross_product_recommendations(
                 {"courses": unrestricted_courses}
-            ).data,
-            status=200,
-        )
+            )
+        return Response(data, status=200)
 
 
 class ProductRecommendationsView(APIView):
@@ -110,6 +109,10 @@ class ProductRecommendationsView(APIView):
     )
     permission_classes = (IsAuthenticated, NotJwtRestrictedApplication)
 
+    recommendations_count = 4
+    # Seconds all upstream calls of a request may take, overridable by settings.RECOMMENDATIONS_LATENCY_BUDGETS.
+    latency_budget = None
+
     fields = [
         "title",
         "owners",
@@ -120,7 +123,23 @@ class ProductRecommendationsView(APIView):
         "location_restriction",
     ]
 
-    def _get_amplitude_recommendations(self, user, user_country_code):
+    @classmethod
+    def filter_recommendations(cls, user, course_keys, user_country_code, deadline=None):
+        """
+        Returns the filtered Amplitude recommendations shown to user, through the recommendation result cache.
+        """
+        return get_filtered_recommendations(
+            "product",
+            user,
+            settings.LEARNER_DASHBOARD_AMPLITUDE_MODEL_ID,
+            course_keys,
+            user_country_code=user_country_code,
+            recommendation_count=cls.recommendations_count,
+            course_fields=cls.fields,
+            deadline=deadline,
+        )
+
+    def _get_amplitude_recommendations(self, user, user_country_code, deadline=None):
         """
         Helper for getting amplitude recommendations
         """
@@ -128,9 +147,10 @@ class ProductRecommendationsView(APIView):
         fallback_recommendations = settings.GENERAL_RECOMMENDATIONS[0:4]
 
         try:
-            _, _, course_keys = get_amplitude_course_recommendations(
-                user.id, settings.LEARNER_DASHBOARD_AMPLITUDE_MODEL_ID
-            )
+            with timed("amplitude"):
+                _, _, course_keys = get_materialized_amplitude_course_recommendations(
+                    user.id, settings.LEARNER_DASHBOARD_AMPLITUDE_MODEL_ID, deadline=deadline
+                )
         except Exception as ex:  # pylint: disable=broad-except
             log.warning(f"Cannot get recommendations from Amplitude: {ex}")
             return fallback_recommendations
@@ -138,27 +158,30 @@ class ProductRecommendationsView(APIView):
         if not course_keys:
             return fallback_recommendations
 
-        filtered_courses = filter_recommended_courses(
-            user,
-            course_keys,
-            recommendation_count=4,
-            user_country_code=user_country_code,
-            course_fields=self.fields,
-        )
+        with timed("filter"):
+            filtered_courses = self.filter_recommendations(user, course_keys, user_country_code, deadline=deadline)
 
         return filtered_courses if len(filtered_courses) > 0 else fallback_recommendations
 
-    def _get_cross_product_recommendations(self, course_key, user_country_code):
+    def _get_cross_product_recommendations(self, course_key, user_country_code, deadline=None):
         """
         Helper for getting cross product recommendations
         """
+        deadline = deadline or Deadline()
 
         associated_course_keys = get_cross_product_recommendations(course_key)
 
         if not associated_course_keys:
             return []
 
-        course_data = [get_course_data(key, self.fields) for key in associated_course_keys]
+        with timed("cross_product_catalog"):
+            course_data = get_courses_data(
+                exclude_unservable_course_keys(associated_course_keys),
+                self.fields,
+                timeout=deadline.cap(settings.RECOMMENDATIONS_CATALOG_FETCH_TIMEOUT),
+            )
+        if deadline.expired():
+            deadline.exhaust("catalog")
         filtered_cross_product_courses = []
 
         for course in course_data:
@@ -171,49 +194,59 @@ class ProductRecommendationsView(APIView):
 
         return filtered_cross_product_courses
 
-    def _cross_product_recommendations_response(self, course_key, user, user_country_code):
+    def _cross_product_recommendations_response(self, course_key, user, user_country_code, deadline=None):
         """
         Helper for collecting and forming a response for
         cross product and Amplitude recommendations
+
+        With RECOMMENDATIONS_VIEW_WORKERS > 1 the cross product courses are hydrated on a pool
+        thread while the Amplitude pipeline runs on the request thread.
         """
-        amplitude_recommendations = self._get_amplitude_recommendations(user, user_country_code)
-        cross_product_recommendations = self._get_cross_product_recommendations(course_key, user_country_code)
-
-        return Response(
-            CrossProductAndAmplitudeRecommendationsSerializer(
-                {
-                    "crossProductCourses": cross_product_recommendations,
-                    "amplitudeCourses": amplitude_recommendations,
-                }
-            ).data,
-            status=200,
-        )
+        if settings.RECOMMENDATIONS_VIEW_WORKERS <= 1:
+            amplitude_recommendations = self._get_amplitude_recommendations(user, user_country_code, deadline)
+            cross_product_recommendations = self._get_cross_product_recommendations(
+                course_key, user_country_code, deadline
+            )
+        else:
+            executor = get_executor("product_recommendations", settings.RECOMMENDATIONS_VIEW_WORKERS)
+            cross_product_future = submit(
+                executor, self._get_cross_product_recommendations, course_key, user_country_code, deadline
+            )
+            amplitude_recommendations = self._get_amplitude_recommendations(user, user_country_code, deadline)
+            with timed("cross_product_wait"):
+                cross_product_recommendations = cross_product_future.result()
 
-    def _amplitude_recommendations_response(self, user, user_country_code):
+        with timed("render"):
+            content = render_cross_product_and_amplitude_recommendations_response(
+                cross_product_recommendations, amplitude_recommendations
+            )
+        return HttpResponse(content, content_type="application/json", status=200)
+
+    def _amplitude_recommendations_response(self, user, user_country_code, deadline=None):
         """
         Helper for collecting and forming a response for Amplitude recommendations only
         """
-        amplitude_recommendations = self._get_amplitude_recommendations(user, user_country_code)
+        amplitude_recommendations = self._get_amplitude_recommendations(user, user_country_code, deadline)
 
-        return Response(
-            AmplitudeRecommendationsSerializer(
-                {"amplitudeCourses": amplitude_recommendations}
-            ).data,
-            status=200,
-        )
+        with timed("render"):
+            content = render_amplitude_recommendations_response(amplitude_recommendations)
+        return HttpResponse(content, content_type="application/json", status=200)
 
+    @timed_view
     def get(self, request, course_id=None):
         """
         Returns cross product and Amplitude recommendation courses if a course id is included,
         otherwise, returns only Amplitude recommendations
         """
 
-        ip_address = get_client_ip(request)[0]
-        user_country_code = country_code_from_ip(ip_address).upper()
+        deadline = Deadline.for_view(self)
+        user_country_code = get_lazy_country_code(request)
 
         if course_id:
             course_locator = CourseKey.from_string(course_id)
             course_key = f'{course_locator.org}+{course_locator.course}'
-            return self._cross_product_recommendations_response(course_key, request.user, user_country_code)
+            return self._cross_product_recommendations_response(
+                course_key, request.user, user_country_code, deadline
+            )
 
-        return self._amplitude_recommendations_response(request.user, user_country_code)
+        return self._amplitude_recommendations_response(request.user, user_country_code, deadline)
@@ -0,0 +1,83 @@
+"""
+Latency budget shared by all upstream calls made while serving one recommendations request.
+"""
+import logging
+import time
+
+from django.conf import settings
+from edx_django_utils.monitoring import set_custom_attribute
+
+log = logging.getLogger(__name__)
+
+# Socket timeouts must be positive, so capped timeouts never go below this many seconds.
+MINIMUM_TIMEOUT = 0.001
+
+
+class DeadlineExceeded(Exception):
+    """
+    Raised when the latency budget of a request is used up.
+    """
+
+    def __init__(self, stage):
+        super().__init__(f"Recommendations latency budget exhausted by {stage}")
+        self.stage = stage
+
+
+class Deadline:
+    """
+    Tracks the remaining latency budget of a request.
+
+    A Deadline without a budget never expires, so callers can pass one unconditionally.
+    """
+
+    def __init__(self, budget=None):
+        self.budget = budget
+        self.expires_at = None if budget is None else time.monotonic() + budget
+        self.exhausted_by = None
+
+    @classmethod
+    def for_view(cls, view):
+        """
+        Returns a Deadline for the view, budgeted by RECOMMENDATIONS_LATENCY_BUDGETS[view class name]
+        or, failing that, the view's latency_budget attribute.
+        """
+        budget = settings.RECOMMENDATIONS_LATENCY_BUDGETS.get(
+            type(view).__name__, getattr(view, "latency_budget", None)
+        )
+        return cls(budget)
+
+    def remaining(self):
+        """
+        Returns the seconds left in the budget, or None if there is no budget.
+        """
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0)
+
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def cap(self, timeout):
+        """
+        Returns timeout shortened to the remaining budget, but no shorter than MINIMUM_TIMEOUT.
+        """
+        remaining = self.remaining()
+        return timeout if remaining is None else max(min(timeout, remaining), MINIMUM_TIMEOUT)
+
+    def exhaust(self, stage):
+        """
+        Records stage as the one that used up the budget, unless an earlier stage already did.
+        """
+        if self.exhausted_by is not None:
+            return
+        self.exhausted_by = stage
+        log.info(f"Recommendations latency budget of {self.budget}s exhausted by {stage}")
+        set_custom_attribute("recommendations_budget_exhausted_by", stage)
+
+    def check(self, stage):
+        """
+        Raises DeadlineExceeded, blaming stage, if the budget is used up.
+        """
+        if self.expired():
+            self.exhaust(stage)
+            raise DeadlineExceeded(stage)
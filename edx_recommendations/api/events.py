@@ -0,0 +1,182 @@
+"""
+Asynchronous, batched emission of recommendation tracking events.
+
+Views enqueue events on a bounded in-process queue and a daemon thread sends them to segment in
+batches, so tracking latency and failures never count against a recommendations request. The
+eventtracking context of the request (IP, user agent, page, ...) is captured when an event is
+enqueued and re-entered when it is sent, so segment sees the same context as an inline call.
+
+When the queue is full, enqueueing waits up to RECOMMENDATIONS_EVENT_ENQUEUE_TIMEOUT seconds and
+then drops the event; dropped events are counted. Queued events are flushed when the worker
+process exits. A RECOMMENDATIONS_EVENT_QUEUE_SIZE of 0 sends events inline.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from edx_django_utils.monitoring import set_custom_attribute
+from eventtracking import tracker
+
+from common.djangoapps.track import segment
+
+log = logging.getLogger(__name__)
+
+RECOMMENDATIONS_VIEWED_EVENT = "edx.bi.user.recommendations.viewed"
+TRACKING_CONTEXT_NAME = "edx_recommendations.queued_event"
+
+
+class EventQueue:
+    """
+    Bounded queue of segment events drained in batches by a daemon thread.
+    """
+
+    COUNTERS = ("enqueued", "sent", "failed", "dropped")
+
+    def __init__(self, max_size, batch_size, flush_interval, enqueue_timeout=0):
+        self.max_size = max_size
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.COUNTERS, 0)
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    def _increment(self, counter, count=1):
+        with self._lock:
+            self._counts[counter] += count
+            return self._counts[counter]
+
+    def stats(self):
+        """
+        Returns the event counters along with the number of events waiting to be sent.
+        """
+        with self._lock:
+            stats = dict(self._counts)
+        stats["queued"] = self._queue.qsize() if self._queue is not None else 0
+        return stats
+
+    def _ensure_started(self):
+        """
+        Starts the flusher thread, again in every process forked after the previous start.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(self.max_size)
+            self._thread = threading.Thread(target=self._run, name="edx_recommendations-events", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def enqueue(self, user_id, event_name, properties):
+        """
+        Queues an event to be sent to segment, returning False if it was dropped because the queue is full.
+        """
+        self._ensure_started()
+        event = (user_id, event_name, properties, tracker.get_tracker().resolve_context())
+        try:
+            if self.enqueue_timeout > 0:
+                self._queue.put(event, timeout=self.enqueue_timeout)
+            else:
+                self._queue.put_nowait(event)
+        except queue.Full:
+            dropped = self._increment("dropped")
+            set_custom_attribute("recommendations_events_dropped", dropped)
+            # Log the first drop and then every hundredth, to keep a full queue from flooding the logs.
+            if dropped % 100 == 1:
+                log.warning(f"Recommendations event queue is full, {dropped} events dropped so far")
+            return False
+
+        self._increment("enqueued")
+        return True
+
+    def _next_batch(self):
+        """
+        Waits for an event, then collects up to batch_size events for at most flush_interval seconds.
+        """
+        batch = [self._queue.get()]
+        flush_at = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get(timeout=max(flush_at - time.monotonic(), 0)))
+            except queue.Empty:
+                break
+        return batch
+
+    def _send(self, batch):
+        for user_id, event_name, properties, context in batch:
+            try:
+                with tracker.get_tracker().context(TRACKING_CONTEXT_NAME, context):
+                    segment.track(user_id, event_name, properties)
+                self._increment("sent")
+            except Exception as err:  # pylint: disable=broad-except
+                self._increment("failed")
+                log.warning(f"Failed to send {event_name} event for {user_id} due to: {err}")
+
+    def _run(self):
+        events = self._queue
+        while True:
+            batch = self._next_batch()
+            self._send(batch)
+            for _ in batch:
+                events.task_done()
+
+    def flush(self, timeout=None):
+        """
+        Sends the queued events on the calling thread, giving up after timeout seconds.
+        """
+        if self._pid != os.getpid():
+            return
+        flush_until = None if timeout is None else time.monotonic() + timeout
+        while flush_until is None or time.monotonic() < flush_until:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._send(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+
+_event_queue = None
+_event_queue_lock = threading.Lock()
+
+
+def get_event_queue():
+    """
+    Returns the process-wide event queue, creating it on first use.
+    """
+    global _event_queue  # pylint: disable=global-statement
+
+    if _event_queue is None:
+        with _event_queue_lock:
+            if _event_queue is None:
+                _event_queue = EventQueue(
+                    settings.RECOMMENDATIONS_EVENT_QUEUE_SIZE,
+                    settings.RECOMMENDATIONS_EVENT_BATCH_SIZE,
+                    settings.RECOMMENDATIONS_EVENT_FLUSH_INTERVAL,
+                    settings.RECOMMENDATIONS_EVENT_ENQUEUE_TIMEOUT,
+                )
+                atexit.register(_event_queue.flush, settings.RECOMMENDATIONS_EVENT_SHUTDOWN_FLUSH_TIMEOUT)
+    return _event_queue
+
+
+def track_event(user_id, event_name, properties):
+    """
+    Sends a segment event without blocking the request, or inline if the event queue is disabled.
+    """
+    if settings.RECOMMENDATIONS_EVENT_QUEUE_SIZE <= 0:
+        segment.track(user_id, event_name, properties)
+        return
+    get_event_queue().enqueue(user_id, event_name, properties)
@@ -0,0 +1,173 @@
+"""
+Plain-function equivalents of the serializers in edx_recommendations.api.serializers.
+
+The recommendation APIs only serialize trusted catalog data, so the DRF field machinery is not
+needed to render it. Each render_* function returns exactly what the `.data` of the matching
+serializer returns (same keys, key order and values, including None handling), which
+tests/test_fast_serializers.py checks for every response shape.
+"""
+
+_TRUE_VALUES = {"t", "T", "y", "Y", "yes", "Yes", "YES", "true", "True", "TRUE", "on", "On", "ON", "1", 1, True}
+_FALSE_VALUES = {
+    "f", "F", "n", "N", "no", "No", "NO", "false", "False", "FALSE", "off", "Off", "OFF", "0", 0, 0.0, False
+}
+
+
+def _string(value):
+    """
+    Renders a CharField, URLField or UUIDField value.
+    """
+    return None if value is None else str(value)
+
+
+def _boolean(value):
+    """
+    Renders a BooleanField value.
+    """
+    if value is None:
+        return None
+    if value in _TRUE_VALUES:
+        return True
+    if value in _FALSE_VALUES:
+        return False
+    return bool(value)
+
+
+def _nested(render, value):
+    return None if value is None else render(value)
+
+
+def _many(render, values):
+    return None if values is None else [None if value is None else render(value) for value in values]
+
+
+def _prospectus_path(course):
+    return f"course/{course.get('url_slug')}"
+
+
+def render_active_course_run(course_run):
+    """
+    Renders like ActiveCourseRunSerializer.
+    """
+    return {
+        "key": _string(course_run["key"]),
+        "marketingUrl": _string(course_run["marketing_url"]),
+    }
+
+
+def render_course_owner(owner):
+    """
+    Renders like CourseOwnersSerializer.
+    """
+    return {
+        "key": _string(owner["key"]),
+        "name": _string(owner["name"]),
+        "logoImageUrl": _string(owner["logo_image_url"]),
+    }
+
+
+def render_course_image(image):
+    """
+    Renders like CourseImageSerializer.
+    """
+    return {"src": _string(image["src"])}
+
+
+def render_recommended_course(course):
+    """
+    Renders like RecommendedCourseSerializer.
+    """
+    return {
+        "key": _string(course["key"]),
+        "uuid": _string(course["uuid"]),
+        "title": _string(course["title"]),
+        "image": _nested(render_course_image, course["image"]),
+        "prospectusPath": _prospectus_path(course),
+        "owners": _many(render_course_owner, course["owners"]),
+        "activeCourseRun": _nested(render_active_course_run, course["active_course_run"]),
+    }
+
+
+def render_about_page_product_course(course):
+    """
+    Renders like AboutPageProductRecommendationsSerializer.
+    """
+    return {
+        "key": _string(course["key"]),
+        "uuid": _string(course["uuid"]),
+        "title": _string(course["title"]),
+        "image": _nested(render_course_image, course["image"]),
+        "prospectusPath": _prospectus_path(course),
+        "owners": _many(render_course_owner, course["owners"]),
+        "activeCourseRun": _nested(render_active_course_run, course["active_course_run"]),
+        "courseType": _string(course["course_type"]),
+    }
+
+
+def render_learner_dashboard_product_course(course):
+    """
+    Renders like LearnerDashboardProductRecommendationsSerializer.
+    """
+    return {
+        "title": _string(course["title"]),
+        "image": _nested(render_course_image, course["image"]),
+        "prospectusPath": _prospectus_path(course),
+        "owners": _many(render_course_owner, course["owners"]),
+        "courseType": _string(course["course_type"]),
+    }
+
+
+def render_dashboard_course(course):
+    """
+    Renders like CourseSerializer.
+    """
+    return {
+        "courseKey": _string(course["course_key"]),
+        "logoImageUrl": _string(course["logo_image_url"]),
+        "marketingUrl": _string(course["marketing_url"]),
+        "title": _string(course["title"]),
+    }
+
+
+def render_about_page_recommendations(data):
+    """
+    Renders like AboutPageRecommendationsSerializer.
+    """
+    return {
+        "courses": _many(render_recommended_course, data["courses"]),
+        "isControl": _boolean(data.get("is_control")),
+    }
+
+
+def render_cross_product_recommendations(data):
+    """
+    Renders like CrossProductRecommendationsSerializer.
+    """
+    return {"courses": _many(render_about_page_product_course, data["courses"])}
+
+
+def render_amplitude_recommendations(data):
+    """
+    Renders like AmplitudeRecommendationsSerializer.
+    """
+    return {"amplitudeCourses": _many(render_learner_dashboard_product_course, data["amplitudeCourses"])}
+
+
+def render_cross_product_and_amplitude_recommendations(data):
+    """
+    Renders like CrossProductAndAmplitudeRecommendationsSerializer.
+    """
+    return {
+        "crossProductCourses": _many(render_learner_dashboard_product_course, data["crossProductCourses"]),
+        "amplitudeCourses": _many(render_learner_dashboard_product_course, data["amplitudeCourses"]),
+    }
+
+
+def render_dashboard_recommendations(data):
+    """
+    Renders like DashboardRecommendationsSerializer.
+    """
+    return {
+        "courses": _many(render_dashboard_course, data["courses"]),
+        "isControl": _boolean(data.get("is_control")),
+    }
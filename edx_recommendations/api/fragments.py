@@ -0,0 +1,194 @@
+"""
+Cache of rendered per-course response fragments.
+
+The same recommended courses appear in many responses, so the rendered JSON of a course is kept
+per response shape and catalog version, and responses are assembled by joining the cached
+fragments into the per-user envelope. get_courses_data attaches the catalog version of a course
+under CATALOG_VERSION_FIELD; it changes whenever the course's catalog data does, so fragments
+never need invalidating and outdated ones simply age out of the LRU.
+
+Only shapes rendered purely from catalog data may be cached here. Courses without a catalog
+version, such as GENERAL_RECOMMENDATIONS, are rendered on every request.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from edx_django_utils.monitoring import set_custom_attribute
+from rest_framework.renderers import JSONRenderer
+
+from edx_recommendations.api.fast_serializers import (
+    _boolean,
+    render_learner_dashboard_product_course,
+    render_recommended_course,
+)
+
+CATALOG_VERSION_FIELD = "_catalog_version"
+
+ABOUT_PAGE_COURSE = "about_page_course"
+LEARNER_DASHBOARD_PRODUCT_COURSE = "learner_dashboard_product_course"
+
+_COURSE_RENDERERS = {
+    ABOUT_PAGE_COURSE: render_recommended_course,
+    LEARNER_DASHBOARD_PRODUCT_COURSE: render_learner_dashboard_product_course,
+}
+
+
+class FragmentCache:
+    """
+    Thread-safe, size-bounded LRU of rendered course fragments.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+            return fragment
+
+    def set(self, key, fragment):
+        """
+        Stores fragment under key, evicting the least recently used fragments beyond max_size.
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._fragments[key] = fragment
+            self._fragments.move_to_end(key)
+            while len(self._fragments) > self.max_size:
+                self._fragments.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._fragments.clear()
+
+    def __len__(self):
+        return len(self._fragments)
+
+
+_fragment_cache = None
+_fragment_cache_lock = threading.Lock()
+
+
+def get_fragment_cache():
+    """
+    Returns the process-local fragment cache, creating it on first use.
+    """
+    global _fragment_cache  # pylint: disable=global-statement
+
+    if _fragment_cache is None:
+        with _fragment_cache_lock:
+            if _fragment_cache is None:
+                _fragment_cache = FragmentCache(settings.RECOMMENDATIONS_FRAGMENT_CACHE_SIZE)
+    return _fragment_cache
+
+
+def _render_value(value):
+    """
+    Renders a JSON value exactly like JSONRenderer, including None, which JSONRenderer turns into b"".
+    """
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def render_course_list(shape, courses, counts):
+    """
+    Returns the rendered JSON list of courses in the given shape, reusing cached course fragments.
+
+    Fragment cache hits and misses are added to counts.
+    """
+    if courses is None:
+        return b"null"
+
+    render = _COURSE_RENDERERS[shape]
+    renderer = JSONRenderer()
+    fragment_cache = get_fragment_cache()
+    fragments = []
+    for course in courses:
+        if course is None:
+            fragments.append(b"null")
+            continue
+
+        version = course.get(CATALOG_VERSION_FIELD)
+        if version is None:
+            fragments.append(renderer.render(render(course)))
+            continue
+
+        key = (shape, version)
+        fragment = fragment_cache.get(key)
+        if fragment is None:
+            counts["misses"] += 1
+            fragment = renderer.render(render(course))
+            fragment_cache.set(key, fragment)
+        else:
+            counts["hits"] += 1
+        fragments.append(fragment)
+    return b"[" + b",".join(fragments) + b"]"
+
+
+def _render_response(members, counts):
+    """
+    Returns the rendered JSON object of the (name, rendered JSON value) pairs in members.
+    """
+    for counter, count in counts.items():
+        set_custom_attribute(f"fragment_cache_{counter}", count)
+    return b"{" + b",".join(_render_value(name) + b":" + value for name, value in members) + b"}"
+
+
+def render_about_page_recommendations_response(courses, is_control):
+    """
+    Returns the same bytes as rendering render_about_page_recommendations with JSONRenderer.
+    """
+    counts = {"hits": 0, "misses": 0}
+    return _render_response([
+        ("courses", render_course_list(ABOUT_PAGE_COURSE, courses, counts)),
+        ("isControl", _render_value(_boolean(is_control))),
+    ], counts)
+
+
+def render_amplitude_recommendations_response(amplitude_courses):
+    """
+    Returns the same bytes as rendering render_amplitude_recommendations with JSONRenderer.
+    """
+    counts = {"hits": 0, "misses": 0}
+    return _render_response([
+        ("amplitudeCourses", render_course_list(LEARNER_DASHBOARD_PRODUCT_COURSE, amplitude_courses, counts)),
+    ], counts)
+
+
+def render_cross_product_and_amplitude_recommendations_response(cross_product_courses, amplitude_courses):
+    """
+    Returns the same bytes as rendering render_cross_product_and_amplitude_recommendations with JSONRenderer.
+    """
+    counts = {"hits": 0, "misses": 0}
+    return _render_response([
+        ("crossProductCourses", render_course_list(LEARNER_DASHBOARD_PRODUCT_COURSE, cross_product_courses, counts)),
+        ("amplitudeCourses", render_course_list(LEARNER_DASHBOARD_PRODUCT_COURSE, amplitude_courses, counts)),
+    ], counts)
+
+
+def render_bulk_recommendations_record(user_id, amplitude_courses, counts):
+    """
+    Returns one NDJSON record of the bulk recommendations endpoint: the user id and the same
+    amplitudeCourses as render_amplitude_recommendations_response, followed by a newline.
+
+    Fragment cache hits and misses are added to counts.
+    """
+    return b"{" + b",".join([
+        _render_value("userId") + b":" + _render_value(user_id),
+        _render_value("amplitudeCourses") + b":" + render_course_list(
+            LEARNER_DASHBOARD_PRODUCT_COURSE, amplitude_courses, counts
+        ),
+    ]) + b"}\n"
+
+
+def render_bulk_recommendations_error(user_id, error):
+    """
+    Returns the NDJSON record of a user the bulk recommendations endpoint could not serve.
+    """
+    return _render_value({"userId": user_id, "error": error}) + b"\n"
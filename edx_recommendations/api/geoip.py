@@ -0,0 +1,128 @@
+"""
+Cached, lazily evaluated country lookups for request IP addresses.
+
+Country codes are cached in a process-local LRU for RECOMMENDATIONS_GEOIP_CACHE_TIMEOUT seconds.
+Addresses can be bucketed by network prefix with RECOMMENDATIONS_GEOIP_CACHE_IPV4_PREFIX and
+RECOMMENDATIONS_GEOIP_CACHE_IPV6_PREFIX, so that one lookup serves a whole subnet; the defaults
+of 32 and 128 cache every address separately.
+"""
+import ipaddress
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from edx_django_utils.monitoring import set_custom_attribute
+from ipware.ip import get_client_ip
+
+from openedx.core.djangoapps.geoinfo.api import country_code_from_ip
+
+from edx_recommendations.api.timing import timed
+
+
+class GeoIPCache:
+    """
+    Thread-safe, size-bounded LRU of country codes that expire after a timeout.
+    """
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._countries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the country code cached for key, or None if it is missing or expired.
+        """
+        with self._lock:
+            cached = self._countries.get(key)
+            if cached is None:
+                return None
+            country_code, expires_at = cached
+            if expires_at <= time.monotonic():
+                del self._countries[key]
+                return None
+            self._countries.move_to_end(key)
+            return country_code
+
+    def set(self, key, country_code):
+        """
+        Stores country_code under key, evicting the least recently used entries beyond max_size.
+        """
+        if self.max_size <= 0 or self.timeout <= 0:
+            return
+        with self._lock:
+            self._countries[key] = (country_code, time.monotonic() + self.timeout)
+            self._countries.move_to_end(key)
+            while len(self._countries) > self.max_size:
+                self._countries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._countries.clear()
+
+    def __len__(self):
+        return len(self._countries)
+
+
+_geoip_cache = None
+_geoip_cache_lock = threading.Lock()
+
+
+def get_geoip_cache():
+    """
+    Returns the process-local country code cache, creating it on first use.
+    """
+    global _geoip_cache  # pylint: disable=global-statement
+
+    if _geoip_cache is None:
+        with _geoip_cache_lock:
+            if _geoip_cache is None:
+                _geoip_cache = GeoIPCache(
+                    settings.RECOMMENDATIONS_GEOIP_CACHE_SIZE, settings.RECOMMENDATIONS_GEOIP_CACHE_TIMEOUT
+                )
+    return _geoip_cache
+
+
+def _geoip_cache_key(ip_address):
+    """
+    Returns the network an IP address is cached under, or the address itself if it cannot be parsed.
+    """
+    try:
+        address = ipaddress.ip_address(ip_address)
+    except ValueError:
+        return ip_address
+
+    prefix = (
+        settings.RECOMMENDATIONS_GEOIP_CACHE_IPV4_PREFIX
+        if address.version == 4
+        else settings.RECOMMENDATIONS_GEOIP_CACHE_IPV6_PREFIX
+    )
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+def get_country_code(ip_address):
+    """
+    Returns the upper-cased country code of ip_address, from the cache when possible.
+    """
+    geoip_cache = get_geoip_cache()
+    cache_key = _geoip_cache_key(ip_address)
+    country_code = geoip_cache.get(cache_key)
+    set_custom_attribute("geoip_cache_hit", country_code is not None)
+    if country_code is None:
+        with timed("geoip"):
+            country_code = country_code_from_ip(ip_address).upper()
+        geoip_cache.set(cache_key, country_code)
+    return country_code
+
+
+def get_lazy_country_code(request):
+    """
+    Returns the country code of the request's IP address, looked up the first time it is read.
+
+    Courses without location restrictions never read it, so control group users, empty results
+    and unrestricted recommendations skip the lookup entirely.
+    """
+    return SimpleLazyObject(lambda: get_country_code(get_client_ip(request)[0]))
@@ -0,0 +1,117 @@
+"""
+Background precomputation of learner dashboard recommendations.
+
+When RECOMMENDATIONS_PRECOMPUTE_ENABLED is set, along with the dashboard recommendations flag and
+a RECOMMENDATIONS_RESULT_CACHE_TIMEOUT above 0, logging in or changing a course enrollment
+schedules the user's learner dashboard recommendations to be computed on a pool of
+RECOMMENDATIONS_PRECOMPUTE_WORKERS threads. This warms the Amplitude, UT Austin and catalog
+caches and writes the filtered recommendations of both dashboard views into the recommendation
+result cache, so the user's next dashboard load only reads.
+
+At most RECOMMENDATIONS_PRECOMPUTE_MAX_PENDING jobs wait or run per process; jobs scheduled
+beyond that are dropped. A job is also skipped while another one, in any process, is pending
+for the same user and enrollment version, for up to RECOMMENDATIONS_PRECOMPUTE_DEDUPE_TIMEOUT
+seconds.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from edx_django_utils.cache import get_cache_key
+
+from edx_recommendations.api.concurrency import get_executor, submit
+from edx_recommendations.api.course_recommendations import LearnerDashboardRecommendationsView
+from edx_recommendations.api.cross_product_recommendations import ProductRecommendationsView
+from edx_recommendations.api.geoip import get_country_code
+from edx_recommendations.api.result_cache import get_enrollment_version
+from edx_recommendations.api.utils import (
+    get_materialized_amplitude_course_recommendations,
+    is_user_enrolled_in_ut_austin_masters_program,
+)
+from edx_recommendations.toggles import ENABLE_DASHBOARD_RECOMMENDATIONS, is_enabled
+
+log = logging.getLogger(__name__)
+User = get_user_model()
+
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def _dedupe_cache_key(user_id, version):
+    return get_cache_key(recommendations_precompute_user_id=user_id, version=version)
+
+
+def schedule_recommendations_precompute(user_id, ip_address):
+    """
+    Schedules the dashboard recommendations of a user to be computed in the background, for the
+    country of ip_address. Returns whether a job was scheduled.
+    """
+    global _pending  # pylint: disable=global-statement
+
+    # Precomputed results are only ever read from the result cache, by the learner dashboard.
+    if (
+        not settings.RECOMMENDATIONS_PRECOMPUTE_ENABLED
+        or settings.RECOMMENDATIONS_RESULT_CACHE_TIMEOUT <= 0
+        or not ip_address
+        or not is_enabled(ENABLE_DASHBOARD_RECOMMENDATIONS)
+    ):
+        return False
+
+    with _pending_lock:
+        if _pending >= settings.RECOMMENDATIONS_PRECOMPUTE_MAX_PENDING:
+            log.info(f"Dropped recommendations precompute for user {user_id}, too many pending")
+            return False
+        _pending += 1
+
+    dedupe_key = _dedupe_cache_key(user_id, get_enrollment_version(user_id))
+    if not cache.add(dedupe_key, True, settings.RECOMMENDATIONS_PRECOMPUTE_DEDUPE_TIMEOUT):
+        _release()
+        return False
+
+    try:
+        executor = get_executor("recommendations_precompute", settings.RECOMMENDATIONS_PRECOMPUTE_WORKERS)
+        submit(executor, _precompute, user_id, ip_address, dedupe_key)
+    except Exception as err:  # pylint: disable=broad-except
+        # _precompute never runs, so it cannot free the pending slot and dedupe key itself.
+        log.warning(f"Cannot schedule recommendations precompute for user {user_id}: {err}")
+        cache.delete(dedupe_key)
+        _release()
+        return False
+    return True
+
+
+def _release():
+    global _pending  # pylint: disable=global-statement
+
+    with _pending_lock:
+        _pending -= 1
+
+
+def _precompute(user_id, ip_address, dedupe_key):
+    """
+    Computes the dashboard recommendations of a user into the recommendation result cache.
+    """
+    try:
+        user = User.objects.get(id=user_id)
+        # The learner dashboard view checks this first; the answer is cached per user.
+        if is_user_enrolled_in_ut_austin_masters_program(user):
+            return
+
+        is_control, has_is_control, course_keys = get_materialized_amplitude_course_recommendations(
+            user_id, settings.LEARNER_DASHBOARD_AMPLITUDE_MODEL_ID
+        )
+        if not course_keys:
+            return
+
+        user_country_code = get_country_code(ip_address)
+        # ProductRecommendationsView filters regardless of the experiment group.
+        ProductRecommendationsView.filter_recommendations(user, course_keys, user_country_code)
+        if has_is_control and not is_control:
+            LearnerDashboardRecommendationsView.filter_recommendations(user, course_keys, user_country_code)
+    except Exception as err:  # pylint: disable=broad-except
+        log.warning(f"Cannot precompute recommendations for user {user_id}: {err}")
+    finally:
+        cache.delete(dedupe_key)
+        _release()
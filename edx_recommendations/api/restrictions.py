@@ -0,0 +1,60 @@
+"""
+Precompiled country restrictions for courses and programs.
+"""
+from collections import namedtuple
+
+ALLOWLIST = "allowlist"
+BLOCKLIST = "blocklist"
+
+# Key under which the catalog cache attaches the compiled restriction to the course data it returns.
+COUNTRY_RESTRICTION_FIELD = "_country_restriction"
+
+
+class CountryRestriction(namedtuple("CountryRestriction", ["allowed_countries", "blocked_countries"])):
+    """
+    Hashed form of a product's location_restriction.
+
+    An empty allowed_countries set means every country not in blocked_countries may access the product.
+    """
+
+    __slots__ = ()
+
+    def is_restricted(self, country):
+        """
+        Returns True if the product is not available in country.
+        """
+        # Unrestricted products are checked first so a lazily looked up country is only read when needed.
+        if not (self.allowed_countries or self.blocked_countries) or not country:
+            return False
+        return country in self.blocked_countries or (
+            bool(self.allowed_countries) and country not in self.allowed_countries
+        )
+
+
+UNRESTRICTED = CountryRestriction(frozenset(), frozenset())
+
+
+def compile_country_restriction(location_restriction):
+    """
+    Returns the CountryRestriction for a catalog location_restriction dict (which may be None).
+    """
+    if not location_restriction:
+        return UNRESTRICTED
+
+    restriction_type = location_restriction.get("restriction_type")
+    countries = frozenset(location_restriction.get("countries") or ())
+    if restriction_type == ALLOWLIST:
+        return CountryRestriction(countries, frozenset())
+    if restriction_type == BLOCKLIST:
+        return CountryRestriction(frozenset(), countries)
+    return UNRESTRICTED
+
+
+def get_country_restriction(product):
+    """
+    Returns the CountryRestriction of a course or program, compiling it only if the catalog cache has not.
+    """
+    restriction = product.get(COUNTRY_RESTRICTION_FIELD)
+    if restriction is None:
+        restriction = compile_country_restriction(product.get("location_restriction", None))
+    return restriction
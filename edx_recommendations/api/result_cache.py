@@ -0,0 +1,118 @@
+"""
+Cache of users' filtered recommendations.
+
+filter_recommended_courses results are cached in the shared cache for
+RECOMMENDATIONS_RESULT_CACHE_TIMEOUT seconds, keyed by the view variant, user, Amplitude model,
+the Amplitude items being filtered and the user's enrollment version. Filtering only reads the
+user's country when a candidate has location restrictions; results that did not read it are
+served to every country, so a lazily looked up country is not looked up on their cache hits.
+Results that did read it are stored under a second key that adds the country.
+
+The enrollment version is a random token per user that is replaced whenever one of the user's
+course enrollments changes, once the change is committed. Results computed from the old
+enrollments are then never read again, so a course the user just enrolled in is not shown.
+A version that fell out of the cache is replaced by a new one, which is equally safe.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from edx_django_utils.cache import get_cache_key
+from edx_django_utils.monitoring import set_custom_attribute
+
+from edx_recommendations.api.deadline import Deadline
+from edx_recommendations.api.utils import filter_recommended_courses
+
+
+def _enrollment_version_cache_key(user_id):
+    return get_cache_key(recommendations_enrollment_version_user_id=user_id)
+
+
+def get_enrollment_version(user_id):
+    """
+    Returns the current enrollment version of a user, starting a new one if there is none.
+    """
+    cache_key = _enrollment_version_cache_key(user_id)
+    version = cache.get(cache_key)
+    if version is None:
+        cache.add(cache_key, uuid.uuid4().hex, settings.RECOMMENDATIONS_RESULT_CACHE_TIMEOUT)
+        version = cache.get(cache_key)
+    return version
+
+
+def bump_enrollment_version(user_id):
+    """
+    Replaces the enrollment version of a user, which retires every cached result of theirs.
+    """
+    cache.set(_enrollment_version_cache_key(user_id), uuid.uuid4().hex, settings.RECOMMENDATIONS_RESULT_CACHE_TIMEOUT)
+
+
+def _result_cache_key(variant, user_id, recommendation_id, course_keys, version):
+    return get_cache_key(
+        recommendations_result=variant,
+        user_id=user_id,
+        recommendation_id=recommendation_id,
+        course_keys=hashlib.sha256("\n".join(course_keys).encode("utf-8")).hexdigest(),
+        version=version,
+    )
+
+
+def _country_cache_key(cache_key, user_country_code):
+    return get_cache_key(recommendations_result=cache_key, country_code=str(user_country_code or ""))
+
+
+def _tracked_country_code(user_country_code, reads):
+    """
+    Return user_country_code wrapped so that reading it appends to reads.
+    """
+    def read():
+        reads.append(True)
+        return str(user_country_code) if user_country_code else None
+
+    return SimpleLazyObject(read)
+
+
+def get_filtered_recommendations(variant, user, recommendation_id, course_keys, user_country_code=None, **kwargs):
+    """
+    Returns filter_recommended_courses(user, course_keys, user_country_code=user_country_code, **kwargs),
+    from the cache when the same user, model, items and enrollments were filtered before, for the same
+    country if filtering read it.
+
+    variant names the view's recommendation_count and course_fields, which are not part of the key.
+    Results cut short by the request's latency budget are not cached.
+    """
+    if settings.RECOMMENDATIONS_RESULT_CACHE_TIMEOUT <= 0:
+        return filter_recommended_courses(user, course_keys, user_country_code=user_country_code, **kwargs)
+
+    cache_key = _result_cache_key(variant, user.id, recommendation_id, course_keys, get_enrollment_version(user.id))
+    cached = cache.get(cache_key)
+    if cached is not None and cached["by_country"]:
+        courses = cache.get(_country_cache_key(cache_key, user_country_code))
+        cached = None if courses is None else {"courses": courses}
+    set_custom_attribute("recommendations_result_cache_hit", cached is not None)
+    if cached is not None:
+        return cached["courses"]
+
+    deadline = kwargs.pop("deadline", None) or Deadline()
+    country_reads = []
+    courses = filter_recommended_courses(
+        user,
+        course_keys,
+        user_country_code=_tracked_country_code(user_country_code, country_reads),
+        deadline=deadline,
+        **kwargs,
+    )
+    if deadline.expired():
+        return courses
+
+    timeout = settings.RECOMMENDATIONS_RESULT_CACHE_TIMEOUT
+    if not country_reads:
+        cache.set(cache_key, {"by_country": False, "courses": courses}, timeout)
+        return courses
+
+    cache.set_many(
+        {cache_key: {"by_country": True}, _country_cache_key(cache_key, user_country_code): courses}, timeout
+    )
+    return courses
@@ -0,0 +1,107 @@
+"""
+Per-stage timing and counters for recommendation requests.
+
+Views decorated with timed_view collect the time spent in each stage (timed blocks with the same
+stage name add up) and request counters such as candidates examined or rejected. When the view
+returns, every stage is reported as a recommendations_<stage>_ms custom attribute and every counter
+as recommendations_<counter>. If RECOMMENDATIONS_SERVER_TIMING_HEADER is enabled, the stages are
+also sent in a Server-Timing response header.
+
+The collector lives in a context variable that concurrency.submit copies into pool threads, so
+stages run concurrently are recorded as well.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from edx_django_utils.monitoring import set_custom_attribute
+
+_request_timing = contextvars.ContextVar("edx_recommendations_request_timing", default=None)
+
+
+class RequestTiming:
+    """
+    Stage durations and counters of one request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+
+    def add(self, stage, duration):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0) + duration
+
+    def increment(self, counter, count=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + count
+
+    def report(self):
+        """
+        Sets the stage durations, in milliseconds, and the counters as custom attributes.
+        """
+        with self._lock:
+            stages, counters = dict(self.stages), dict(self.counters)
+        for stage, duration in stages.items():
+            set_custom_attribute(f"recommendations_{stage}_ms", round(duration * 1000, 1))
+        for counter, count in counters.items():
+            set_custom_attribute(f"recommendations_{counter}", count)
+
+    def server_timing(self):
+        """
+        Returns the stage durations as a Server-Timing header value.
+        """
+        with self._lock:
+            return ", ".join(f"{stage};dur={duration * 1000:.1f}" for stage, duration in self.stages.items())
+
+
+@contextmanager
+def timed(stage):
+    """
+    Adds the time spent in the block to stage, if a request is being timed.
+    """
+    request_timing = _request_timing.get()
+    if request_timing is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        request_timing.add(stage, time.perf_counter() - started)
+
+
+def increment(counter, count=1):
+    """
+    Adds count to a counter of the request being timed, if any.
+    """
+    request_timing = _request_timing.get()
+    if request_timing is not None and count:
+        request_timing.increment(counter, count)
+
+
+def timed_view(handler):
+    """
+    Decorates a view handler to time its stages and report them once it returns a response.
+    """
+    @wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        request_timing = RequestTiming()
+        token = _request_timing.set(request_timing)
+        try:
+            with timed("total"):
+                response = handler(view, request, *args, **kwargs)
+        finally:
+            _request_timing.reset(token)
+
+        request_timing.report()
+        if settings.RECOMMENDATIONS_SERVER_TIMING_HEADER:
+            response["Server-Timing"] = request_timing.server_timing()
+        return response
+
+    return wrapper
@@ -5,6 +5,7 @@ URL configuration
 from django.conf import settings
 from django.urls import re_path
 
+from edx_recommendations.api.bulk_recommendations import BulkRecommendationsView
 from edx_recommendations.api.course_recommendations import (
     CourseAboutPageRecommendationsView,
     LearnerDashboardRecommendationsView,
@@ -37,6 +38,11 @@ urlpatterns = [
         ProductRecommendationsView.as_view(),
         name="learner_dashboard_amplitude_v2",
     ),
+    re_path(
+        r"^learner_dashboard/amplitude/bulk/$",
+        BulkRecommendationsView.as_view(),
+        name="learner_dashboard_amplitude_bulk",
+    ),
     re_path(
         rf"^learner_dashboard/cross_product/{settings.COURSE_ID_PATTERN}/$",
         ProductRecommendationsView.as_view(),
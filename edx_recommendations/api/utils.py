@@ -2,33 +2,72 @@
 Helper methods
 """
 import logging
-import requests
+import time
+from datetime import timedelta
+from functools import partial
+from itertools import islice
 
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from edx_django_utils.cache import get_cache_key
+from edx_django_utils.monitoring import set_custom_attribute
 
 from common.djangoapps.student.models import CourseEnrollment
 from lms.djangoapps.program_enrollments.api import fetch_program_enrollments_by_student
 from lms.djangoapps.program_enrollments.constants import ProgramEnrollmentStatuses
-from openedx.core.djangoapps.catalog.utils import get_course_data, get_programs
+from openedx.core.djangoapps.catalog.utils import get_programs
+
+from edx_recommendations.api.amplitude import (
+    FAILURE_STATUS_CODES,
+    AmplitudeResponseError,
+    get_amplitude_circuit_breaker,
+    get_amplitude_pool_stats,
+    get_cached_amplitude_recommendations,
+    get_amplitude_session,
+    get_amplitude_timeout,
+)
+from edx_recommendations.api.catalog import exclude_unservable_course_keys, get_courses_data
+from edx_recommendations.api.deadline import Deadline
+from edx_recommendations.api.restrictions import get_country_restriction
+from edx_recommendations.api.timing import increment, timed
+from edx_recommendations.models import AmplitudeRecommendation
 
 log = logging.getLogger(__name__)
 
+# Catalog query filter_recommended_courses hydrates candidates with.
+RECOMMENDED_COURSES_QUERYSTRING = {"marketable_course_runs_only": 1}
+DEFAULT_RECOMMENDED_COURSE_FIELDS = [
+    "key",
+    "uuid",
+    "title",
+    "owners",
+    "image",
+    "url_slug",
+    "course_runs",
+    "location_restriction",
+    "marketing_url",
+    "programs",
+]
+
 COURSE_LEVELS = ["Introductory", "Intermediate", "Advanced"]
 
 
 def _get_user_enrolled_course_keys(user):
     """
-    Returns course ids in which the user is enrolled in.
+    Returns the set of course ids in which the user is enrolled in.
     """
     course_enrollments = CourseEnrollment.enrollments_for_user(user)
-    return [
+    return {
         str(course_enrollment.course_id) for course_enrollment in course_enrollments
-    ]
+    }
 
 
 def _is_enrolled_in_course(course_runs, enrolled_course_keys):
     """
     Returns True if a user is enrolled in any course run of the course else false.
+
+    enrolled_course_keys should be a set so that each run is checked in constant time.
     """
     return any(
         course_run.get("key", None) in enrolled_course_keys
@@ -49,31 +88,92 @@ def _has_country_restrictions(product, user_country):
     Returns:
         True if the product is restricted in the country and False otherwise
     """
-    if not user_country:
-        return False
+    # is_restricted reads user_country only for restricted products, which keeps lazy country lookups lazy.
+    return get_country_restriction(product).is_restricted(user_country)
+
+
+def get_amplitude_course_recommendations(user_id, recommendation_id, deadline=None):
+    """
+    Get personalized recommendations from Amplitude, served from the cache when available.
+
+    Args:
+        user_id: The user for which the recommendations need to be pulled
+        recommendation_id: Amplitude model id
+        deadline: if provided, cached recommendations are still served once the request's latency budget
+            runs out, but the Amplitude call is skipped or cut short
+
+    Returns:
+        is_control (bool): Control group value for the user
+        has_is_control (bool): Boolean value indicating if the control group for
+        the user has been decided.
+        recommended_course_keys (list): Course keys returned by Amplitude; (True, False, []) when Amplitude
+        responds with an error status.
+    """
+    deadline = deadline or Deadline()
+    try:
+        return get_cached_amplitude_recommendations(
+            user_id,
+            recommendation_id,
+            partial(_fetch_amplitude_course_recommendations, deadline=deadline),
+            deadline=deadline,
+        )
+    except AmplitudeResponseError as err:
+        # Error responses are never cached, so the next request retries Amplitude.
+        log.info(f"{err} for user {user_id}")
+        return True, False, []
+    except Exception:
+        if deadline.expired():
+            deadline.exhaust("amplitude")
+        raise
 
-    allow_list, block_list = [], []
-    location_restriction = product.get("location_restriction", None)
-    if location_restriction:
-        restriction_type = location_restriction.get("restriction_type")
-        countries = location_restriction.get("countries")
-        if restriction_type == "allowlist":
-            allow_list = countries
-        elif restriction_type == "blocklist":
-            block_list = countries
-
-    return user_country in block_list or (
-        bool(allow_list) and user_country not in allow_list
+
+def get_materialized_amplitude_course_recommendations(user_id, recommendation_id, deadline=None):
+    """
+    Get personalized recommendations stored by the materialize_amplitude_recommendations command,
+    falling back to get_amplitude_course_recommendations when none were stored within
+    AMPLITUDE_RECOMMENDATIONS_STORE_MAX_AGE seconds.
+
+    Returns:
+        The same (is_control, has_is_control, recommended_course_keys) tuple as get_amplitude_course_recommendations.
+    """
+    stored = _fresh_amplitude_recommendations(recommendation_id).filter(user_id=user_id).first()
+    set_custom_attribute("amplitude_recommendations_materialized", stored is not None)
+    if stored is not None:
+        return stored.recommendations
+
+    return get_amplitude_course_recommendations(user_id, recommendation_id, deadline=deadline)
+
+
+def get_stored_amplitude_course_recommendations(user_ids, recommendation_id):
+    """
+    Returns {user_id: (is_control, has_is_control, recommended_course_keys)} for the users in user_ids
+    whose recommendations were stored within AMPLITUDE_RECOMMENDATIONS_STORE_MAX_AGE seconds, in one query.
+    """
+    return {
+        stored.user_id: stored.recommendations
+        for stored in _fresh_amplitude_recommendations(recommendation_id).filter(user_id__in=user_ids)
+    }
+
+
+def _fresh_amplitude_recommendations(recommendation_id):
+    return AmplitudeRecommendation.objects.filter(
+        recommendation_id=recommendation_id,
+        fetched_at__gte=timezone.now() - timedelta(seconds=settings.AMPLITUDE_RECOMMENDATIONS_STORE_MAX_AGE),
     )
 
 
-def get_amplitude_course_recommendations(user_id, recommendation_id):
+def _fetch_amplitude_course_recommendations(user_id, recommendation_id, deadline=None):
     """
     Get personalized recommendations from Amplitude.
 
+    Raises AmplitudeCircuitOpenError without calling Amplitude while its circuit breaker is open, and
+    AmplitudeResponseError when Amplitude responds with an error status.
+
     Args:
         user_id: The user for which the recommendations need to be pulled
         recommendation_id: Amplitude model id
+        deadline: if provided, Amplitude is not called once its budget is used up, and the connect and
+            read timeouts are capped to its remaining budget
 
     Returns:
         is_control (bool): Control group value for the user
@@ -90,34 +190,96 @@ def get_amplitude_course_recommendations(user_id, recommendation_id):
         "get_recs": True,
         "rec_id": recommendation_id,
     }
-    response = requests.get(settings.AMPLITUDE_URL, params=params, headers=headers)
-    if response.status_code == 200:
-        response = response.json()
-        recommendations = response.get("userData", {}).get("recommendations", [])
-        if recommendations:
-            is_control = recommendations[0].get("is_control")
-            has_is_control = recommendations[0].get("has_is_control")
-            recommended_course_keys = recommendations[0].get("items")
-            return is_control, has_is_control, recommended_course_keys
+    deadline = deadline or Deadline()
+    deadline.check("amplitude")
+    circuit_breaker = get_amplitude_circuit_breaker()
+    generation = circuit_breaker.before_call()
+    started = time.monotonic()
+    try:
+        response = get_amplitude_session().get(
+            settings.AMPLITUDE_URL,
+            params=params,
+            headers=headers,
+            timeout=tuple(deadline.cap(timeout) for timeout in get_amplitude_timeout()),
+        )
+    except Exception:
+        # A call cut short by our own latency budget says nothing about Amplitude's health.
+        if deadline.expired():
+            circuit_breaker.cancel_call(generation)
+        else:
+            circuit_breaker.record_call(False, time.monotonic() - started, generation)
+        raise
+    succeeded = response.status_code < 500 and response.status_code not in FAILURE_STATUS_CODES
+    circuit_breaker.record_call(succeeded, time.monotonic() - started, generation)
+    for stat, value in get_amplitude_pool_stats().items():
+        set_custom_attribute(f"amplitude_pool_{stat}", value)
+
+    if response.status_code != 200:
+        raise AmplitudeResponseError(response.status_code)
+
+    response = response.json()
+    recommendations = response.get("userData", {}).get("recommendations", [])
+    if recommendations:
+        is_control = recommendations[0].get("is_control")
+        has_is_control = recommendations[0].get("has_is_control")
+        recommended_course_keys = recommendations[0].get("items")
+        return is_control, has_is_control, recommended_course_keys
 
     return True, False, []
 
 
+def _ut_austin_masters_program_cache_key(user_id):
+    return get_cache_key(ut_austin_masters_program_user_id=user_id)
+
+
+def invalidate_ut_austin_masters_program_cache(user_id):
+    """
+    Forgets the cached UT Austin masters program check of a user, after their program enrollments changed.
+    """
+    cache.delete(_ut_austin_masters_program_cache_key(user_id))
+
+
 def is_user_enrolled_in_ut_austin_masters_program(user):
     """
     Checks if a user is enrolled in any masters program
 
+    The answer is cached for RECOMMENDATIONS_UT_AUSTIN_CACHE_TIMEOUT seconds, and forgotten
+    whenever one of the user's program enrollments is saved or deleted.
+
     Args:
         user: The user object
 
     Returns:
         True if the user is enrolled in UT Austin masters program otherwise False
     """
+    timeout = settings.RECOMMENDATIONS_UT_AUSTIN_CACHE_TIMEOUT
+    cache_key = _ut_austin_masters_program_cache_key(user.id)
+    if timeout > 0:
+        cached = cache.get(cache_key)
+        set_custom_attribute("ut_austin_cache_hit", cached is not None)
+        if cached is not None:
+            return cached
+
+    is_enrolled = _is_user_enrolled_in_ut_austin_masters_program(user)
+    if timeout > 0:
+        cache.set(cache_key, is_enrolled, timeout)
+    return is_enrolled
+
+
+def _is_user_enrolled_in_ut_austin_masters_program(user):
+    """
+    Looks up whether a user is enrolled in a UT Austin masters program.
+    """
     program_enrollments = fetch_program_enrollments_by_student(
         user=user,
         program_enrollment_statuses=ProgramEnrollmentStatuses.__ACTIVE__,
     )
     uuids = [enrollment.program_uuid for enrollment in program_enrollments]
+    # get_programs returns every program when given no uuids, so learners without active
+    # program enrollments, which is most of them, must not reach it.
+    if not uuids:
+        return False
+
     enrolled_programs = get_programs(uuids=uuids) or []
     for enrolled_program in enrolled_programs:
         if enrolled_program.get("type", None) == "Masters":
@@ -138,13 +300,20 @@ def filter_recommended_courses(
     user_country_code=None,
     request_course_key=None,
     course_fields=None,
+    deadline=None,
 ):
     """
     Returns the filtered course recommendations. The unfiltered course keys
-    pass through the following filters:
-        1. Remove courses that a user is already enrolled in.
-        2. If user is seeing the recommendations on a course about pages, filter that course out of recommendations.
-        3. Remove the courses which is restricted in user region.
+    pass through the following filters, in order of cost:
+        1. Remove courses recently found to be missing or run-less in discovery, before any catalog lookup.
+        2. Remove courses without catalog data or course runs.
+        3. Remove courses that a user is already enrolled in.
+        4. If user is seeing the recommendations on a course about pages, filter that course out of recommendations.
+        5. Remove the courses which is restricted in user region.
+
+    Candidates are pulled through the filters one at a time and hydrated lazily, so no filter runs
+    and no course is looked up once recommendation_count courses passed. Each filter counts the
+    courses it removed as a rejected_<reason> request timing counter.
 
     Args:
         user: The user for which the recommendations need to be pulled
@@ -153,52 +322,124 @@ def filter_recommended_courses(
         user_country_code: if provided, will apply location restrictions to recommendations
         request_course_key: if provided, will filter out that course from recommendations (used for course about page)
         fields: if provided, collects those fields on each course being queried, otherwise collects default fields
+        deadline: if provided, stops hydrating candidates and returns the courses found so far once
+            the request's latency budget runs out
 
     Returns:
         filtered_recommended_courses (list): A list of filtered course objects.
     """
     filtered_recommended_courses = []
-    fields = (
-        [
-            "key",
-            "uuid",
-            "title",
-            "owners",
-            "image",
-            "url_slug",
-            "course_runs",
-            "location_restriction",
-            "marketing_url",
-            "programs",
-        ]
-        if not course_fields
-        else course_fields
+    deadline = deadline or Deadline()
+    fields = course_fields or DEFAULT_RECOMMENDED_COURSE_FIELDS
+    querystring = dict(RECOMMENDED_COURSES_QUERYSTRING)
+
+    with timed("enrollments"):
+        enrolled_course_keys = _get_user_enrolled_course_keys(user)
+
+    # Each stage pulls candidates from the one before it, so candidates are only hydrated as the
+    # later stages ask for them. Cheap stages run first; restrictions run last because they may
+    # look the user's country up.
+    candidates = _servable_candidates(unfiltered_course_keys, querystring)
+    candidates = _hydrated_candidates(
+        candidates,
+        fields,
+        querystring,
+        deadline,
+        lambda: recommendation_count - len(filtered_recommended_courses),
+    )
+    candidates = _rejected(candidates, "missing", lambda course: not course or not course.get("course_runs"))
+    candidates = _rejected(
+        candidates, "enrolled", lambda course: _is_enrolled_in_course(course["course_runs"], enrolled_course_keys)
     )
-
-    # Filter out enrolled courses .
-    course_keys_to_filter_out = _get_user_enrolled_course_keys(user)
-    # If user is seeing the recommendations on a course about page, filter that course out of recommendations
     if request_course_key:
-        course_keys_to_filter_out.append(request_course_key)
+        # If user is seeing the recommendations on a course about page, filter that course out of recommendations
+        candidates = _rejected(
+            candidates,
+            "request_course",
+            lambda course: _is_enrolled_in_course(course["course_runs"], {request_course_key}),
+        )
+    candidates = _rejected(
+        candidates, "restricted", lambda course: _has_country_restrictions(course, user_country_code)
+    )
 
-    for course_id in unfiltered_course_keys:
+    for course_data in candidates:
+        filtered_recommended_courses.append(course_data)
         if len(filtered_recommended_courses) >= recommendation_count:
             break
 
-        course_data = get_course_data(
-            course_id, fields, querystring={"marketable_course_runs_only": 1}
+    return filtered_recommended_courses
+
+
+def _servable_candidates(course_keys, querystring):
+    """
+    Yields course_keys without the courses recently found to be missing or run-less in discovery.
+    """
+    course_keys = list(course_keys)
+    servable_course_keys = exclude_unservable_course_keys(course_keys, querystring)
+    increment("rejected_unservable", len(course_keys) - len(servable_course_keys))
+    yield from servable_course_keys
+
+
+def _hydrated_candidates(course_keys, fields, querystring, deadline, needed):
+    """
+    Yields the course data of course_keys, hydrating them a window at a time.
+
+    A window is only fetched once the previous one was consumed. It holds the needed() number of
+    courses still missing plus up to RECOMMENDATIONS_CATALOG_LOOKAHEAD more, so that a few rejections
+    do not each cost another catalog round trip; the look-ahead only fills catalog fetch workers
+    that would otherwise sit idle, so it never adds a wave of fetches. Stops once the request's
+    latency budget runs out.
+    """
+    course_keys = iter(course_keys)
+    first_window = True
+    while True:
+        window_size = max(needed(), 1)
+        lookahead_size = min(
+            window_size + settings.RECOMMENDATIONS_CATALOG_LOOKAHEAD, settings.RECOMMENDATIONS_CATALOG_FETCH_WORKERS
         )
-        if (
-            course_data
-            and course_data.get("course_runs", [])
-            and not _is_enrolled_in_course(
-                course_data.get("course_runs", []), course_keys_to_filter_out
+        window_size = max(window_size, lookahead_size)
+        window = list(islice(course_keys, window_size))
+        if not window:
+            return
+        if deadline.expired():
+            deadline.exhaust("enrollments" if first_window else "catalog")
+            return
+        first_window = False
+
+        with timed("catalog"):
+            courses_data = get_courses_data(
+                window,
+                fields,
+                querystring=querystring,
+                timeout=deadline.cap(settings.RECOMMENDATIONS_CATALOG_FETCH_TIMEOUT),
             )
-            and not _has_country_restrictions(course_data, user_country_code)
-        ):
-            filtered_recommended_courses.append(course_data)
+        increment("candidates_examined", len(courses_data))
+        yield from courses_data
 
-    return filtered_recommended_courses
+
+def _rejected(courses, reason, is_rejected):
+    """
+    Yields the courses is_rejected is False for, counting the others as rejected_<reason>.
+    """
+    for course in courses:
+        if is_rejected(course):
+            increment(f"rejected_{reason}")
+        else:
+            yield course
+
+
+def prefetch_recommended_courses(course_keys, course_fields=None, timeout=None):
+    """
+    Hydrates course_keys into the course data caches the way filter_recommended_courses looks them up,
+    so that filtering the recommendations of many users fetches every course only once.
+    """
+    querystring = dict(RECOMMENDED_COURSES_QUERYSTRING)
+    get_courses_data(
+        exclude_unservable_course_keys(course_keys, querystring),
+        course_fields or DEFAULT_RECOMMENDED_COURSE_FIELDS,
+        querystring=querystring,
+        timeout=timeout,
+    )
 
 
 def get_cross_product_recommendations(course_key):
@@ -3,7 +3,7 @@ edx_recommendations Django application initialization.
 """
 
 from django.apps import AppConfig
-from edx_django_utils.plugins.constants import PluginURLs, PluginSettings
+from edx_django_utils.plugins.constants import PluginSettings, PluginSignals, PluginURLs
 
 
 class EdxRecommendationsConfig(AppConfig):
@@ -32,4 +32,40 @@ class EdxRecommendationsConfig(AppConfig):
                 },
             }
         },
+        PluginSignals.CONFIG: {
+            "lms.djangoapp": {
+                PluginSignals.RELATIVE_PATH: "signals",
+                PluginSignals.RECEIVERS: [
+                    {
+                        PluginSignals.RECEIVER_FUNC_NAME: "invalidate_ut_austin_masters_program_cache_on_change",
+                        PluginSignals.SIGNAL_PATH: "django.db.models.signals.post_save",
+                        PluginSignals.SENDER_PATH: "lms.djangoapps.program_enrollments.models.ProgramEnrollment",
+                        PluginSignals.DISPATCH_UID: "edx_recommendations.ut_austin_masters_program.post_save",
+                    },
+                    {
+                        PluginSignals.RECEIVER_FUNC_NAME: "invalidate_ut_austin_masters_program_cache_on_change",
+                        PluginSignals.SIGNAL_PATH: "django.db.models.signals.post_delete",
+                        PluginSignals.SENDER_PATH: "lms.djangoapps.program_enrollments.models.ProgramEnrollment",
+                        PluginSignals.DISPATCH_UID: "edx_recommendations.ut_austin_masters_program.post_delete",
+                    },
+                    {
+                        PluginSignals.RECEIVER_FUNC_NAME: "refresh_recommendations_on_enrollment_change",
+                        PluginSignals.SIGNAL_PATH: "django.db.models.signals.post_save",
+                        PluginSignals.SENDER_PATH: "common.djangoapps.student.models.CourseEnrollment",
+                        PluginSignals.DISPATCH_UID: "edx_recommendations.enrollment_version.post_save",
+                    },
+                    {
+                        PluginSignals.RECEIVER_FUNC_NAME: "refresh_recommendations_on_enrollment_change",
+                        PluginSignals.SIGNAL_PATH: "django.db.models.signals.post_delete",
+                        PluginSignals.SENDER_PATH: "common.djangoapps.student.models.CourseEnrollment",
+                        PluginSignals.DISPATCH_UID: "edx_recommendations.enrollment_version.post_delete",
+                    },
+                    {
+                        PluginSignals.RECEIVER_FUNC_NAME: "precompute_recommendations_on_login",
+                        PluginSignals.SIGNAL_PATH: "django.contrib.auth.signals.user_logged_in",
+                        PluginSignals.DISPATCH_UID: "edx_recommendations.precompute.user_logged_in",
+                    },
+                ],
+            }
+        },
     }
@@ -0,0 +1,48 @@
+"""
+Management command to precompute cross product recommendation payloads.
+"""
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from edx_recommendations.api.cross_product_payloads import build_cross_product_payloads
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Renders the CrossProductRecommendationsView payloads of every source course in
+    settings.CROSS_PRODUCT_RECOMMENDATIONS_KEYS, per country bucket, into the cache.
+
+    Meant to run periodically, at an interval well below RECOMMENDATIONS_CROSS_PRODUCT_PAYLOAD_TIMEOUT.
+    Only source courses whose associated course keys or catalog data changed since the last
+    run are re-rendered.
+
+    Example:
+        ./manage.py lms build_cross_product_recommendations
+    """
+
+    help = "Precomputes cross product recommendation payloads per source course and country bucket."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course-key", action="append", dest="course_keys", help="Only build this source course (repeatable)"
+        )
+        parser.add_argument("--force", action="store_true", help="Rebuild payloads even if catalog data is unchanged")
+
+    def handle(self, *args, **options):
+        course_keys = options["course_keys"] or list(settings.CROSS_PRODUCT_RECOMMENDATIONS_KEYS)
+        rebuilt = unchanged = failed = 0
+        for course_key in course_keys:
+            try:
+                if build_cross_product_payloads(course_key, force=options["force"]):
+                    rebuilt += 1
+                else:
+                    unchanged += 1
+            except Exception as err:  # pylint: disable=broad-except
+                failed += 1
+                log.warning(f"Could not build cross product payloads for {course_key} due to: {err}")
+
+        log.info(f"Built cross product payloads: {rebuilt} rebuilt, {unchanged} unchanged, {failed} failed")
@@ -0,0 +1,137 @@
+"""
+Management command to materialize Amplitude recommendations for recently active users.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from edx_recommendations.api.amplitude import AmplitudeCircuitOpenError
+from edx_recommendations.api.utils import _fetch_amplitude_course_recommendations
+from edx_recommendations.models import AmplitudeRecommendation
+
+log = logging.getLogger(__name__)
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Pulls Amplitude recommendations for every user who logged in recently and stores them in
+    AmplitudeRecommendation, which the learner dashboard views read before calling Amplitude.
+
+    Users are processed in id order, one chunk at a time. The command is resumable: users whose
+    stored recommendations are newer than --skip-fresher-than hours are skipped, and
+    --start-after-user-id continues from the last user id logged by an interrupted run.
+
+    Example:
+        ./manage.py lms materialize_amplitude_recommendations --active-days 30 --chunk-size 500 --rate 20
+    """
+
+    help = "Materializes Amplitude recommendations for recently active users."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--recommendation-id",
+            default=None,
+            help="Amplitude model id, defaults to settings.LEARNER_DASHBOARD_AMPLITUDE_MODEL_ID",
+        )
+        parser.add_argument(
+            "--active-days", type=int, default=30, help="Only include users who logged in within this many days"
+        )
+        parser.add_argument("--chunk-size", type=int, default=500, help="Number of users processed per chunk")
+        parser.add_argument("--rate", type=float, default=10, help="Maximum Amplitude requests per second")
+        parser.add_argument(
+            "--skip-fresher-than",
+            type=float,
+            default=12,
+            help="Skip users whose stored recommendations are newer than this many hours",
+        )
+        parser.add_argument(
+            "--start-after-user-id", type=int, default=0, help="Resume after this user id"
+        )
+
+    def handle(self, *args, **options):
+        recommendation_id = options["recommendation_id"] or settings.LEARNER_DASHBOARD_AMPLITUDE_MODEL_ID
+        chunk_size = options["chunk_size"]
+        min_interval = 1 / options["rate"] if options["rate"] > 0 else 0
+        fresh_after = timezone.now() - timedelta(hours=options["skip_fresher_than"])
+        users = User.objects.filter(
+            is_active=True,
+            last_login__gte=timezone.now() - timedelta(days=options["active_days"]),
+        ).order_by("id")
+
+        last_user_id = options["start_after_user_id"]
+        stored = skipped = failed = 0
+        next_request_at = 0
+        while True:
+            user_ids = list(users.filter(id__gt=last_user_id).values_list("id", flat=True)[:chunk_size])
+            if not user_ids:
+                break
+
+            fresh_user_ids = set(
+                AmplitudeRecommendation.objects.filter(
+                    user_id__in=user_ids, recommendation_id=recommendation_id, fetched_at__gte=fresh_after
+                ).values_list("user_id", flat=True)
+            )
+            fetched = {}
+            for user_id in user_ids:
+                if user_id in fresh_user_ids:
+                    skipped += 1
+                    continue
+
+                time.sleep(max(next_request_at - time.monotonic(), 0))
+                next_request_at = time.monotonic() + min_interval
+                try:
+                    fetched[user_id] = _fetch_amplitude_course_recommendations(user_id, recommendation_id)
+                except AmplitudeCircuitOpenError as err:
+                    # Back off until the breaker lets a probe through instead of skipping users in bulk.
+                    failed += 1
+                    log.warning(f"{err}, pausing before user {user_id}")
+                    next_request_at = time.monotonic() + settings.AMPLITUDE_CIRCUIT_BREAKER_RECOVERY_TIMEOUT
+                except Exception as err:  # pylint: disable=broad-except
+                    failed += 1
+                    log.warning(f"Amplitude API failed for {user_id} due to: {err}")
+
+            self._store(recommendation_id, fetched)
+            stored += len(fetched)
+            last_user_id = user_ids[-1]
+            log.info(
+                f"Materialized Amplitude recommendations up to user id {last_user_id}: "
+                f"{stored} stored, {skipped} skipped, {failed} failed"
+            )
+
+        log.info(
+            f"Finished materializing Amplitude recommendations: {stored} stored, {skipped} skipped, {failed} failed"
+        )
+
+    def _store(self, recommendation_id, fetched):
+        """
+        Upserts the fetched {user_id: recommendations} of one chunk.
+        """
+        if not fetched:
+            return
+
+        now = timezone.now()
+        existing = {
+            row.user_id: row
+            for row in AmplitudeRecommendation.objects.filter(
+                user_id__in=fetched.keys(), recommendation_id=recommendation_id
+            )
+        }
+        to_create, to_update = [], []
+        for user_id, (is_control, has_is_control, items) in fetched.items():
+            row = existing.get(user_id) or AmplitudeRecommendation(user_id=user_id, recommendation_id=recommendation_id)
+            row.is_control = is_control
+            row.has_is_control = has_is_control
+            row.items = items or []
+            row.fetched_at = now
+            (to_update if row.pk else to_create).append(row)
+
+        AmplitudeRecommendation.objects.bulk_create(to_create)
+        AmplitudeRecommendation.objects.bulk_update(
+            to_update, ["is_control", "has_is_control", "items", "fetched_at"]
+        )
@@ -0,0 +1,32 @@
+# Generated by Django 4.0.10 on 2026-10-16 22:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AmplitudeRecommendation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recommendation_id', models.CharField(help_text='Amplitude model id', max_length=255)),
+                ('is_control', models.BooleanField(null=True)),
+                ('has_is_control', models.BooleanField(null=True)),
+                ('items', models.JSONField(default=list, help_text='Course keys returned by Amplitude')),
+                ('fetched_at', models.DateTimeField(db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'recommendation_id')},
+            },
+        ),
+    ]
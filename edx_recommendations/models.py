@@ -0,0 +1,43 @@
+"""
+Database models for edx_recommendations.
+"""
+from django.conf import settings
+from django.db import models
+
+
+class AmplitudeRecommendation(models.Model):
+    """
+    Amplitude recommendations for a user, materialized offline.
+
+    Rows are written by the materialize_amplitude_recommendations management command.
+
+    .. no_pii: This model only holds a user id and course keys recommended to that user.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    recommendation_id = models.CharField(max_length=255, help_text="Amplitude model id")
+    is_control = models.BooleanField(null=True)
+    has_is_control = models.BooleanField(null=True)
+    items = models.JSONField(default=list, help_text="Course keys returned by Amplitude")
+    fetched_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        """
+        Meta options for AmplitudeRecommendation.
+        """
+
+        app_label = "edx_recommendations"
+        unique_together = ("user", "recommendation_id")
+
+    def __str__(self):
+        """
+        Identify the row by user and Amplitude model.
+        """
+        return f"AmplitudeRecommendation(user_id={self.user_id}, recommendation_id={self.recommendation_id})"
+
+    @property
+    def recommendations(self):
+        """
+        Return the stored (is_control, has_is_control, recommended_course_keys) tuple.
+        """
+        return self.is_control, self.has_is_control, self.items
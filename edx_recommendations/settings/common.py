@@ -10,3 +10,48 @@ def plugin_settings(settings):
     settings.COURSE_ABOUT_PAGE_AMPLITUDE_MODEL_ID = ""
     settings.LEARNER_DASHBOARD_AMPLITUDE_MODEL_ID = ""
     settings.GENERAL_RECOMMENDATIONS = []
+    settings.AMPLITUDE_HTTP_POOL_CONNECTIONS = 1
+    settings.AMPLITUDE_HTTP_POOL_MAXSIZE = 10
+    settings.AMPLITUDE_HTTP_POOL_BLOCK = False
+    settings.AMPLITUDE_CONNECT_TIMEOUT = 1
+    settings.AMPLITUDE_READ_TIMEOUT = 2
+    settings.AMPLITUDE_RECOMMENDATIONS_CACHE_TIMEOUT = 60 * 60
+    settings.AMPLITUDE_RECOMMENDATIONS_NEGATIVE_CACHE_TIMEOUT = 5 * 60
+    settings.AMPLITUDE_RECOMMENDATIONS_CACHE_EARLY_REFRESH = 5 * 60
+    settings.AMPLITUDE_RECOMMENDATIONS_CACHE_LOCK_TIMEOUT = 5
+    settings.RECOMMENDATIONS_COURSE_DATA_CACHE_TIMEOUT = 15 * 60
+    settings.RECOMMENDATIONS_CATALOG_FETCH_WORKERS = 4
+    settings.RECOMMENDATIONS_CATALOG_FETCH_TIMEOUT = 5
+    settings.RECOMMENDATIONS_CATALOG_LOOKAHEAD = 2
+    settings.RECOMMENDATIONS_COURSE_DATA_LOCAL_CACHE_SIZE = 1000
+    settings.RECOMMENDATIONS_COURSE_DATA_LOCAL_CACHE_TIMEOUT = 60
+    settings.RECOMMENDATIONS_COURSE_DATA_STALE_TIMEOUT = 60 * 60
+    settings.RECOMMENDATIONS_UNSERVABLE_COURSE_CACHE_TIMEOUT = 30 * 60
+    settings.RECOMMENDATIONS_VIEW_WORKERS = 8
+    settings.AMPLITUDE_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+    settings.AMPLITUDE_CIRCUIT_BREAKER_LATENCY_THRESHOLD = 2
+    settings.AMPLITUDE_CIRCUIT_BREAKER_RECOVERY_TIMEOUT = 30
+    settings.RECOMMENDATIONS_LATENCY_BUDGETS = {}
+    settings.AMPLITUDE_RECOMMENDATIONS_STORE_MAX_AGE = 24 * 60 * 60
+    settings.RECOMMENDATIONS_CROSS_PRODUCT_PAYLOAD_TIMEOUT = 24 * 60 * 60
+    settings.RECOMMENDATIONS_FRAGMENT_CACHE_SIZE = 5000
+    settings.RECOMMENDATIONS_GEOIP_CACHE_SIZE = 10000
+    settings.RECOMMENDATIONS_GEOIP_CACHE_TIMEOUT = 60 * 60
+    settings.RECOMMENDATIONS_GEOIP_CACHE_IPV4_PREFIX = 32
+    settings.RECOMMENDATIONS_GEOIP_CACHE_IPV6_PREFIX = 128
+    settings.RECOMMENDATIONS_EVENT_QUEUE_SIZE = 1000
+    settings.RECOMMENDATIONS_EVENT_BATCH_SIZE = 50
+    settings.RECOMMENDATIONS_EVENT_FLUSH_INTERVAL = 1
+    settings.RECOMMENDATIONS_EVENT_ENQUEUE_TIMEOUT = 0
+    settings.RECOMMENDATIONS_EVENT_SHUTDOWN_FLUSH_TIMEOUT = 5
+    settings.RECOMMENDATIONS_SERVER_TIMING_HEADER = False
+    settings.RECOMMENDATIONS_TOGGLE_SNAPSHOT_TIMEOUT = 0
+    settings.RECOMMENDATIONS_UT_AUSTIN_CACHE_TIMEOUT = 24 * 60 * 60
+    settings.RECOMMENDATIONS_RESULT_CACHE_TIMEOUT = 15 * 60
+    settings.RECOMMENDATIONS_PRECOMPUTE_ENABLED = False
+    settings.RECOMMENDATIONS_PRECOMPUTE_WORKERS = 2
+    settings.RECOMMENDATIONS_PRECOMPUTE_MAX_PENDING = 100
+    settings.RECOMMENDATIONS_PRECOMPUTE_DEDUPE_TIMEOUT = 60
+    settings.RECOMMENDATIONS_BULK_MAX_USERS = 10000
+    settings.RECOMMENDATIONS_BULK_CHUNK_SIZE = 200
+    settings.RECOMMENDATIONS_BULK_WORKERS = 8
@@ -16,3 +16,138 @@ def plugin_settings(settings):
     settings.GENERAL_RECOMMENDATIONS = settings.ENV_TOKENS.get(
         "GENERAL_RECOMMENDATIONS", []
     )
+    settings.AMPLITUDE_HTTP_POOL_CONNECTIONS = settings.ENV_TOKENS.get(
+        "AMPLITUDE_HTTP_POOL_CONNECTIONS", settings.AMPLITUDE_HTTP_POOL_CONNECTIONS
+    )
+    settings.AMPLITUDE_HTTP_POOL_MAXSIZE = settings.ENV_TOKENS.get(
+        "AMPLITUDE_HTTP_POOL_MAXSIZE", settings.AMPLITUDE_HTTP_POOL_MAXSIZE
+    )
+    settings.AMPLITUDE_HTTP_POOL_BLOCK = settings.ENV_TOKENS.get(
+        "AMPLITUDE_HTTP_POOL_BLOCK", settings.AMPLITUDE_HTTP_POOL_BLOCK
+    )
+    settings.AMPLITUDE_CONNECT_TIMEOUT = settings.ENV_TOKENS.get(
+        "AMPLITUDE_CONNECT_TIMEOUT", settings.AMPLITUDE_CONNECT_TIMEOUT
+    )
+    settings.AMPLITUDE_READ_TIMEOUT = settings.ENV_TOKENS.get(
+        "AMPLITUDE_READ_TIMEOUT", settings.AMPLITUDE_READ_TIMEOUT
+    )
+    settings.AMPLITUDE_RECOMMENDATIONS_CACHE_TIMEOUT = settings.ENV_TOKENS.get(
+        "AMPLITUDE_RECOMMENDATIONS_CACHE_TIMEOUT", settings.AMPLITUDE_RECOMMENDATIONS_CACHE_TIMEOUT
+    )
+    settings.AMPLITUDE_RECOMMENDATIONS_NEGATIVE_CACHE_TIMEOUT = settings.ENV_TOKENS.get(
+        "AMPLITUDE_RECOMMENDATIONS_NEGATIVE_CACHE_TIMEOUT", settings.AMPLITUDE_RECOMMENDATIONS_NEGATIVE_CACHE_TIMEOUT
+    )
+    settings.AMPLITUDE_RECOMMENDATIONS_CACHE_EARLY_REFRESH = settings.ENV_TOKENS.get(
+        "AMPLITUDE_RECOMMENDATIONS_CACHE_EARLY_REFRESH", settings.AMPLITUDE_RECOMMENDATIONS_CACHE_EARLY_REFRESH
+    )
+    settings.AMPLITUDE_RECOMMENDATIONS_CACHE_LOCK_TIMEOUT = settings.ENV_TOKENS.get(
+        "AMPLITUDE_RECOMMENDATIONS_CACHE_LOCK_TIMEOUT", settings.AMPLITUDE_RECOMMENDATIONS_CACHE_LOCK_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_COURSE_DATA_CACHE_TIMEOUT = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_COURSE_DATA_CACHE_TIMEOUT", settings.RECOMMENDATIONS_COURSE_DATA_CACHE_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_CATALOG_FETCH_WORKERS = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_CATALOG_FETCH_WORKERS", settings.RECOMMENDATIONS_CATALOG_FETCH_WORKERS
+    )
+    settings.RECOMMENDATIONS_CATALOG_FETCH_TIMEOUT = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_CATALOG_FETCH_TIMEOUT", settings.RECOMMENDATIONS_CATALOG_FETCH_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_CATALOG_LOOKAHEAD = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_CATALOG_LOOKAHEAD", settings.RECOMMENDATIONS_CATALOG_LOOKAHEAD
+    )
+    settings.RECOMMENDATIONS_COURSE_DATA_LOCAL_CACHE_SIZE = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_COURSE_DATA_LOCAL_CACHE_SIZE", settings.RECOMMENDATIONS_COURSE_DATA_LOCAL_CACHE_SIZE
+    )
+    settings.RECOMMENDATIONS_COURSE_DATA_LOCAL_CACHE_TIMEOUT = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_COURSE_DATA_LOCAL_CACHE_TIMEOUT", settings.RECOMMENDATIONS_COURSE_DATA_LOCAL_CACHE_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_COURSE_DATA_STALE_TIMEOUT = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_COURSE_DATA_STALE_TIMEOUT", settings.RECOMMENDATIONS_COURSE_DATA_STALE_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_UNSERVABLE_COURSE_CACHE_TIMEOUT = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_UNSERVABLE_COURSE_CACHE_TIMEOUT", settings.RECOMMENDATIONS_UNSERVABLE_COURSE_CACHE_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_VIEW_WORKERS = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_VIEW_WORKERS", settings.RECOMMENDATIONS_VIEW_WORKERS
+    )
+    settings.AMPLITUDE_CIRCUIT_BREAKER_FAILURE_THRESHOLD = settings.ENV_TOKENS.get(
+        "AMPLITUDE_CIRCUIT_BREAKER_FAILURE_THRESHOLD", settings.AMPLITUDE_CIRCUIT_BREAKER_FAILURE_THRESHOLD
+    )
+    settings.AMPLITUDE_CIRCUIT_BREAKER_LATENCY_THRESHOLD = settings.ENV_TOKENS.get(
+        "AMPLITUDE_CIRCUIT_BREAKER_LATENCY_THRESHOLD", settings.AMPLITUDE_CIRCUIT_BREAKER_LATENCY_THRESHOLD
+    )
+    settings.AMPLITUDE_CIRCUIT_BREAKER_RECOVERY_TIMEOUT = settings.ENV_TOKENS.get(
+        "AMPLITUDE_CIRCUIT_BREAKER_RECOVERY_TIMEOUT", settings.AMPLITUDE_CIRCUIT_BREAKER_RECOVERY_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_LATENCY_BUDGETS = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_LATENCY_BUDGETS", settings.RECOMMENDATIONS_LATENCY_BUDGETS
+    )
+    settings.AMPLITUDE_RECOMMENDATIONS_STORE_MAX_AGE = settings.ENV_TOKENS.get(
+        "AMPLITUDE_RECOMMENDATIONS_STORE_MAX_AGE", settings.AMPLITUDE_RECOMMENDATIONS_STORE_MAX_AGE
+    )
+    settings.RECOMMENDATIONS_CROSS_PRODUCT_PAYLOAD_TIMEOUT = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_CROSS_PRODUCT_PAYLOAD_TIMEOUT", settings.RECOMMENDATIONS_CROSS_PRODUCT_PAYLOAD_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_FRAGMENT_CACHE_SIZE = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_FRAGMENT_CACHE_SIZE", settings.RECOMMENDATIONS_FRAGMENT_CACHE_SIZE
+    )
+    settings.RECOMMENDATIONS_GEOIP_CACHE_SIZE = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_GEOIP_CACHE_SIZE", settings.RECOMMENDATIONS_GEOIP_CACHE_SIZE
+    )
+    settings.RECOMMENDATIONS_GEOIP_CACHE_TIMEOUT = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_GEOIP_CACHE_TIMEOUT", settings.RECOMMENDATIONS_GEOIP_CACHE_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_GEOIP_CACHE_IPV4_PREFIX = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_GEOIP_CACHE_IPV4_PREFIX", settings.RECOMMENDATIONS_GEOIP_CACHE_IPV4_PREFIX
+    )
+    settings.RECOMMENDATIONS_GEOIP_CACHE_IPV6_PREFIX = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_GEOIP_CACHE_IPV6_PREFIX", settings.RECOMMENDATIONS_GEOIP_CACHE_IPV6_PREFIX
+    )
+    settings.RECOMMENDATIONS_EVENT_QUEUE_SIZE = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_EVENT_QUEUE_SIZE", settings.RECOMMENDATIONS_EVENT_QUEUE_SIZE
+    )
+    settings.RECOMMENDATIONS_EVENT_BATCH_SIZE = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_EVENT_BATCH_SIZE", settings.RECOMMENDATIONS_EVENT_BATCH_SIZE
+    )
+    settings.RECOMMENDATIONS_EVENT_FLUSH_INTERVAL = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_EVENT_FLUSH_INTERVAL", settings.RECOMMENDATIONS_EVENT_FLUSH_INTERVAL
+    )
+    settings.RECOMMENDATIONS_EVENT_ENQUEUE_TIMEOUT = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_EVENT_ENQUEUE_TIMEOUT", settings.RECOMMENDATIONS_EVENT_ENQUEUE_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_EVENT_SHUTDOWN_FLUSH_TIMEOUT = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_EVENT_SHUTDOWN_FLUSH_TIMEOUT", settings.RECOMMENDATIONS_EVENT_SHUTDOWN_FLUSH_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_SERVER_TIMING_HEADER = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_SERVER_TIMING_HEADER", settings.RECOMMENDATIONS_SERVER_TIMING_HEADER
+    )
+    settings.RECOMMENDATIONS_TOGGLE_SNAPSHOT_TIMEOUT = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_TOGGLE_SNAPSHOT_TIMEOUT", settings.RECOMMENDATIONS_TOGGLE_SNAPSHOT_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_UT_AUSTIN_CACHE_TIMEOUT = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_UT_AUSTIN_CACHE_TIMEOUT", settings.RECOMMENDATIONS_UT_AUSTIN_CACHE_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_RESULT_CACHE_TIMEOUT = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_RESULT_CACHE_TIMEOUT", settings.RECOMMENDATIONS_RESULT_CACHE_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_PRECOMPUTE_ENABLED = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_PRECOMPUTE_ENABLED", settings.RECOMMENDATIONS_PRECOMPUTE_ENABLED
+    )
+    settings.RECOMMENDATIONS_PRECOMPUTE_WORKERS = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_PRECOMPUTE_WORKERS", settings.RECOMMENDATIONS_PRECOMPUTE_WORKERS
+    )
+    settings.RECOMMENDATIONS_PRECOMPUTE_MAX_PENDING = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_PRECOMPUTE_MAX_PENDING", settings.RECOMMENDATIONS_PRECOMPUTE_MAX_PENDING
+    )
+    settings.RECOMMENDATIONS_PRECOMPUTE_DEDUPE_TIMEOUT = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_PRECOMPUTE_DEDUPE_TIMEOUT", settings.RECOMMENDATIONS_PRECOMPUTE_DEDUPE_TIMEOUT
+    )
+    settings.RECOMMENDATIONS_BULK_MAX_USERS = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_BULK_MAX_USERS", settings.RECOMMENDATIONS_BULK_MAX_USERS
+    )
+    settings.RECOMMENDATIONS_BULK_CHUNK_SIZE = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_BULK_CHUNK_SIZE", settings.RECOMMENDATIONS_BULK_CHUNK_SIZE
+    )
+    settings.RECOMMENDATIONS_BULK_WORKERS = settings.ENV_TOKENS.get(
+        "RECOMMENDATIONS_BULK_WORKERS", settings.RECOMMENDATIONS_BULK_WORKERS
+    )
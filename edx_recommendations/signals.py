@@ -0,0 +1,52 @@
+"""
+Signal receivers of edx_recommendations, registered through the plugin signals config in apps.py.
+"""
+from functools import partial
+
+import crum
+from django.db import transaction
+from ipware.ip import get_client_ip
+
+from edx_recommendations.api.precompute import schedule_recommendations_precompute
+from edx_recommendations.api.result_cache import bump_enrollment_version
+from edx_recommendations.api.utils import invalidate_ut_austin_masters_program_cache
+
+
+def invalidate_ut_austin_masters_program_cache_on_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Forget the cached UT Austin masters program check when a ProgramEnrollment is saved or deleted.
+
+    Program enrollments of external learners who have not linked an account yet have no user.
+    """
+    if instance.user_id is not None:
+        invalidate_ut_austin_masters_program_cache(instance.user_id)
+
+
+def _client_ip(request):
+    return get_client_ip(request)[0] if request is not None else None
+
+
+def refresh_recommendations_on_enrollment_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Retire a user's cached recommendations once a change to their CourseEnrollments is committed.
+
+    The recommendations are then scheduled to be precomputed, if that is enabled.
+
+    Bumping before the commit would let a concurrent request cache results computed from the
+    enrollments as they were before the change under the new version.
+    """
+    transaction.on_commit(
+        partial(_enrollment_changed, instance.user_id, _client_ip(crum.get_current_request()))
+    )
+
+
+def _enrollment_changed(user_id, ip_address):
+    bump_enrollment_version(user_id)
+    schedule_recommendations_precompute(user_id, ip_address)
+
+
+def precompute_recommendations_on_login(sender, request, user, **kwargs):  # pylint: disable=unused-argument
+    """
+    Schedules the recommendations of a user who just logged in to be precomputed, if that is enabled.
+    """
+    schedule_recommendations_precompute(user.id, _client_ip(request))
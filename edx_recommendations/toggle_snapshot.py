@@ -0,0 +1,131 @@
+"""
+Request-scoped snapshot of waffle flags.
+
+Reading a waffle flag costs a cache round trip per flag, plus a database query for each flag
+missing from the cache. A snapshot fetches all the flags it is built for with one cache get_many
+and at most one query, and is kept in the request cache, so every flag read of a request after
+the first is free. The round trips are counted as the toggle_cache_round_trips and
+toggle_db_queries request timing counters.
+
+With RECOMMENDATIONS_TOGGLE_SNAPSHOT_TIMEOUT above 0 the fetched flags are also kept in a
+process-local cache for that many seconds, so most requests make no round trip at all; changes
+to the flags then take up to that long to apply.
+"""
+import threading
+import time
+
+import crum
+from django.conf import settings
+from django.db import router
+from edx_django_utils.cache import RequestCache
+from waffle import get_waffle_flag_model
+from waffle.models import CACHE_EMPTY
+from waffle.utils import get_cache, get_setting
+
+from edx_recommendations.api.timing import increment, timed
+
+REQUEST_CACHE_NAMESPACE = "edx_recommendations.toggle_snapshot"
+
+_local_flags = {}
+_local_flags_lock = threading.Lock()
+
+
+class ToggleSnapshot:
+    """
+    Waffle flags fetched once and evaluated for one request.
+    """
+
+    def __init__(self, flags, request):
+        self._flags = flags
+        self._request = request
+        self._values = {}
+
+    def is_enabled(self, flag_name):
+        """
+        Return whether the flag is enabled for the request, evaluating it the first time it is read.
+
+        Without a request, like WaffleFlag, only flags active for everyone are enabled.
+        """
+        value = self._values.get(flag_name)
+        if value is None:
+            flag = self._flags[flag_name]
+            value = flag.is_active(self._request) if self._request else flag.everyone is True
+            self._values[flag_name] = value
+        return value
+
+
+def _fetch_flags(flag_names):
+    """
+    Return {flag_name: Flag} with one cache round trip and at most one query.
+
+    Flags missing from waffle's cache are stored in it, the way Flag.get does.
+    """
+    flag_model = get_waffle_flag_model()
+    cache = get_cache()
+    cache_keys = {name: flag_model._cache_key(name) for name in flag_names}  # pylint: disable=protected-access
+    cached = cache.get_many(list(cache_keys.values()))
+    increment("toggle_cache_round_trips")
+
+    flags, missing = {}, []
+    for name, cache_key in cache_keys.items():
+        value = cached.get(cache_key)
+        if value == CACHE_EMPTY:
+            flags[name] = flag_model(name=name)
+        elif value:
+            flags[name] = value
+        else:
+            missing.append(name)
+
+    if missing:
+        objects = flag_model.objects
+        if get_setting("READ_FROM_WRITE_DB"):
+            objects = objects.using(router.db_for_write(flag_model))
+        found = {flag.name: flag for flag in objects.filter(name__in=missing)}
+        increment("toggle_db_queries")
+        cache.set_many({cache_keys[name]: found.get(name, CACHE_EMPTY) for name in missing})
+        increment("toggle_cache_round_trips")
+        for name in missing:
+            flags[name] = found.get(name) or flag_model(name=name)
+    return flags
+
+
+def _get_flags(flag_names):
+    """
+    Return {flag_name: Flag}, from the process-local cache while RECOMMENDATIONS_TOGGLE_SNAPSHOT_TIMEOUT allows.
+    """
+    timeout = settings.RECOMMENDATIONS_TOGGLE_SNAPSHOT_TIMEOUT
+    if timeout <= 0:
+        return _fetch_flags(flag_names)
+
+    with _local_flags_lock:
+        cached = _local_flags.get(flag_names)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+
+    flags = _fetch_flags(flag_names)
+    with _local_flags_lock:
+        _local_flags[flag_names] = (flags, time.monotonic() + timeout)
+    return flags
+
+
+def clear_local_flags():
+    """
+    Empty the process-local flag cache.
+    """
+    with _local_flags_lock:
+        _local_flags.clear()
+
+
+def get_toggle_snapshot(flag_names):
+    """
+    Return the ToggleSnapshot of the tuple flag_names for the current request, fetching the flags on first use.
+    """
+    request_cache = RequestCache(REQUEST_CACHE_NAMESPACE)
+    cached = request_cache.get_cached_response(flag_names)
+    if cached.is_found:
+        return cached.value
+
+    with timed("toggles"):
+        snapshot = ToggleSnapshot(_get_flags(flag_names), crum.get_current_request())
+    request_cache.set(flag_names, snapshot)
+    return snapshot
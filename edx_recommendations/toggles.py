@@ -3,6 +3,8 @@ Toggles for learner recommendations.
 """
 from edx_toggles.toggles import WaffleFlag
 
+from edx_recommendations.toggle_snapshot import get_toggle_snapshot
+
 # Namespace for edx_recommendations waffle flags.
 WAFFLE_FLAG_NAMESPACE = "edx_recommendations"
 
@@ -49,3 +51,24 @@ ENABLE_DASHBOARD_RECOMMENDATIONS = WaffleFlag(
 FALLBACK_RECOMMENDATIONS = WaffleFlag(
     f"{WAFFLE_FLAG_NAMESPACE}.enable_fallback_recommendations", __name__
 )
+
+# Flags resolved together by is_enabled.
+RECOMMENDATIONS_FLAGS = (
+    ENABLE_COURSE_ABOUT_PAGE_RECOMMENDATIONS,
+    ENABLE_DASHBOARD_RECOMMENDATIONS,
+    FALLBACK_RECOMMENDATIONS,
+)
+
+
+def is_enabled(flag):
+    """
+    Return whether flag is enabled for the current request.
+
+    The first call of a request fetches all RECOMMENDATIONS_FLAGS at once into a toggle snapshot,
+    which later calls read from. Like WaffleFlag, values set in the flag's request cache, such as
+    override_waffle_flag overrides, take precedence.
+    """
+    value = flag.cached_flags().get(flag.name)
+    if value is not None:
+        return value
+    return get_toggle_snapshot(tuple(flag.name for flag in RECOMMENDATIONS_FLAGS)).is_enabled(flag.name)
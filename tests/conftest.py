@@ -0,0 +1,18 @@
+"""
+Shared fixtures for the `edx-recommendations` tests.
+"""
+import pytest
+from django.core.cache import cache
+
+from edx_recommendations.settings.common import plugin_settings
+
+
+@pytest.fixture(autouse=True)
+def recommendations_settings(settings):
+    """
+    Apply the app's default settings, which the test settings module does not load, on an empty cache.
+    """
+    plugin_settings(settings)
+    cache.clear()
+    yield settings
+    cache.clear()
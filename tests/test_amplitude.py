@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` amplitude module.
+"""
+import time
+from unittest import mock
+
+import pytest
+
+from edx_recommendations.api import amplitude
+
+
+@pytest.fixture
+def breaker():
+    return amplitude.CircuitBreaker("test", failure_threshold=3, latency_threshold=1, recovery_timeout=30)
+
+
+def _open(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_call(False, 0)
+
+
+def _after_recovery(breaker):
+    return mock.patch.object(amplitude.time, "monotonic", return_value=time.monotonic() + breaker.recovery_timeout)
+
+
+def test_breaker_opens_at_the_failure_threshold(breaker):
+    """
+    The breaker stays closed until failure_threshold consecutive failures, then rejects calls.
+    """
+    for _ in range(breaker.failure_threshold - 1):
+        breaker.before_call()
+        breaker.record_call(False, 0)
+    assert breaker.state == breaker.CLOSED
+
+    breaker.before_call()
+    breaker.record_call(False, 0)
+    assert breaker.state == breaker.OPEN
+    with pytest.raises(amplitude.AmplitudeCircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_resets_failures_on_success(breaker):
+    """
+    Failures only open the breaker when they are consecutive.
+    """
+    for _ in range(breaker.failure_threshold - 1):
+        breaker.record_call(False, 0)
+    breaker.record_call(True, 0)
+    breaker.record_call(False, 0)
+
+    assert breaker.state == breaker.CLOSED
+
+
+def test_breaker_counts_slow_calls_as_failures(breaker):
+    """
+    Successful calls slower than latency_threshold count towards opening the breaker.
+    """
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_call(True, breaker.latency_threshold + 0.5)
+
+    assert breaker.state == breaker.OPEN
+
+
+def test_breaker_lets_a_single_probe_through_when_half_open(breaker):
+    """
+    After recovery_timeout one probe is let through; its success closes the breaker.
+    """
+    _open(breaker)
+    with _after_recovery(breaker):
+        breaker.before_call()
+        assert breaker.state == breaker.HALF_OPEN
+        with pytest.raises(amplitude.AmplitudeCircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_call(True, 0)
+        assert breaker.state == breaker.CLOSED
+        breaker.before_call()
+
+
+def test_breaker_reopens_when_the_probe_fails(breaker):
+    """
+    A failed probe opens the breaker again for another recovery_timeout.
+    """
+    _open(breaker)
+    with _after_recovery(breaker):
+        breaker.before_call()
+        breaker.record_call(False, 0)
+        assert breaker.state == breaker.OPEN
+        with pytest.raises(amplitude.AmplitudeCircuitOpenError):
+            breaker.before_call()
+
+
+def test_cancelled_probe_lets_another_probe_through(breaker):
+    """
+    A probe abandoned with cancel_call leaves the breaker half-open and frees the probe slot.
+    """
+    _open(breaker)
+    with _after_recovery(breaker):
+        breaker.before_call()
+        breaker.cancel_call()
+        assert breaker.state == breaker.HALF_OPEN
+        breaker.before_call()
+
+
+def test_breaker_ignores_outcomes_of_calls_started_before_it_opened(breaker):
+    """
+    A slow success of a call let through while closed does not close the breaker it saw open.
+    """
+    generation = breaker.before_call()
+    _open(breaker)
+
+    breaker.record_call(True, 0, generation)
+    assert breaker.state == breaker.OPEN
+    with pytest.raises(amplitude.AmplitudeCircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_ignores_failures_of_calls_started_before_it_closed(breaker):
+    """
+    Failures of calls started before the breaker recovered do not count towards opening it again.
+    """
+    stale = [breaker.before_call() for _ in range(breaker.failure_threshold)]
+    _open(breaker)
+    with _after_recovery(breaker):
+        probe = breaker.before_call()
+        breaker.record_call(True, 0, probe)
+
+    for generation in stale:
+        breaker.record_call(False, 0, generation)
+    assert breaker.state == breaker.CLOSED
+
+
+@pytest.mark.parametrize("status_code, failed", [(401, True), (403, True), (429, True), (503, True), (404, False)])
+def test_breaker_counts_unusable_responses_as_failures(settings, status_code, failed):
+    """
+    Besides server errors, auth failures and rate limiting count as failed calls; other client errors do not.
+    """
+    pytest.importorskip("common.djangoapps.student.models")
+    from edx_recommendations.api import utils  # pylint: disable=import-outside-toplevel
+
+    settings.AMPLITUDE_URL = "https://amplitude.example.com/"
+    settings.AMPLITUDE_API_KEY = "key"
+    breaker = amplitude.CircuitBreaker("test", failure_threshold=1, latency_threshold=1, recovery_timeout=30)
+    with mock.patch.object(utils, "get_amplitude_session") as get_amplitude_session, \
+            mock.patch.object(utils, "get_amplitude_circuit_breaker", return_value=breaker):
+        get_amplitude_session.return_value.get.return_value = mock.Mock(status_code=status_code)
+        with pytest.raises(amplitude.AmplitudeResponseError):
+            utils._fetch_amplitude_course_recommendations(1, "model")  # pylint: disable=protected-access
+
+    assert breaker.state == (breaker.OPEN if failed else breaker.CLOSED)
+
+
+def test_circuit_breaker_is_configured_from_settings(settings):
+    """
+    The process-wide breaker is created once, from the AMPLITUDE_CIRCUIT_BREAKER_* settings.
+    """
+    settings.AMPLITUDE_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 7
+    amplitude._circuit_breaker = None  # pylint: disable=protected-access
+    try:
+        breaker = amplitude.get_amplitude_circuit_breaker()
+        assert breaker.failure_threshold == 7
+        assert amplitude.get_amplitude_circuit_breaker() is breaker
+    finally:
+        amplitude._circuit_breaker = None  # pylint: disable=protected-access
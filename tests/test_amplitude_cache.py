@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Tests for the Amplitude recommendations cache of the `edx-recommendations` amplitude module.
+"""
+import threading
+import time
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+
+from edx_recommendations.api import amplitude
+
+RECOMMENDATIONS = (False, True, ["edX+A", "edX+B"])
+
+
+def test_cached_recommendations_are_fetched_once():
+    """
+    A miss is fetched and cached; the next call is served from the cache.
+    """
+    fetch = mock.Mock(return_value=RECOMMENDATIONS)
+
+    assert amplitude.get_cached_amplitude_recommendations(1, "model", fetch) == RECOMMENDATIONS
+    assert amplitude.get_cached_amplitude_recommendations(1, "model", fetch) == RECOMMENDATIONS
+    assert amplitude.get_cached_amplitude_recommendations(2, "model", fetch) == RECOMMENDATIONS
+    assert fetch.call_args_list == [mock.call(1, "model"), mock.call(2, "model")]
+
+
+def test_concurrent_misses_share_one_fetch():
+    """
+    Callers missing the same entry at once wait for the one caller holding the lock to fetch it.
+    """
+    fetch_started = threading.Event()
+    fetch_calls = []
+
+    def fetch(user_id, recommendation_id):
+        fetch_calls.append((user_id, recommendation_id))
+        fetch_started.set()
+        time.sleep(0.2)
+        return RECOMMENDATIONS
+
+    results = []
+
+    def get():
+        results.append(amplitude.get_cached_amplitude_recommendations(1, "model", fetch))
+
+    first = threading.Thread(target=get)
+    first.start()
+    fetch_started.wait(5)
+    waiters = [threading.Thread(target=get) for _ in range(4)]
+    for waiter in waiters:
+        waiter.start()
+    for thread in [first] + waiters:
+        thread.join(5)
+
+    assert fetch_calls == [(1, "model")]
+    assert results == [RECOMMENDATIONS] * 5
+
+
+def test_failed_refresh_serves_the_cached_value():
+    """
+    When a due refresh fails, the cached value is served and the lock is released for a retry.
+    """
+    cache_key, lock_key = amplitude._amplitude_cache_keys(1, "model")  # pylint: disable=protected-access
+    cache.set(cache_key, {"recommendations": RECOMMENDATIONS, "refresh_at": 0}, 60)
+    fetch = mock.Mock(side_effect=amplitude.AmplitudeResponseError(503))
+
+    assert amplitude.get_cached_amplitude_recommendations(1, "model", fetch) == RECOMMENDATIONS
+    assert fetch.call_count == 1
+    assert cache.get(lock_key) is None
+
+
+def test_errors_are_not_cached():
+    """
+    An error on a cold miss is raised and nothing is cached, so the next call fetches again.
+    """
+    fetch = mock.Mock(side_effect=[amplitude.AmplitudeResponseError(500), RECOMMENDATIONS])
+
+    with pytest.raises(amplitude.AmplitudeResponseError):
+        amplitude.get_cached_amplitude_recommendations(1, "model", fetch)
+    assert amplitude.get_cached_amplitude_recommendations(1, "model", fetch) == RECOMMENDATIONS
+    assert fetch.call_count == 2
+
+
+def test_empty_recommendations_use_the_negative_timeout(settings):
+    """
+    Empty results are cached for AMPLITUDE_RECOMMENDATIONS_NEGATIVE_CACHE_TIMEOUT seconds only.
+    """
+    settings.AMPLITUDE_RECOMMENDATIONS_NEGATIVE_CACHE_TIMEOUT = 30
+    settings.AMPLITUDE_RECOMMENDATIONS_CACHE_EARLY_REFRESH = 10
+    fetch = mock.Mock(return_value=(True, False, []))
+
+    with mock.patch.object(amplitude, "cache", wraps=cache) as cache_mock:
+        amplitude.get_cached_amplitude_recommendations(1, "model", fetch)
+        amplitude.get_cached_amplitude_recommendations(1, "model", fetch)
+
+    assert fetch.call_count == 1
+    (_, entry, timeout), _ = cache_mock.set.call_args
+    assert timeout == 30
+    assert entry["refresh_at"] == pytest.approx(time.time() + 20, abs=1)
+
+
+def test_empty_recommendations_are_not_cached_without_a_negative_timeout(settings):
+    """
+    With AMPLITUDE_RECOMMENDATIONS_NEGATIVE_CACHE_TIMEOUT at 0 every call fetches empty results again.
+    """
+    settings.AMPLITUDE_RECOMMENDATIONS_NEGATIVE_CACHE_TIMEOUT = 0
+    fetch = mock.Mock(return_value=(True, False, []))
+
+    amplitude.get_cached_amplitude_recommendations(1, "model", fetch)
+    amplitude.get_cached_amplitude_recommendations(1, "model", fetch)
+
+    assert fetch.call_count == 2
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+"""
+Tests for the shared Amplitude session of the `edx-recommendations` amplitude module.
+"""
+from edx_recommendations.api import amplitude
+
+
+def test_session_is_shared_and_pooled(settings):
+    """
+    One session with a pool sized by AMPLITUDE_HTTP_POOL_MAXSIZE is shared until it is reset.
+    """
+    settings.AMPLITUDE_URL = "https://amplitude.example.com/"
+    settings.AMPLITUDE_HTTP_POOL_MAXSIZE = 3
+    amplitude.reset_amplitude_session()
+    try:
+        session = amplitude.get_amplitude_session()
+        assert amplitude.get_amplitude_session() is session
+        assert session.get_adapter(settings.AMPLITUDE_URL)._pool_maxsize == 3  # pylint: disable=protected-access
+        assert amplitude.get_amplitude_pool_stats()["pool_maxsize"] == 3
+
+        amplitude.reset_amplitude_session()
+        assert amplitude.get_amplitude_session() is not session
+    finally:
+        amplitude.reset_amplitude_session()
+
+
+def test_timeout_comes_from_settings(settings):
+    """
+    Calls use the (connect, read) timeouts of the settings.
+    """
+    settings.AMPLITUDE_CONNECT_TIMEOUT = 0.5
+    settings.AMPLITUDE_READ_TIMEOUT = 1.5
+
+    assert amplitude.get_amplitude_timeout() == (0.5, 1.5)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` bulk_recommendations module.
+"""
+import json
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from edx_recommendations.models import AmplitudeRecommendation
+
+bulk_recommendations = pytest.importorskip("edx_recommendations.api.bulk_recommendations")
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+def _course(course_key):
+    return {
+        "key": course_key,
+        "title": course_key,
+        "image": {"src": f"https://example.com/{course_key}.png"},
+        "url_slug": course_key.lower(),
+        "owners": [{"key": "edX", "name": "edX", "logo_image_url": None}],
+        "course_type": "verified-audit",
+    }
+
+
+@pytest.fixture
+def learners(settings):
+    """
+    Three learners: one with stored recommendations, one served by Amplitude and one Amplitude fails for.
+    """
+    settings.GENERAL_RECOMMENDATIONS = [_course("edX+General")]
+    stored, live, failing = (User.objects.create(username=f"learner{index}") for index in range(3))
+    AmplitudeRecommendation.objects.create(
+        user=stored, recommendation_id=settings.LEARNER_DASHBOARD_AMPLITUDE_MODEL_ID, items=["edX+Stored"],
+        fetched_at=timezone.now(),
+    )
+
+    def get_amplitude_course_recommendations(user_id, recommendation_id):  # pylint: disable=unused-argument
+        if user_id == failing.id:
+            raise ValueError("Amplitude is down")
+        return False, True, ["edX+Live"]
+
+    def filter_recommended_courses(user, course_keys, **kwargs):  # pylint: disable=unused-argument
+        return [_course(course_key) for course_key in course_keys]
+
+    patched = {
+        "get_amplitude_course_recommendations": mock.Mock(side_effect=get_amplitude_course_recommendations),
+        "filter_recommended_courses": mock.Mock(side_effect=filter_recommended_courses),
+        "prefetch_recommended_courses": mock.Mock(),
+    }
+    with mock.patch.multiple(bulk_recommendations, **patched):
+        yield stored, live, failing, patched
+
+
+@pytest.fixture
+def staff():
+    return User.objects.create(username="staff", is_staff=True)
+
+
+def _post(data, user):
+    request = APIRequestFactory().post("/", data, format="json")
+    force_authenticate(request, user)
+    return bulk_recommendations.BulkRecommendationsView.as_view()(request)
+
+
+def _records(response):
+    assert response["Content-Type"] == "application/x-ndjson"
+    lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+    return [json.loads(line) for line in lines]
+
+
+@pytest.mark.parametrize("data", [
+    [1, 2],
+    {},
+    {"user_ids": "1,2"},
+    {"user_ids": [1, "2"]},
+    {"user_ids": [1, True]},
+    {"user_ids": [1], "countries": ["US"]},
+    {"user_ids": [1, 2, 3]},
+])
+def test_invalid_requests_are_rejected(settings, staff, data):
+    """
+    Requests that are not an object with a list of at most RECOMMENDATIONS_BULK_MAX_USERS integer ids,
+    or with malformed countries, are rejected before any user is handled.
+    """
+    settings.RECOMMENDATIONS_BULK_MAX_USERS = 2
+
+    response = _post(data, staff)
+
+    assert response.status_code == 400
+    assert "error" in response.data
+
+
+def test_non_staff_users_are_forbidden():
+    """
+    Only staff users may request recommendations of other users.
+    """
+    response = _post({"user_ids": [1]}, user=User.objects.create(username="learner"))
+
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_records_are_streamed_in_request_order(settings, staff, learners, workers):
+    """
+    Every requested user gets one NDJSON record, in the order of user_ids, across chunks and workers.
+    Stored recommendations are used without calling Amplitude, and Amplitude failures fall back to
+    the general recommendations.
+    """
+    settings.RECOMMENDATIONS_BULK_CHUNK_SIZE = 2
+    settings.RECOMMENDATIONS_BULK_WORKERS = workers
+    stored, live, failing, patched = learners
+    missing_user_id = failing.id + 100
+
+    response = _post(
+        {"user_ids": [failing.id, missing_user_id, live.id, stored.id], "countries": {str(live.id): "US"}}, staff
+    )
+
+    assert response.status_code == 200
+    assert [
+        {key: [course["title"] for course in value] if key == "amplitudeCourses" else value
+         for key, value in record.items()}
+        for record in _records(response)
+    ] == [
+        {"userId": failing.id, "amplitudeCourses": ["edX+General"]},
+        {"userId": missing_user_id, "error": "user_not_found"},
+        {"userId": live.id, "amplitudeCourses": ["edX+Live"]},
+        {"userId": stored.id, "amplitudeCourses": ["edX+Stored"]},
+    ]
+
+    called_for = {call.args[0] for call in patched["get_amplitude_course_recommendations"].call_args_list}
+    assert called_for == {failing.id, live.id}
+    user_country_codes = {
+        call.args[0].id: call.kwargs["user_country_code"]
+        for call in patched["filter_recommended_courses"].call_args_list
+    }
+    assert user_country_codes == {live.id: "US", stored.id: None}
+    prefetched = [call.args[0] for call in patched["prefetch_recommended_courses"].call_args_list]
+    assert prefetched == [set(), {"edX+Stored"}]
+
+
+def test_unfilterable_users_get_an_error_record(staff, learners):
+    """
+    A user whose recommendations cannot be filtered gets an error record, without failing the stream.
+    """
+    stored, live, _, patched = learners
+    patched["filter_recommended_courses"].side_effect = [ValueError("catalog is down"), [_course("edX+Live")]]
+
+    records = _records(_post({"user_ids": [stored.id, live.id]}, staff))
+
+    assert records[0] == {"userId": stored.id, "error": "unavailable"}
+    assert records[1]["amplitudeCourses"][0]["title"] == "edX+Live"
+
+
+def test_chunks_that_cannot_be_loaded_get_error_records(settings, staff, learners):
+    """
+    When the users or stored recommendations of a chunk cannot be read, its users get error records
+    and the following chunks are still streamed.
+    """
+    settings.RECOMMENDATIONS_BULK_CHUNK_SIZE = 2
+    stored, live, failing, _ = learners
+    with mock.patch.object(
+        bulk_recommendations,
+        "get_stored_amplitude_course_recommendations",
+        side_effect=[ValueError("database is down"), {}],
+    ):
+        records = _records(_post({"user_ids": [stored.id, live.id, failing.id]}, staff))
+
+    assert records[:2] == [
+        {"userId": stored.id, "error": "unavailable"},
+        {"userId": live.id, "error": "unavailable"},
+    ]
+    assert records[2]["userId"] == failing.id
+    assert [course["title"] for course in records[2]["amplitudeCourses"]] == ["edX+General"]
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` catalog module.
+"""
+import threading
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+
+catalog = pytest.importorskip("edx_recommendations.api.catalog")
+
+FIELDS = ["key", "course_runs"]
+
+
+def _course(course_key, title="Course"):
+    return {"key": course_key, "title": title, "course_runs": [{"key": f"{course_key}+run"}]}
+
+
+@pytest.fixture(autouse=True)
+def course_cache(settings):
+    settings.RECOMMENDATIONS_CATALOG_FETCH_WORKERS = 1
+    catalog._local_cache = None  # pylint: disable=protected-access
+    catalog.course_cache_stats.reset()
+    yield catalog.get_local_course_cache()
+    catalog._local_cache = None  # pylint: disable=protected-access
+    catalog._refreshing.clear()  # pylint: disable=protected-access
+
+
+@pytest.fixture
+def get_course_data():
+    with mock.patch.object(catalog, "get_course_data", side_effect=lambda course_key, *args, **kwargs: _course(
+        course_key
+    )) as get_course_data:
+        yield get_course_data
+
+
+@pytest.fixture
+def inline_refresh():
+    """
+    Runs background refreshes in the calling thread.
+    """
+    with mock.patch.object(catalog, "submit", side_effect=lambda executor, fn, *args: fn(*args)):
+        yield
+
+
+def _titles(courses):
+    return [course and course["title"] for course in courses]
+
+
+def test_serves_local_then_shared_tier(course_cache, get_course_data):
+    """
+    A miss is fetched once and written to both tiers; later lookups are served by the local tier,
+    and by the shared tier once the local one lost the entry.
+    """
+    assert _titles(catalog.get_courses_data(["edX+A", "edX+B"], FIELDS)) == ["Course", "Course"]
+    assert get_course_data.call_count == 2
+
+    assert catalog.get_courses_data(["edX+B", "edX+A"], FIELDS)[0]["key"] == "edX+B"
+    course_cache.clear()
+    catalog.get_courses_data(["edX+A"], FIELDS)
+
+    assert get_course_data.call_count == 2
+    stats = catalog.get_course_cache_stats()
+    assert (stats["misses"], stats["local_hits"], stats["shared_hits"]) == (2, 2, 1)
+    assert stats["local_size"] == 1
+
+
+def test_served_courses_are_copies(get_course_data):  # pylint: disable=unused-argument
+    """
+    Callers may change the courses they get back without changing the cached data.
+    """
+    course = catalog.get_courses_data(["edX+A"], FIELDS)[0]
+    course["title"] = "Changed"
+
+    assert _titles(catalog.get_courses_data(["edX+A"], FIELDS)) == ["Course"]
+
+
+@pytest.mark.usefixtures("inline_refresh")
+def test_stale_entry_is_served_while_refreshed(settings, get_course_data):
+    """
+    An entry past its freshness window is served as-is and replaced by a background refresh.
+    """
+    settings.RECOMMENDATIONS_COURSE_DATA_CACHE_TIMEOUT = 0
+    catalog.get_courses_data(["edX+A"], FIELDS)
+    get_course_data.side_effect = lambda course_key, *args, **kwargs: _course(course_key, "Refreshed")
+
+    assert _titles(catalog.get_courses_data(["edX+A"], FIELDS)) == ["Course"]
+    assert _titles(catalog.get_courses_data(["edX+A"], FIELDS)) == ["Refreshed"]
+    assert get_course_data.call_count == 3
+    assert catalog.get_course_cache_stats()["stale_hits"] == 2
+
+
+@pytest.mark.usefixtures("inline_refresh")
+def test_stale_entry_is_dropped_when_discovery_lost_the_course(settings, get_course_data):
+    """
+    A refresh that finds no course removes the entry from both tiers and marks the course unservable.
+    """
+    settings.RECOMMENDATIONS_COURSE_DATA_CACHE_TIMEOUT = 0
+    catalog.get_courses_data(["edX+A"], FIELDS)
+    get_course_data.side_effect = lambda *args, **kwargs: None
+
+    assert _titles(catalog.get_courses_data(["edX+A"], FIELDS)) == ["Course"]
+
+    cache_key = catalog._course_data_cache_key("edX+A", FIELDS, None)  # pylint: disable=protected-access
+    assert catalog.get_local_course_cache().get(cache_key) is None
+    assert cache.get(cache_key) is None
+    assert catalog.exclude_unservable_course_keys(["edX+A", "edX+B"]) == ["edX+B"]
+    assert catalog.get_courses_data(["edX+A"], FIELDS) == [None]
+
+
+def test_local_cache_evicts_least_recently_used():
+    """
+    The local tier keeps max_size entries, evicting the least recently read or written one.
+    """
+    local_cache = catalog.LocalCourseCache(2)
+    entry = catalog.CourseCacheEntry({}, float("inf"), float("inf"), None)
+    local_cache.set("a", entry)
+    local_cache.set("b", entry)
+    local_cache.get("a")
+    local_cache.set("c", entry)
+
+    assert local_cache.get("b") is None
+    assert local_cache.get("a") is entry
+    assert local_cache.get("c") is entry
+    assert len(local_cache) == 2
+
+
+def test_local_cache_drops_entries_past_their_stale_window():
+    """
+    Entries past their stale window are dropped when read.
+    """
+    local_cache = catalog.LocalCourseCache(2)
+    local_cache.set("a", catalog.CourseCacheEntry({}, 0, 0, None))
+
+    assert local_cache.get("a") is None
+    assert len(local_cache) == 0
+
+
+def test_timed_out_lookup_is_not_cached(settings, get_course_data):
+    """
+    A concurrent lookup that exceeds the timeout yields LOOKUP_FAILED, served as None, and is
+    neither cached nor marked unservable, while the other lookups keep their order.
+    """
+    settings.RECOMMENDATIONS_CATALOG_FETCH_WORKERS = 2
+    release = threading.Event()
+
+    def slow_course_data(course_key, *args, **kwargs):
+        if course_key == "edX+Slow":
+            release.wait(5)
+        return _course(course_key)
+
+    get_course_data.side_effect = slow_course_data
+    try:
+        courses = catalog.get_courses_data(["edX+Slow", "edX+A"], FIELDS, timeout=0.05)
+    finally:
+        release.set()
+
+    assert [course and course["key"] for course in courses] == [None, "edX+A"]
+    assert catalog.exclude_unservable_course_keys(["edX+Slow"]) == ["edX+Slow"]
+    assert catalog.get_courses_data(["edX+Slow"], FIELDS)[0]["key"] == "edX+Slow"
+
+
+def test_failed_lookup_yields_lookup_failed(settings, get_course_data):
+    """
+    A concurrent lookup that raises yields LOOKUP_FAILED in its place.
+    """
+    settings.RECOMMENDATIONS_CATALOG_FETCH_WORKERS = 2
+    get_course_data.side_effect = [_course("edX+A"), ValueError("discovery is down")]
+
+    assert catalog._fetch_courses_data(  # pylint: disable=protected-access
+        ["edX+A", "edX+B"], FIELDS, None, 5
+    ) == [_course("edX+A"), catalog.LOOKUP_FAILED]
+
+
+def test_unservable_courses_are_negative_cached(get_course_data):
+    """
+    Missing and run-less courses are remembered and skipped without another catalog lookup.
+    """
+    get_course_data.side_effect = lambda course_key, *args, **kwargs: {
+        "edX+Missing": None,
+        "edX+Runless": {"key": course_key, "course_runs": []},
+    }.get(course_key, _course(course_key))
+
+    catalog.get_courses_data(["edX+Missing", "edX+Runless", "edX+A"], FIELDS)
+
+    assert catalog.exclude_unservable_course_keys(["edX+Missing", "edX+Runless", "edX+A"]) == ["edX+A"]
+    assert catalog.get_course_cache_stats()["unservable_skips"] == 2
+
+
+def test_unservable_courses_are_not_cached_without_a_timeout(settings, get_course_data):
+    """
+    With RECOMMENDATIONS_UNSERVABLE_COURSE_CACHE_TIMEOUT at 0 no course is skipped.
+    """
+    settings.RECOMMENDATIONS_UNSERVABLE_COURSE_CACHE_TIMEOUT = 0
+    get_course_data.side_effect = lambda *args, **kwargs: None
+
+    catalog.get_courses_data(["edX+Missing"], FIELDS)
+
+    assert catalog.exclude_unservable_course_keys(["edX+Missing"]) == ["edX+Missing"]
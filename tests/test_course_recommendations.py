@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` course_recommendations module.
+"""
+import json
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from edx_recommendations.api import amplitude
+
+course_recommendations = pytest.importorskip("edx_recommendations.api.course_recommendations")
+utils = pytest.importorskip("edx_recommendations.api.utils")
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def about_page(settings):
+    """
+    The about page view with its flag on and Amplitude answering with a 503.
+    """
+    settings.AMPLITUDE_URL = "https://amplitude.example.com/"
+    settings.AMPLITUDE_API_KEY = "key"
+    session = mock.Mock()
+    session.get.return_value = mock.Mock(status_code=503)
+    breaker = amplitude.CircuitBreaker("test", failure_threshold=5, latency_threshold=1, recovery_timeout=30)
+    with mock.patch.object(course_recommendations, "is_enabled", return_value=True), \
+            mock.patch.object(course_recommendations, "is_enterprise_learner", return_value=False), \
+            mock.patch.object(course_recommendations, "track_event"), \
+            mock.patch.object(utils, "get_amplitude_session", return_value=session), \
+            mock.patch.object(utils, "get_amplitude_circuit_breaker", return_value=breaker):
+        yield session
+
+
+def _get(user):
+    request = APIRequestFactory().get("/")
+    force_authenticate(request, user)
+    return course_recommendations.CourseAboutPageRecommendationsView.as_view()(request, course_id="course-v1:edX+A+1")
+
+
+def test_about_page_serves_empty_recommendations_when_amplitude_errors(about_page):
+    """
+    An Amplitude error status renders the empty control-less response and is retried on the next request.
+    """
+    user = User.objects.create(username="learner")
+
+    for _ in range(2):
+        response = _get(user)
+        assert response.status_code == 200
+        assert json.loads(response.content) == {"courses": [], "isControl": None}
+
+    assert about_page.get.call_count == 2
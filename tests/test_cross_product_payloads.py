@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` cross_product_payloads module.
+"""
+import json
+from unittest import mock
+
+import pytest
+
+catalog = pytest.importorskip("edx_recommendations.api.catalog")
+cross_product_payloads = pytest.importorskip("edx_recommendations.api.cross_product_payloads")
+geoip = pytest.importorskip("edx_recommendations.api.geoip")
+
+SOURCE_COURSE_KEY = "edX+Source"
+
+
+def _course(course_key, location_restriction=None):
+    return {
+        "key": course_key,
+        "uuid": f"uuid-{course_key}",
+        "title": f"Course {course_key}",
+        "owners": [{"key": "edX", "name": "edX", "logo_image_url": None}],
+        "image": {"src": f"https://example.com/{course_key}.png"},
+        "url_slug": course_key.lower(),
+        "course_type": "verified-audit",
+        "course_runs": [{"uuid": f"run-{course_key}", "key": f"course-v1:{course_key}+T1", "marketing_url": None}],
+        "location_restriction": location_restriction,
+        "advertised_course_run_uuid": f"run-{course_key}",
+    }
+
+
+COURSES = {
+    "edX+Allowed": _course("edX+Allowed", {"restriction_type": "allowlist", "countries": ["US"]}),
+    "edX+Open": _course("edX+Open"),
+    "edX+Blocked": _course("edX+Blocked", {"restriction_type": "blocklist", "countries": ["PK"]}),
+}
+
+
+@pytest.fixture(autouse=True)
+def catalog_data(settings):
+    """
+    Serves COURSES from a patched discovery service, associating them all with SOURCE_COURSE_KEY.
+    """
+    settings.CROSS_PRODUCT_RECOMMENDATIONS_KEYS = {SOURCE_COURSE_KEY: list(COURSES)}
+    settings.RECOMMENDATIONS_CATALOG_FETCH_WORKERS = 1
+    catalog._local_cache = None  # pylint: disable=protected-access
+    with mock.patch.object(
+        catalog, "get_course_data", side_effect=lambda course_key, *args, **kwargs: COURSES.get(course_key)
+    ) as get_course_data:
+        yield get_course_data
+    catalog._local_cache = None  # pylint: disable=protected-access
+
+
+def _course_keys(payload):
+    return [course["key"] for course in json.loads(payload)["courses"]]
+
+
+def test_payloads_are_bucketed_by_restricted_countries():
+    """
+    Countries named in a restriction get their own payload, other countries share OTHER_COUNTRIES_BUCKET
+    and requests without a country get NO_COUNTRY_BUCKET.
+    """
+    cross_product_payloads.build_cross_product_payloads(SOURCE_COURSE_KEY)
+
+    def payload(country):
+        return _course_keys(cross_product_payloads.get_cross_product_payload(SOURCE_COURSE_KEY, country))
+
+    assert payload("US") == ["edX+Allowed", "edX+Open", "edX+Blocked"]
+    assert payload("PK") == ["edX+Open"]
+    assert payload("FR") == ["edX+Open", "edX+Blocked"]
+    assert payload(None) == ["edX+Allowed", "edX+Open", "edX+Blocked"]
+
+
+def test_render_returns_every_bucket():
+    """
+    Restricted courses yield one payload per named country plus the two shared buckets.
+    """
+    payloads = cross_product_payloads.render_cross_product_payloads(list(COURSES.values()))
+
+    assert set(payloads) == {
+        "US", "PK", cross_product_payloads.NO_COUNTRY_BUCKET, cross_product_payloads.OTHER_COUNTRIES_BUCKET
+    }
+
+
+def test_country_independent_payloads_collapse_to_one(settings):
+    """
+    When no course is restricted, a single payload is stored and served to every country.
+    """
+    settings.CROSS_PRODUCT_RECOMMENDATIONS_KEYS = {SOURCE_COURSE_KEY: ["edX+Open"]}
+    courses = catalog.get_courses_data(["edX+Open"], cross_product_payloads.CROSS_PRODUCT_COURSE_FIELDS)
+
+    assert set(cross_product_payloads.render_cross_product_payloads(courses)) == {
+        cross_product_payloads.OTHER_COUNTRIES_BUCKET
+    }
+
+    cross_product_payloads.build_cross_product_payloads(SOURCE_COURSE_KEY)
+    for country in ("US", "PK", None):
+        payload = cross_product_payloads.get_cross_product_payload(SOURCE_COURSE_KEY, country)
+        assert _course_keys(payload) == ["edX+Open"]
+
+
+def test_unbuilt_course_has_no_payload():
+    """
+    Source courses the command has not built yet are left to the view to render.
+    """
+    assert cross_product_payloads.get_cross_product_payload(SOURCE_COURSE_KEY, "US") is None
+
+
+def test_unchanged_courses_are_not_rebuilt(settings):
+    """
+    Payloads are only re-rendered when the associated courses or their catalog data changed, or when forced.
+    """
+    with mock.patch.object(
+        cross_product_payloads,
+        "render_cross_product_payloads",
+        wraps=cross_product_payloads.render_cross_product_payloads,
+    ) as render:
+        assert cross_product_payloads.build_cross_product_payloads(SOURCE_COURSE_KEY) is True
+        assert cross_product_payloads.build_cross_product_payloads(SOURCE_COURSE_KEY) is False
+        assert render.call_count == 1
+
+        assert cross_product_payloads.build_cross_product_payloads(SOURCE_COURSE_KEY, force=True) is True
+        settings.CROSS_PRODUCT_RECOMMENDATIONS_KEYS = {SOURCE_COURSE_KEY: ["edX+Open"]}
+        assert cross_product_payloads.build_cross_product_payloads(SOURCE_COURSE_KEY) is True
+        assert render.call_count == 3
+
+
+@pytest.mark.parametrize("country", ["US", "PK", "FR", ""])
+def test_view_serves_the_payload_it_would_render(country):
+    """
+    CrossProductRecommendationsView returns the same body from a built payload as when it renders live.
+    """
+    pytest.importorskip("edx_rest_framework_extensions")
+    pytest.importorskip("opaque_keys")
+    # pylint: disable=import-outside-toplevel
+    from django.http import HttpResponse
+    from rest_framework.test import APIRequestFactory
+
+    from edx_recommendations.api.cross_product_recommendations import CrossProductRecommendationsView
+
+    geoip._geoip_cache = None  # pylint: disable=protected-access
+    view = CrossProductRecommendationsView.as_view()
+
+    def get():
+        request = APIRequestFactory().get("/")
+        with mock.patch.object(geoip, "country_code_from_ip", return_value=country):
+            response = view(request, course_id=f"course-v1:{SOURCE_COURSE_KEY}+T1")
+        assert response.status_code == 200
+        return response
+
+    live = get().render()
+    cross_product_payloads.build_cross_product_payloads(SOURCE_COURSE_KEY)
+    prerendered = get()
+
+    assert type(prerendered) is HttpResponse  # pylint: disable=unidiomatic-typecheck
+    assert prerendered.content == live.content
+    geoip._geoip_cache = None  # pylint: disable=protected-access
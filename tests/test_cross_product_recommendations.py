@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` cross_product_recommendations module.
+"""
+import json
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+views = pytest.importorskip("edx_recommendations.api.cross_product_recommendations")
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+COURSE_ID = "course-v1:edX+Source+1"
+
+
+def _course(course_key):
+    return {
+        "key": course_key,
+        "title": f"Course {course_key}",
+        "owners": [{"key": "edX", "name": "edX", "logo_image_url": None}],
+        "image": {"src": f"https://example.com/{course_key}.png"},
+        "url_slug": course_key.lower(),
+        "course_type": "verified-audit",
+        "course_runs": [{"key": f"course-v1:{course_key}+T1"}],
+        "location_restriction": None,
+    }
+
+
+def _amplitude_down():
+    raise ValueError("Amplitude is down")
+
+
+AMPLITUDE = {
+    "recommendations": lambda: (False, True, ["edX+A", "edX+B"]),
+    "control": lambda: (True, True, []),
+    "amplitude_error": _amplitude_down,
+}
+
+
+@pytest.fixture
+def upstreams(settings):
+    """
+    Patched Amplitude, catalog and result cache calls of the product recommendations view.
+    """
+    settings.GENERAL_RECOMMENDATIONS = [_course("edX+General")]
+    settings.CROSS_PRODUCT_RECOMMENDATIONS_KEYS = {"edX+Source": ["edX+Cross"]}
+    patched = {
+        "get_materialized_amplitude_course_recommendations": mock.Mock(),
+        "get_filtered_recommendations": mock.Mock(
+            side_effect=lambda variant, user, recommendation_id, course_keys, **kwargs: [
+                _course(course_key) for course_key in course_keys
+            ]
+        ),
+        "exclude_unservable_course_keys": mock.Mock(side_effect=lambda course_keys: course_keys),
+        "get_courses_data": mock.Mock(
+            side_effect=lambda course_keys, fields, **kwargs: [_course(course_key) for course_key in course_keys]
+        ),
+        "get_lazy_country_code": mock.Mock(return_value="US"),
+    }
+    with mock.patch.multiple(views, **patched):
+        yield patched
+
+
+def _get(user, course_id=None):
+    request = APIRequestFactory().get("/")
+    force_authenticate(request, user)
+    return views.ProductRecommendationsView.as_view()(request, course_id=course_id)
+
+
+@pytest.mark.parametrize("amplitude", list(AMPLITUDE))
+@pytest.mark.parametrize("course_id", [COURSE_ID, None])
+def test_workers_do_not_change_the_response(settings, upstreams, amplitude, course_id):
+    """
+    Running the cross product pipeline on a pool thread renders the same response as running it inline,
+    with Amplitude recommendations, an empty control result and the fallback on Amplitude errors.
+    """
+    user = User.objects.create(username="learner")
+    upstreams["get_materialized_amplitude_course_recommendations"].side_effect = (
+        lambda *args, **kwargs: AMPLITUDE[amplitude]()
+    )
+
+    responses = []
+    for workers in (1, 4):
+        settings.RECOMMENDATIONS_VIEW_WORKERS = workers
+        response = _get(user, course_id)
+        assert response.status_code == 200
+        responses.append(json.loads(response.content))
+
+    assert responses[0] == responses[1]
+    expected = ["Course edX+General"] if amplitude != "recommendations" else ["Course edX+A", "Course edX+B"]
+    assert [course["title"] for course in responses[0]["amplitudeCourses"]] == expected
+    if course_id:
+        assert [course["title"] for course in responses[0]["crossProductCourses"]] == ["Course edX+Cross"]
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_cross_product_errors_propagate_with_any_worker_count(settings, upstreams, workers):
+    """
+    A failing cross product catalog call fails the request whether or not it ran on a pool thread.
+    """
+    user = User.objects.create(username="learner")
+    settings.RECOMMENDATIONS_VIEW_WORKERS = workers
+    upstreams["get_materialized_amplitude_course_recommendations"].return_value = (False, True, ["edX+A"])
+    upstreams["get_courses_data"].side_effect = ValueError("Discovery is down")
+
+    with pytest.raises(ValueError, match="Discovery is down"):
+        _get(user, COURSE_ID)
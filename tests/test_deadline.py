@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` deadline module.
+"""
+from unittest import mock
+
+import pytest
+
+from edx_recommendations.api import amplitude
+from edx_recommendations.api.deadline import MINIMUM_TIMEOUT, Deadline, DeadlineExceeded
+
+
+class _View:
+    latency_budget = 3
+
+
+def test_deadline_without_budget_never_expires():
+    """
+    A Deadline without a budget leaves timeouts alone and never raises.
+    """
+    deadline = Deadline()
+    deadline.check("amplitude")
+
+    assert deadline.remaining() is None
+    assert not deadline.expired()
+    assert deadline.cap(5) == 5
+
+
+def test_cap_shortens_timeouts_to_the_remaining_budget():
+    """
+    Timeouts longer than the remaining budget are shortened to it.
+    """
+    deadline = Deadline(1)
+
+    assert deadline.cap(0.5) == 0.5
+    assert 0.9 < deadline.cap(5) <= 1
+
+
+def test_cap_never_returns_a_timeout_requests_rejects():
+    """
+    Once the budget is used up, capped timeouts are MINIMUM_TIMEOUT rather than 0.
+    """
+    deadline = Deadline(0)
+
+    assert deadline.remaining() == 0
+    assert deadline.cap(5) == MINIMUM_TIMEOUT
+
+
+def test_check_raises_and_blames_the_first_stage():
+    """
+    check raises DeadlineExceeded once the budget is used up, and the first stage to hit it is blamed.
+    """
+    deadline = Deadline(0)
+
+    with pytest.raises(DeadlineExceeded) as raised:
+        deadline.check("program_enrollments")
+    assert raised.value.stage == "program_enrollments"
+
+    with pytest.raises(DeadlineExceeded):
+        deadline.check("amplitude")
+    assert deadline.exhausted_by == "program_enrollments"
+
+
+def test_for_view_prefers_the_configured_budget(settings):
+    """
+    RECOMMENDATIONS_LATENCY_BUDGETS overrides the view's latency_budget attribute.
+    """
+    assert Deadline.for_view(_View()).budget == 3
+
+    settings.RECOMMENDATIONS_LATENCY_BUDGETS = {"_View": 1.5}
+    assert Deadline.for_view(_View()).budget == 1.5
+
+
+@pytest.fixture
+def amplitude_session(settings):
+    """
+    Patches the Amplitude session of the utils module to answer with one recommendation.
+    """
+    pytest.importorskip("common.djangoapps.student.models")
+    from edx_recommendations.api import utils  # pylint: disable=import-outside-toplevel
+
+    settings.AMPLITUDE_URL = "https://amplitude.example.com/"
+    settings.AMPLITUDE_API_KEY = "key"
+    amplitude._circuit_breaker = None  # pylint: disable=protected-access
+    response = mock.Mock(status_code=200)
+    response.json.return_value = {
+        "userData": {"recommendations": [{"is_control": False, "has_is_control": True, "items": ["edX+A"]}]}
+    }
+    with mock.patch.object(utils, "get_amplitude_session") as get_amplitude_session:
+        get_amplitude_session.return_value.get.return_value = response
+        yield utils, get_amplitude_session.return_value
+    amplitude._circuit_breaker = None  # pylint: disable=protected-access
+
+
+def test_expired_budget_still_serves_cached_recommendations(amplitude_session):
+    """
+    An exhausted budget skips the Amplitude call, but not the cache lookup in front of it.
+    """
+    utils, session = amplitude_session
+    utils.get_amplitude_course_recommendations(1, "model", deadline=Deadline(5))
+    assert session.get.call_args.kwargs["timeout"] == (1, 2)
+
+    deadline = Deadline(0)
+    assert utils.get_amplitude_course_recommendations(1, "model", deadline=deadline) == (False, True, ["edX+A"])
+    assert deadline.exhausted_by is None
+
+    with pytest.raises(DeadlineExceeded):
+        utils.get_amplitude_course_recommendations(2, "model", deadline=deadline)
+    assert deadline.exhausted_by == "amplitude"
+    assert session.get.call_count == 1
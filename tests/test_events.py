@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` events module.
+"""
+from unittest import mock
+
+import pytest
+
+events = pytest.importorskip("edx_recommendations.api.events")
+
+CONTEXT = {"ip": "203.0.113.7", "agent": "test"}
+
+
+@pytest.fixture(autouse=True)
+def tracker():
+    with mock.patch.object(events, "tracker") as tracker:
+        tracker.get_tracker.return_value.resolve_context.return_value = CONTEXT
+        yield tracker.get_tracker.return_value
+
+
+@pytest.fixture
+def track():
+    with mock.patch.object(events.segment, "track") as track:
+        yield track
+
+
+@pytest.fixture
+def idle_worker():
+    """
+    Keeps the flusher thread from draining the queue, so tests control when events are sent.
+    """
+    with mock.patch.object(events.EventQueue, "_run"):
+        yield
+
+
+def _enqueue(event_queue, count):
+    return [
+        event_queue.enqueue(user_id, events.RECOMMENDATIONS_VIEWED_EVENT, {"index": user_id})
+        for user_id in range(count)
+    ]
+
+
+@pytest.mark.usefixtures("idle_worker")
+def test_full_queue_drops_and_counts_events():
+    """
+    Events enqueued while the queue is full are dropped and counted, without blocking.
+    """
+    event_queue = events.EventQueue(max_size=2, batch_size=10, flush_interval=1)
+
+    with mock.patch.object(events, "set_custom_attribute") as set_custom_attribute:
+        assert _enqueue(event_queue, 4) == [True, True, False, False]
+
+    assert event_queue.stats() == {"enqueued": 2, "sent": 0, "failed": 0, "dropped": 2, "queued": 2}
+    set_custom_attribute.assert_called_with("recommendations_events_dropped", 2)
+
+
+@pytest.mark.usefixtures("idle_worker")
+def test_batches_are_bounded_by_size_and_interval():
+    """
+    A batch holds at most batch_size events, and is cut short when no event arrives within flush_interval.
+    """
+    event_queue = events.EventQueue(max_size=10, batch_size=2, flush_interval=0.01)
+    _enqueue(event_queue, 3)
+
+    assert [event[0] for event in event_queue._next_batch()] == [0, 1]  # pylint: disable=protected-access
+    assert [event[0] for event in event_queue._next_batch()] == [2]  # pylint: disable=protected-access
+
+
+def test_worker_sends_events_in_their_request_context(track, tracker):
+    """
+    The flusher thread sends every queued event, re-entering the tracking context captured at enqueue time.
+    """
+    event_queue = events.EventQueue(max_size=10, batch_size=2, flush_interval=0.01)
+    _enqueue(event_queue, 3)
+    event_queue._queue.join()  # pylint: disable=protected-access
+
+    assert [call.args for call in track.call_args_list] == [
+        (user_id, events.RECOMMENDATIONS_VIEWED_EVENT, {"index": user_id}) for user_id in range(3)
+    ]
+    tracker.context.assert_called_with(events.TRACKING_CONTEXT_NAME, CONTEXT)
+    assert event_queue.stats()["sent"] == 3
+
+
+@pytest.mark.usefixtures("idle_worker")
+def test_flush_sends_queued_events_and_counts_failures(track):
+    """
+    flush sends the queued events on the calling thread; events segment fails to send are counted.
+    """
+    track.side_effect = [None, ValueError("segment is down"), None]
+    event_queue = events.EventQueue(max_size=10, batch_size=2, flush_interval=1)
+    _enqueue(event_queue, 3)
+
+    event_queue.flush(timeout=5)
+
+    assert track.call_count == 3
+    assert event_queue.stats() == {"enqueued": 3, "sent": 2, "failed": 1, "dropped": 0, "queued": 0}
+
+
+def test_flush_is_registered_for_shutdown(settings):
+    """
+    The process-wide queue is flushed at exit, for at most RECOMMENDATIONS_EVENT_SHUTDOWN_FLUSH_TIMEOUT seconds.
+    """
+    events._event_queue = None  # pylint: disable=protected-access
+    try:
+        with mock.patch.object(events.atexit, "register") as register:
+            event_queue = events.get_event_queue()
+            assert events.get_event_queue() is event_queue
+        register.assert_called_once_with(event_queue.flush, settings.RECOMMENDATIONS_EVENT_SHUTDOWN_FLUSH_TIMEOUT)
+    finally:
+        events._event_queue = None  # pylint: disable=protected-access
+
+
+@pytest.mark.usefixtures("idle_worker")
+def test_worker_is_restarted_after_a_fork():
+    """
+    A process forked after the worker started gets its own queue and worker on its first event.
+    """
+    event_queue = events.EventQueue(max_size=10, batch_size=2, flush_interval=1)
+    _enqueue(event_queue, 1)
+    parent_queue, parent_thread = event_queue._queue, event_queue._thread  # pylint: disable=protected-access
+
+    with mock.patch.object(events.os, "getpid", return_value=event_queue._pid + 1):  # pylint: disable=protected-access
+        event_queue.enqueue(1, events.RECOMMENDATIONS_VIEWED_EVENT, {})
+
+        assert event_queue._queue is not parent_queue  # pylint: disable=protected-access
+        assert event_queue._thread is not parent_thread  # pylint: disable=protected-access
+        assert event_queue.stats()["queued"] == 1
+
+
+def test_flush_skips_a_queue_never_started_in_this_process(track):
+    """
+    flush at exit of a process that never enqueued does nothing.
+    """
+    events.EventQueue(max_size=10, batch_size=2, flush_interval=1).flush(timeout=1)
+
+    track.assert_not_called()
+
+
+def test_events_are_sent_inline_without_a_queue(settings, track):
+    """
+    With RECOMMENDATIONS_EVENT_QUEUE_SIZE at 0 events are sent on the request thread.
+    """
+    settings.RECOMMENDATIONS_EVENT_QUEUE_SIZE = 0
+
+    events.track_event(1, events.RECOMMENDATIONS_VIEWED_EVENT, {"index": 1})
+
+    track.assert_called_once_with(1, events.RECOMMENDATIONS_VIEWED_EVENT, {"index": 1})
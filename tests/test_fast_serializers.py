@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` fast_serializers module.
+
+Every render_* function must produce the same response body as the DRF serializer it replaces.
+"""
+from copy import deepcopy
+from uuid import UUID
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from edx_recommendations.api import fast_serializers, serializers
+
+OWNER = {"key": "edX", "name": "édX Ünïversity", "logo_image_url": "https://example.com/logo.png"}
+COURSE = {
+    "key": "edX+DemoX",
+    "uuid": "0b3bb9a5-2c2d-4a6d-a1c8-fa0e3c2a1b11",
+    "title": "Demonstration Course",
+    "image": {"src": "https://example.com/image.png"},
+    "url_slug": "demonstration-course",
+    "owners": [OWNER],
+    "active_course_run": {"key": "course-v1:edX+DemoX+T1", "marketing_url": "https://example.com/demo"},
+    "course_type": "verified-audit",
+    "course_runs": [{"key": "course-v1:edX+DemoX+T1"}],
+    "_country_restriction": object(),
+}
+DASHBOARD_COURSE = {
+    "course_key": "edX+DemoX",
+    "logo_image_url": "https://example.com/logo.png",
+    "marketing_url": "https://example.com/demo",
+    "title": "Demonstration Course",
+}
+
+
+def _course(**changes):
+    course = deepcopy({field: value for field, value in COURSE.items() if field != "_country_restriction"})
+    course.update(changes)
+    return course
+
+
+def _without(course, field):
+    course = deepcopy(course)
+    del course[field]
+    return course
+
+
+COURSE_VARIANTS = [
+    _course(),
+    _course(uuid=UUID("0b3bb9a5-2c2d-4a6d-a1c8-fa0e3c2a1b11")),
+    _course(image=None),
+    _course(owners=[]),
+    _course(owners=None),
+    _course(owners=[OWNER, None, dict(OWNER, logo_image_url=None)]),
+    _course(active_course_run=None),
+    _course(course_type=None, title=None),
+    _without(_course(), "url_slug"),
+    _course(url_slug=None),
+]
+
+SHAPES = [
+    (
+        serializers.AboutPageRecommendationsSerializer,
+        fast_serializers.render_about_page_recommendations,
+        lambda courses, is_control: {"courses": courses, "is_control": is_control},
+        COURSE_VARIANTS,
+    ),
+    (
+        serializers.CrossProductRecommendationsSerializer,
+        fast_serializers.render_cross_product_recommendations,
+        lambda courses, is_control: {"courses": courses},
+        COURSE_VARIANTS,
+    ),
+    (
+        serializers.AmplitudeRecommendationsSerializer,
+        fast_serializers.render_amplitude_recommendations,
+        lambda courses, is_control: {"amplitudeCourses": courses},
+        COURSE_VARIANTS,
+    ),
+    (
+        serializers.CrossProductAndAmplitudeRecommendationsSerializer,
+        fast_serializers.render_cross_product_and_amplitude_recommendations,
+        lambda courses, is_control: {"crossProductCourses": courses[:3], "amplitudeCourses": courses[3:]},
+        COURSE_VARIANTS,
+    ),
+    (
+        serializers.DashboardRecommendationsSerializer,
+        fast_serializers.render_dashboard_recommendations,
+        lambda courses, is_control: {"courses": courses, "is_control": is_control},
+        [DASHBOARD_COURSE, dict(DASHBOARD_COURSE, logo_image_url=None, marketing_url=None)],
+    ),
+]
+
+
+def _render(data):
+    return JSONRenderer().render(data)
+
+
+@pytest.mark.parametrize("serializer_class, render, envelope, courses", SHAPES)
+@pytest.mark.parametrize("is_control", [None, True, False, "true", "False", 0, 1, "yes", "off", "null", ""])
+def test_matches_drf_serializer(serializer_class, render, envelope, courses, is_control):
+    """
+    The fast renderers produce byte-identical response bodies for every response shape.
+    """
+    data = envelope(courses, is_control)
+    assert _render(render(deepcopy(data))) == _render(serializer_class(deepcopy(data)).data)
+
+
+@pytest.mark.parametrize("serializer_class, render, envelope, courses", SHAPES)
+@pytest.mark.parametrize("count", [0, 1])
+def test_matches_drf_serializer_for_short_lists(serializer_class, render, envelope, courses, count):
+    """
+    Empty and single item course lists render the same way.
+    """
+    data = envelope(courses[:count], True)
+    assert render(data) == serializer_class(data).data
+
+
+@pytest.mark.parametrize(
+    "serializer_class, render",
+    [
+        (serializers.AboutPageRecommendationsSerializer, fast_serializers.render_about_page_recommendations),
+        (serializers.DashboardRecommendationsSerializer, fast_serializers.render_dashboard_recommendations),
+    ],
+)
+def test_missing_is_control_defaults_to_none(serializer_class, render):
+    """
+    isControl falls back to None when the response data has no is_control.
+    """
+    assert render({"courses": []}) == serializer_class({"courses": []}).data == {"courses": [], "isControl": None}
+
+
+def test_ignores_private_course_fields():
+    """
+    Fields that are not part of a response shape, like the compiled country restriction, are not rendered.
+    """
+    rendered = fast_serializers.render_cross_product_recommendations({"courses": [dict(COURSE)]})
+    assert "_country_restriction" not in _render(rendered).decode("utf-8")
+
+
+@pytest.mark.parametrize("field", ["key", "title", "image", "owners", "active_course_run"])
+def test_missing_required_field_raises(field):
+    """
+    Like the DRF serializers, a course without a required field is an error rather than a partial course.
+    """
+    course = _without(_course(), field)
+    serializer = serializers.AboutPageRecommendationsSerializer({"courses": [course]})
+    with pytest.raises(KeyError):
+        serializer.data  # pylint: disable=pointless-statement
+    with pytest.raises(KeyError):
+        fast_serializers.render_about_page_recommendations({"courses": [course]})
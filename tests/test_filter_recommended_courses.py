@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` filter_recommended_courses pipeline.
+"""
+from unittest import mock
+
+import pytest
+
+from edx_recommendations.api import timing
+from edx_recommendations.api.deadline import Deadline
+
+utils = pytest.importorskip("edx_recommendations.api.utils")
+
+ENROLLED_COURSE_KEY = "edX+Enrolled"
+REQUEST_COURSE_KEY = "edX+Request"
+
+
+def _course(course_key, **changes):
+    course = {"key": course_key, "course_runs": [{"key": f"course-v1:{course_key}+T1"}]}
+    course.update(changes)
+    return course
+
+
+CATALOG = {
+    ENROLLED_COURSE_KEY: _course(ENROLLED_COURSE_KEY),
+    REQUEST_COURSE_KEY: _course(REQUEST_COURSE_KEY),
+    "edX+Runless": _course("edX+Runless", course_runs=[]),
+    "edX+Restricted": _course(
+        "edX+Restricted", location_restriction={"restriction_type": "blocklist", "countries": ["PK"]}
+    ),
+}
+CATALOG.update({f"edX+{index}": _course(f"edX+{index}") for index in range(10)})
+
+
+@pytest.fixture(autouse=True)
+def get_courses_data(settings):
+    """
+    Serves CATALOG, with the user enrolled in ENROLLED_COURSE_KEY.
+    """
+    settings.RECOMMENDATIONS_CATALOG_LOOKAHEAD = 2
+    settings.RECOMMENDATIONS_CATALOG_FETCH_WORKERS = 4
+    enrollments = [mock.Mock(course_id=f"course-v1:{ENROLLED_COURSE_KEY}+T1")]
+    with mock.patch.object(utils.CourseEnrollment, "enrollments_for_user", return_value=enrollments, create=True):
+        with mock.patch.object(
+            utils,
+            "get_courses_data",
+            side_effect=lambda course_keys, *args, **kwargs: [CATALOG.get(course_key) for course_key in course_keys],
+        ) as get_courses_data:
+            yield get_courses_data
+
+
+@pytest.fixture
+def counters():
+    """
+    Collects the request timing counters of the test.
+    """
+    request_timing = timing.RequestTiming()
+    token = timing._request_timing.set(request_timing)  # pylint: disable=protected-access
+    yield request_timing.counters
+    timing._request_timing.reset(token)  # pylint: disable=protected-access
+
+
+def _windows(get_courses_data):
+    return [call.args[0] for call in get_courses_data.call_args_list]
+
+
+def _keys(courses):
+    return [course["key"] for course in courses]
+
+
+def _filter(course_keys, recommendation_count, **kwargs):
+    return utils.filter_recommended_courses(
+        mock.Mock(), course_keys, recommendation_count=recommendation_count, user_country_code="PK", **kwargs
+    )
+
+
+def test_stops_hydrating_once_enough_courses_passed(get_courses_data):
+    """
+    The first window holds the courses needed plus the look-ahead, capped by the fetch workers, and
+    no further window is fetched once recommendation_count courses passed.
+    """
+    course_keys = [f"edX+{index}" for index in range(10)]
+
+    assert _keys(_filter(course_keys, 3)) == ["edX+0", "edX+1", "edX+2"]
+    assert _windows(get_courses_data) == [course_keys[:4]]
+
+
+@pytest.mark.parametrize("recommendation_count, workers, window_size", [
+    (1, 4, 3),
+    (1, 2, 2),
+    (1, 1, 1),
+    (3, 4, 4),
+    (6, 4, 6),
+])
+def test_look_ahead_only_fills_idle_fetch_workers(
+    settings, get_courses_data, recommendation_count, workers, window_size
+):
+    """
+    The look-ahead adds at most RECOMMENDATIONS_CATALOG_LOOKAHEAD courses, and only up to the number
+    of fetch workers.
+    """
+    settings.RECOMMENDATIONS_CATALOG_FETCH_WORKERS = workers
+    course_keys = [f"edX+{index}" for index in range(10)]
+
+    _filter(course_keys, recommendation_count)
+
+    assert len(_windows(get_courses_data)[0]) == window_size
+
+
+def test_rejections_are_refilled_a_window_at_a_time(get_courses_data):
+    """
+    Rejected courses are replaced by a further window, sized for the courses still needed plus the look-ahead.
+    """
+    course_keys = [ENROLLED_COURSE_KEY, "edX+Runless", "edX+Restricted", "edX+0", "edX+1", "edX+2", "edX+3", "edX+4"]
+
+    assert _keys(_filter(course_keys, 2)) == ["edX+0", "edX+1"]
+    assert _windows(get_courses_data) == [course_keys[:4], course_keys[4:7]]
+
+
+def test_rejections_are_counted_per_stage(counters):
+    """
+    Every stage counts the candidates it removed, and every hydrated candidate is counted as examined.
+    """
+    course_keys = [
+        "edX+Unservable",
+        "edX+Missing",
+        "edX+Runless",
+        ENROLLED_COURSE_KEY,
+        REQUEST_COURSE_KEY,
+        "edX+Restricted",
+        "edX+0",
+    ]
+    with mock.patch.object(
+        utils,
+        "exclude_unservable_course_keys",
+        side_effect=lambda course_keys, querystring: [key for key in course_keys if key != "edX+Unservable"],
+    ):
+        courses = _filter(course_keys, 10, request_course_key=f"course-v1:{REQUEST_COURSE_KEY}+T1")
+
+    assert _keys(courses) == ["edX+0"]
+    assert counters == {
+        "rejected_unservable": 1,
+        "candidates_examined": 6,
+        "rejected_missing": 2,
+        "rejected_enrolled": 1,
+        "rejected_request_course": 1,
+        "rejected_restricted": 1,
+    }
+
+
+def test_expired_budget_skips_hydration(get_courses_data):
+    """
+    Once the request's latency budget is used up no catalog window is fetched, and the enrollments
+    lookup that used it up is blamed.
+    """
+    deadline = Deadline(0)
+
+    assert not _filter(["edX+0", "edX+1"], 2, deadline=deadline)
+    assert not get_courses_data.called
+    assert deadline.exhausted_by == "enrollments"
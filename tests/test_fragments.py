@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` fragments module.
+
+Responses assembled from cached course fragments must be byte-identical to rendering the whole
+response with JSONRenderer.
+"""
+import json
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from edx_recommendations.api import fast_serializers, fragments
+
+
+def _course(index, version=True, **changes):
+    course = {
+        "key": f"edX+Course{index}",
+        "uuid": f"00000000-0000-4000-8000-{index:012d}",
+        "title": f"Cöurse {index} ",
+        "image": {"src": f"https://example.com/course{index}.png"},
+        "url_slug": f"course-{index}",
+        "owners": [{"key": "edX", "name": "edX", "logo_image_url": None}],
+        "active_course_run": {"key": f"course-v1:edX+Course{index}+T1", "marketing_url": "https://example.com"},
+        "course_type": "verified-audit",
+    }
+    if version:
+        course[fragments.CATALOG_VERSION_FIELD] = f"version-{index}"
+    course.update(changes)
+    return course
+
+
+@pytest.fixture(autouse=True)
+def fragment_cache(settings):
+    settings.RECOMMENDATIONS_FRAGMENT_CACHE_SIZE = 100
+    fragments._fragment_cache = None  # pylint: disable=protected-access
+    yield fragments.get_fragment_cache()
+    fragments._fragment_cache = None  # pylint: disable=protected-access
+
+
+COURSE_LISTS = [
+    [],
+    [_course(1)],
+    [_course(1), _course(2, version=False), None, _course(3, image=None, owners=None)],
+]
+
+
+@pytest.mark.parametrize("courses", COURSE_LISTS)
+@pytest.mark.parametrize("is_control", [None, True, False])
+def test_about_page_response(courses, is_control):
+    """
+    The assembled about page response matches the rendered about page serializer output.
+    """
+    expected = JSONRenderer().render(
+        fast_serializers.render_about_page_recommendations({"courses": courses, "is_control": is_control})
+    )
+    assert fragments.render_about_page_recommendations_response(courses, is_control) == expected
+    # Rendered again, from cached fragments.
+    assert fragments.render_about_page_recommendations_response(courses, is_control) == expected
+
+
+@pytest.mark.parametrize("courses", COURSE_LISTS)
+def test_learner_dashboard_product_responses(courses):
+    """
+    The assembled learner dashboard product responses match the rendered serializer output.
+    """
+    renderer = JSONRenderer()
+    assert fragments.render_amplitude_recommendations_response(courses) == renderer.render(
+        fast_serializers.render_amplitude_recommendations({"amplitudeCourses": courses})
+    )
+    assert fragments.render_cross_product_and_amplitude_recommendations_response(
+        courses[:1], courses
+    ) == renderer.render(
+        fast_serializers.render_cross_product_and_amplitude_recommendations(
+            {"crossProductCourses": courses[:1], "amplitudeCourses": courses}
+        )
+    )
+
+
+def test_fragments_are_cached_per_shape_and_version(fragment_cache):
+    """
+    Courses with a catalog version are rendered once per shape, courses without one every time.
+    """
+    courses = [_course(1), _course(2, version=False)]
+    fragments.render_about_page_recommendations_response(courses, False)
+    fragments.render_amplitude_recommendations_response(courses)
+    assert len(fragment_cache) == 2
+
+    # A cached fragment is reused for as long as the catalog version stays the same...
+    fragments.render_about_page_recommendations_response([_course(1, title="Changed")], False)
+    assert b"Changed" not in fragments.render_about_page_recommendations_response([_course(1)], False)
+
+    # ...and a new catalog version renders the course again.
+    changed = _course(1, title="Changed", **{fragments.CATALOG_VERSION_FIELD: "version-1b"})
+    assert b"Changed" in fragments.render_about_page_recommendations_response([changed], False)
+    assert len(fragment_cache) == 3
+
+
+def test_bulk_recommendations_record_matches_amplitude_response():
+    """
+    A bulk record holds the user id and the amplitudeCourses of the v2 response, without private fields.
+    """
+    courses = [_course(1), _course(2, version=False)]
+    counts = {"hits": 0, "misses": 0}
+
+    record = fragments.render_bulk_recommendations_record(7, courses, counts)
+
+    assert record.endswith(b"\n") and record.count(b"\n") == 1
+    assert json.loads(record) == {
+        "userId": 7,
+        **json.loads(fragments.render_amplitude_recommendations_response(courses)),
+    }
+    assert fragments.CATALOG_VERSION_FIELD.encode() not in record
+    assert counts == {"hits": 0, "misses": 1}
+    assert json.loads(fragments.render_bulk_recommendations_error(8, "user_not_found")) == {
+        "userId": 8, "error": "user_not_found"
+    }
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` geoip module.
+"""
+from unittest import mock
+
+import pytest
+from django.test import RequestFactory
+
+geoip = pytest.importorskip("edx_recommendations.api.geoip")
+
+
+@pytest.fixture(autouse=True)
+def country_code_from_ip():
+    """
+    Patches the platform lookup with one answering "us", and starts every test with an empty cache.
+    """
+    geoip._geoip_cache = None  # pylint: disable=protected-access
+    with mock.patch.object(geoip, "country_code_from_ip", return_value="us") as lookup:
+        yield lookup
+    geoip._geoip_cache = None  # pylint: disable=protected-access
+
+
+def test_cache_evicts_least_recently_used():
+    """
+    The cache keeps max_size country codes, evicting the least recently read or written one.
+    """
+    geoip_cache = geoip.GeoIPCache(2, 60)
+    geoip_cache.set("1.1.1.1", "US")
+    geoip_cache.set("2.2.2.2", "PK")
+    geoip_cache.get("1.1.1.1")
+    geoip_cache.set("3.3.3.3", "FR")
+
+    assert geoip_cache.get("2.2.2.2") is None
+    assert geoip_cache.get("1.1.1.1") == "US"
+    assert geoip_cache.get("3.3.3.3") == "FR"
+    assert len(geoip_cache) == 2
+
+
+def test_cache_entries_expire():
+    """
+    Country codes are forgotten timeout seconds after they were cached.
+    """
+    geoip_cache = geoip.GeoIPCache(2, 60)
+    geoip_cache.set("1.1.1.1", "US")
+
+    with mock.patch.object(geoip.time, "monotonic", return_value=geoip.time.monotonic() + 61):
+        assert geoip_cache.get("1.1.1.1") is None
+    assert len(geoip_cache) == 0
+
+
+@pytest.mark.parametrize("max_size, timeout", [(0, 60), (2, 0)])
+def test_cache_can_be_disabled(max_size, timeout):
+    """
+    A size or timeout of 0 disables the cache.
+    """
+    geoip_cache = geoip.GeoIPCache(max_size, timeout)
+    geoip_cache.set("1.1.1.1", "US")
+
+    assert geoip_cache.get("1.1.1.1") is None
+
+
+@pytest.mark.parametrize("ip_address, ipv4_prefix, ipv6_prefix, cache_key", [
+    ("203.0.113.7", 32, 128, "203.0.113.7/32"),
+    ("203.0.113.7", 24, 128, "203.0.113.0/24"),
+    ("2001:db8:1:2::7", 32, 128, "2001:db8:1:2::7/128"),
+    ("2001:db8:1:2::7", 32, 48, "2001:db8:1::/48"),
+    ("not-an-ip", 24, 48, "not-an-ip"),
+])
+def test_addresses_are_bucketed_by_prefix(settings, ip_address, ipv4_prefix, ipv6_prefix, cache_key):
+    """
+    Addresses are cached under their network for the configured prefix length, unparsable ones as-is.
+    """
+    settings.RECOMMENDATIONS_GEOIP_CACHE_IPV4_PREFIX = ipv4_prefix
+    settings.RECOMMENDATIONS_GEOIP_CACHE_IPV6_PREFIX = ipv6_prefix
+
+    assert geoip._geoip_cache_key(ip_address) == cache_key  # pylint: disable=protected-access
+
+
+def test_one_lookup_serves_a_network(settings, country_code_from_ip):
+    """
+    Addresses in the same bucket share one platform lookup, whose result is upper-cased.
+    """
+    settings.RECOMMENDATIONS_GEOIP_CACHE_IPV4_PREFIX = 24
+
+    assert geoip.get_country_code("203.0.113.7") == "US"
+    assert geoip.get_country_code("203.0.113.200") == "US"
+    assert geoip.get_country_code("198.51.100.1") == "US"
+    assert [call.args[0] for call in country_code_from_ip.call_args_list] == ["203.0.113.7", "198.51.100.1"]
+
+
+def test_lazy_country_code_is_looked_up_on_first_read(country_code_from_ip):
+    """
+    The lazy country code of a request costs no lookup until it is read.
+    """
+    request = RequestFactory().get("/", REMOTE_ADDR="203.0.113.7")
+
+    country_code = geoip.get_lazy_country_code(request)
+    country_code_from_ip.assert_not_called()
+
+    assert country_code == "US"
+    assert country_code in {"US"}
+    country_code_from_ip.assert_called_once_with("203.0.113.7")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` materialize_amplitude_recommendations management command.
+"""
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from edx_recommendations.api.amplitude import AmplitudeResponseError
+from edx_recommendations.models import AmplitudeRecommendation
+
+command = pytest.importorskip("edx_recommendations.management.commands.materialize_amplitude_recommendations")
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def users():
+    """
+    Five recently active users, plus an inactive one and one who has not logged in for a long time.
+    """
+    now = timezone.now()
+    active = [User.objects.create(username=f"learner{index}", last_login=now) for index in range(5)]
+    User.objects.create(username="inactive", last_login=now, is_active=False)
+    User.objects.create(username="dormant", last_login=now - timedelta(days=90))
+    return active
+
+
+@pytest.fixture
+def fetch():
+    with mock.patch.object(
+        command,
+        "_fetch_amplitude_course_recommendations",
+        side_effect=lambda user_id, recommendation_id: (False, True, [f"edX+{user_id}"]),
+    ) as fetch:
+        yield fetch
+
+
+def _materialize(*args):
+    call_command("materialize_amplitude_recommendations", "--recommendation-id", "model", "--rate", "0", *args)
+
+
+def _stored():
+    return {
+        row.user_id: row.recommendations
+        for row in AmplitudeRecommendation.objects.filter(recommendation_id="model")
+    }
+
+
+def test_stores_recommendations_of_active_users_in_chunks(users, fetch):
+    """
+    Every recently active user is fetched once and stored, one chunk at a time, updating existing rows.
+    """
+    existing = AmplitudeRecommendation.objects.create(
+        user=users[1], recommendation_id="model", items=["edX+Old"], fetched_at=timezone.now() - timedelta(days=2)
+    )
+
+    with mock.patch.object(command.Command, "_store", autospec=True, side_effect=command.Command._store) as store:
+        _materialize("--chunk-size", "2")
+
+    assert [len(call.args[2]) for call in store.call_args_list] == [2, 2, 1]
+    assert [call.args[0] for call in fetch.call_args_list] == [user.id for user in users]
+    assert _stored() == {user.id: (False, True, [f"edX+{user.id}"]) for user in users}
+    existing.refresh_from_db()
+    assert existing.items == [f"edX+{users[1].id}"]
+    assert existing.fetched_at > timezone.now() - timedelta(minutes=1)
+
+
+def test_skips_users_with_fresh_recommendations(users, fetch):
+    """
+    Users stored within --skip-fresher-than hours are not fetched again.
+    """
+    AmplitudeRecommendation.objects.create(
+        user=users[0], recommendation_id="model", items=["edX+Fresh"], fetched_at=timezone.now() - timedelta(hours=1)
+    )
+
+    _materialize("--skip-fresher-than", "2")
+
+    assert users[0].id not in [call.args[0] for call in fetch.call_args_list]
+    assert _stored()[users[0].id] == (None, None, ["edX+Fresh"])
+    assert len(_stored()) == 5
+
+
+def test_resumes_after_the_given_user_id(users, fetch):
+    """
+    --start-after-user-id skips the users an interrupted run already handled.
+    """
+    _materialize("--start-after-user-id", str(users[2].id))
+
+    assert [call.args[0] for call in fetch.call_args_list] == [users[3].id, users[4].id]
+    assert set(_stored()) == {users[3].id, users[4].id}
+
+
+def test_failed_fetches_are_not_stored(users, fetch):
+    """
+    Users whose fetch fails, including Amplitude error responses, are counted as failed and not stored.
+    """
+    def fetch_recommendations(user_id, recommendation_id):  # pylint: disable=unused-argument
+        if user_id == users[1].id:
+            raise AmplitudeResponseError(503)
+        return False, True, [f"edX+{user_id}"]
+
+    fetch.side_effect = fetch_recommendations
+    with mock.patch.object(command, "log") as log:
+        _materialize()
+
+    assert set(_stored()) == {user.id for user in users} - {users[1].id}
+    assert "4 stored, 0 skipped, 1 failed" in log.info.call_args.args[0]
@@ -2,6 +2,16 @@
 """
 Tests for the `edx-recommendations` models module.
 """
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.db.migrations.loader import MigrationLoader
+from django.utils import timezone
+
+from edx_recommendations.models import AmplitudeRecommendation
+
+User = get_user_model()
 
 
 def test_placeholder():
@@ -9,3 +19,69 @@ def test_placeholder():
     Placeholder to allow pytest to succeed before real tests are in place.
     (If there are no tests, it will exit with code 5.)
     """
+
+
+@pytest.mark.django_db
+def test_migrations_match_the_models():
+    """
+    The models have no changes missing from the migrations.
+    """
+    call_command("makemigrations", "edx_recommendations", check=True, dry_run=True)
+
+
+@pytest.mark.django_db
+def test_initial_migration_creates_the_table():
+    """
+    0001_initial creates the AmplitudeRecommendation table with its unique (user, recommendation_id) index.
+    """
+    loader = MigrationLoader(connection)
+    assert ("edx_recommendations", "0001_initial") in loader.applied_migrations
+
+    table = AmplitudeRecommendation._meta.db_table  # pylint: disable=protected-access
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    assert any(
+        constraint["unique"] and constraint["columns"] == ["user_id", "recommendation_id"]
+        for constraint in constraints.values()
+    )
+
+
+@pytest.mark.django_db
+def test_amplitude_recommendation_round_trip():
+    """
+    Stored rows return the (is_control, has_is_control, recommended_course_keys) tuple of Amplitude.
+    """
+    user = User.objects.create(username="learner")
+    AmplitudeRecommendation.objects.create(
+        user=user, recommendation_id="model", is_control=False, has_is_control=True,
+        items=["edX+A", "edX+B"], fetched_at=timezone.now(),
+    )
+
+    stored = AmplitudeRecommendation.objects.get(user_id=user.id)
+    assert stored.recommendations == (False, True, ["edX+A", "edX+B"])
+    assert str(stored) == f"AmplitudeRecommendation(user_id={user.id}, recommendation_id=model)"
+
+
+@pytest.mark.django_db
+def test_amplitude_recommendation_is_unique_per_user_and_model():
+    """
+    A user has one row per Amplitude model.
+    """
+    user = User.objects.create(username="learner")
+    AmplitudeRecommendation.objects.create(user=user, recommendation_id="model", fetched_at=timezone.now())
+    AmplitudeRecommendation.objects.create(user=user, recommendation_id="other", fetched_at=timezone.now())
+
+    with pytest.raises(IntegrityError):
+        AmplitudeRecommendation.objects.create(user=user, recommendation_id="model", fetched_at=timezone.now())
+
+
+@pytest.mark.django_db
+def test_amplitude_recommendations_are_deleted_with_the_user():
+    """
+    Rows are deleted along with their user.
+    """
+    user = User.objects.create(username="learner")
+    AmplitudeRecommendation.objects.create(user=user, recommendation_id="model", fetched_at=timezone.now())
+    user.delete()
+
+    assert not AmplitudeRecommendation.objects.exists()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` precompute module.
+"""
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory
+from edx_django_utils.cache import RequestCache
+from edx_django_utils.plugins.constants import PluginSignals
+from waffle.models import Flag
+
+from edx_recommendations.apps import EdxRecommendationsConfig
+from edx_recommendations.toggles import ENABLE_DASHBOARD_RECOMMENDATIONS
+
+signals = pytest.importorskip("edx_recommendations.signals")
+precompute = pytest.importorskip("edx_recommendations.api.precompute")
+result_cache = pytest.importorskip("edx_recommendations.api.result_cache")
+
+User = get_user_model()
+
+IP_ADDRESS = "203.0.113.7"
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def precompute_enabled(settings):
+    """
+    Enables precomputation and the dashboard recommendations flag.
+    """
+    settings.RECOMMENDATIONS_PRECOMPUTE_ENABLED = True
+    flag = Flag.objects.create(name=ENABLE_DASHBOARD_RECOMMENDATIONS.name, everyone=True)
+    RequestCache.clear_all_namespaces()
+    precompute._pending = 0  # pylint: disable=protected-access
+    yield flag
+    RequestCache.clear_all_namespaces()
+    precompute._pending = 0  # pylint: disable=protected-access
+
+
+@pytest.fixture
+def submit():
+    """
+    Holds scheduled jobs instead of running them, so they stay pending.
+    """
+    with mock.patch.object(precompute, "submit") as submit:
+        yield submit
+
+
+def _scheduled_jobs(submit):
+    return [call.args[1:] for call in submit.call_args_list]
+
+
+def test_schedules_a_job(submit):
+    """
+    A scheduled job computes the user's recommendations for the country of ip_address.
+    """
+    assert precompute.schedule_recommendations_precompute(1, IP_ADDRESS) is True
+
+    # pylint: disable=protected-access
+    assert _scheduled_jobs(submit) == [(precompute._precompute, 1, IP_ADDRESS, mock.ANY)]
+
+
+@pytest.mark.parametrize("setting, value", [
+    ("RECOMMENDATIONS_PRECOMPUTE_ENABLED", False),
+    ("RECOMMENDATIONS_RESULT_CACHE_TIMEOUT", 0),
+])
+def test_nothing_is_scheduled_when_results_would_not_be_read(settings, submit, setting, value):
+    """
+    Without precomputation enabled or a result cache to write to, nothing is scheduled.
+    """
+    setattr(settings, setting, value)
+
+    assert precompute.schedule_recommendations_precompute(1, IP_ADDRESS) is False
+    submit.assert_not_called()
+
+
+def test_nothing_is_scheduled_without_dashboard_recommendations(precompute_enabled, submit):
+    """
+    Users who are not shown dashboard recommendations get nothing precomputed.
+    """
+    precompute_enabled.everyone = False
+    precompute_enabled.save()
+
+    assert precompute.schedule_recommendations_precompute(1, IP_ADDRESS) is False
+    submit.assert_not_called()
+
+
+def test_nothing_is_scheduled_without_an_ip_address(submit):
+    """
+    Without the user's IP address there is no country to filter for.
+    """
+    assert precompute.schedule_recommendations_precompute(1, None) is False
+    submit.assert_not_called()
+
+
+def test_pending_jobs_are_deduplicated_per_user_and_enrollment_version(submit):
+    """
+    A job is skipped while another one is pending for the same user and enrollment version.
+    """
+    assert precompute.schedule_recommendations_precompute(1, IP_ADDRESS) is True
+    assert precompute.schedule_recommendations_precompute(1, IP_ADDRESS) is False
+    assert precompute.schedule_recommendations_precompute(2, IP_ADDRESS) is True
+
+    result_cache.bump_enrollment_version(1)
+    assert precompute.schedule_recommendations_precompute(1, IP_ADDRESS) is True
+    assert [job[1] for job in _scheduled_jobs(submit)] == [1, 2, 1]
+    assert precompute._pending == 3  # pylint: disable=protected-access
+
+
+def test_jobs_beyond_the_pending_limit_are_dropped(settings, submit):
+    """
+    At most RECOMMENDATIONS_PRECOMPUTE_MAX_PENDING jobs are pending; a finished job frees its slot.
+    """
+    settings.RECOMMENDATIONS_PRECOMPUTE_MAX_PENDING = 2
+
+    assert [precompute.schedule_recommendations_precompute(user_id, IP_ADDRESS) for user_id in (1, 2, 3)] == [
+        True, True, False
+    ]
+
+    with mock.patch.object(precompute.User.objects, "get", side_effect=User.DoesNotExist):
+        _, user_id, ip_address, dedupe_key = _scheduled_jobs(submit)[0]
+        precompute._precompute(user_id, ip_address, dedupe_key)  # pylint: disable=protected-access
+    assert precompute.schedule_recommendations_precompute(3, IP_ADDRESS) is True
+
+
+def test_failed_submit_frees_its_slot_and_dedupe_key(submit):
+    """
+    A job that cannot be submitted is not counted as pending, and the user can be scheduled again.
+    """
+    submit.side_effect = RuntimeError("cannot schedule new futures after shutdown")
+
+    assert precompute.schedule_recommendations_precompute(1, IP_ADDRESS) is False
+    assert precompute._pending == 0  # pylint: disable=protected-access
+
+    submit.side_effect = None
+    assert precompute.schedule_recommendations_precompute(1, IP_ADDRESS) is True
+
+
+def test_job_fills_both_dashboard_views(submit):
+    """
+    A job filters the Amplitude recommendations of the user through both dashboard views, then
+    releases its pending slot and its deduplication key.
+    """
+    user = User.objects.create(username="learner")
+    precompute.schedule_recommendations_precompute(user.id, IP_ADDRESS)
+    _, user_id, ip_address, dedupe_key = _scheduled_jobs(submit)[0]
+
+    product_filter = mock.patch.object(precompute.ProductRecommendationsView, "filter_recommendations")
+    dashboard_filter = mock.patch.object(precompute.LearnerDashboardRecommendationsView, "filter_recommendations")
+    with mock.patch.multiple(
+        precompute,
+        is_user_enrolled_in_ut_austin_masters_program=mock.Mock(return_value=False),
+        get_materialized_amplitude_course_recommendations=mock.Mock(return_value=(False, True, ["edX+A"])),
+        get_country_code=mock.Mock(return_value="US"),
+    ), product_filter as product, dashboard_filter as dashboard:
+        precompute._precompute(user_id, ip_address, dedupe_key)  # pylint: disable=protected-access
+
+    product.assert_called_once_with(user, ["edX+A"], "US")
+    dashboard.assert_called_once_with(user, ["edX+A"], "US")
+    assert precompute._pending == 0  # pylint: disable=protected-access
+    assert precompute.schedule_recommendations_precompute(user.id, IP_ADDRESS) is True
+
+
+def test_login_schedules_a_job():
+    """
+    Logging in schedules the user's recommendations for the IP address of the login request.
+    """
+    request = RequestFactory().post("/login", REMOTE_ADDR=IP_ADDRESS)
+    with mock.patch.object(signals, "schedule_recommendations_precompute") as schedule:
+        signals.precompute_recommendations_on_login(sender=None, request=request, user=mock.Mock(id=1))
+
+    schedule.assert_called_once_with(1, IP_ADDRESS)
+
+
+def test_committed_enrollment_change_schedules_a_job(django_capture_on_commit_callbacks):
+    """
+    An enrollment change starts a new enrollment version and schedules a job, once it is committed.
+    """
+    with mock.patch.object(signals, "schedule_recommendations_precompute") as schedule:
+        with mock.patch.object(signals, "bump_enrollment_version") as bump:
+            with django_capture_on_commit_callbacks() as callbacks:
+                signals.refresh_recommendations_on_enrollment_change(sender=None, instance=mock.Mock(user_id=1))
+            schedule.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+
+    bump.assert_called_once_with(1)
+    schedule.assert_called_once_with(1, None)
+
+
+def test_receivers_are_wired_to_login_and_enrollment_changes():
+    """
+    The plugin signals config connects the precompute receivers to logins and CourseEnrollment changes.
+    """
+    receivers = EdxRecommendationsConfig.plugin_app[PluginSignals.CONFIG]["lms.djangoapp"][PluginSignals.RECEIVERS]
+    wired = {
+        (receiver[PluginSignals.RECEIVER_FUNC_NAME], receiver[PluginSignals.SIGNAL_PATH],
+         receiver.get(PluginSignals.SENDER_PATH))
+        for receiver in receivers
+    }
+
+    assert {
+        ("precompute_recommendations_on_login", "django.contrib.auth.signals.user_logged_in", None),
+        (
+            "refresh_recommendations_on_enrollment_change",
+            "django.db.models.signals.post_save",
+            "common.djangoapps.student.models.CourseEnrollment",
+        ),
+        (
+            "refresh_recommendations_on_enrollment_change",
+            "django.db.models.signals.post_delete",
+            "common.djangoapps.student.models.CourseEnrollment",
+        ),
+    } <= wired
+    assert all(hasattr(signals, receiver_name) for receiver_name, _, _ in wired)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` result_cache module.
+"""
+from unittest import mock
+
+import pytest
+from django.utils.functional import SimpleLazyObject
+
+from edx_recommendations.api.deadline import Deadline
+
+result_cache = pytest.importorskip("edx_recommendations.api.result_cache")
+utils = pytest.importorskip("edx_recommendations.api.utils")
+
+COURSE_KEYS = ["edX+A", "edX+B", "edX+C"]
+RESTRICTED_COURSE_KEYS = ["edX+A", "edX+Blocked"]
+RESTRICTIONS = {"edX+Blocked": {"restriction_type": "blocklist", "countries": ["PK"]}}
+
+
+@pytest.fixture
+def enrollments():
+    """
+    Serves COURSE_KEYS from a patched catalog, with the returned list as the user's course enrollments.
+    """
+    enrollments = []
+    with mock.patch.object(utils.CourseEnrollment, "enrollments_for_user", return_value=enrollments, create=True):
+        with mock.patch.object(
+            utils,
+            "get_courses_data",
+            side_effect=lambda course_keys, *args, **kwargs: [
+                {
+                    "key": course_key,
+                    "course_runs": [{"key": f"course-v1:{course_key}+T1"}],
+                    "location_restriction": RESTRICTIONS.get(course_key),
+                }
+                for course_key in course_keys
+            ],
+        ) as get_courses_data:
+            yield enrollments, get_courses_data
+
+
+def _filtered_keys(user, **kwargs):
+    courses = result_cache.get_filtered_recommendations("dashboard", user, "model", COURSE_KEYS, "US", **kwargs)
+    return [course["key"] for course in courses]
+
+
+def test_results_are_cached_per_user(enrollments):
+    """
+    A user's filtered recommendations are computed once, other users get their own.
+    """
+    _, get_courses_data = enrollments
+
+    assert _filtered_keys(mock.Mock(id=1)) == COURSE_KEYS
+    assert _filtered_keys(mock.Mock(id=1)) == COURSE_KEYS
+    assert get_courses_data.call_count == 1
+
+    _filtered_keys(mock.Mock(id=2))
+    assert get_courses_data.call_count == 2
+
+
+def test_results_cut_short_by_the_budget_are_not_cached(enrollments):
+    """
+    Results of a request that ran out of latency budget are served but not cached.
+    """
+    _, get_courses_data = enrollments
+
+    assert not _filtered_keys(mock.Mock(id=1), deadline=Deadline(0))
+    assert _filtered_keys(mock.Mock(id=1)) == COURSE_KEYS
+    assert get_courses_data.call_count == 1
+
+
+@pytest.mark.django_db
+def test_committed_enrollment_retires_cached_results(enrollments, django_capture_on_commit_callbacks):
+    """
+    A course the user enrolls in stops being recommended once the enrollment is committed.
+    """
+    pytest.importorskip("edx_rest_framework_extensions")
+    pytest.importorskip("opaque_keys")
+    from edx_recommendations import signals  # pylint: disable=import-outside-toplevel
+
+    user = mock.Mock(id=1)
+    assert _filtered_keys(user) == COURSE_KEYS
+
+    course_enrollments, _ = enrollments
+    enrollment = mock.Mock(user_id=user.id, course_id="course-v1:edX+B+T1")
+    course_enrollments.append(enrollment)
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        signals.refresh_recommendations_on_enrollment_change(sender=None, instance=enrollment)
+        # Until the enrollment is committed, results computed from the old enrollments stay current.
+        assert _filtered_keys(user) == COURSE_KEYS
+
+    assert len(callbacks) == 1
+    assert _filtered_keys(user) == ["edX+A", "edX+C"]
+
+
+def _lazy_country_code(country_code, lookups):
+    def lookup():
+        lookups.append(country_code)
+        return country_code
+
+    return SimpleLazyObject(lookup)
+
+
+def test_unrestricted_results_never_look_the_country_up(enrollments):
+    """
+    Results without restricted candidates are shared by every country, and their cache hits leave
+    a lazily looked up country alone.
+    """
+    _, get_courses_data = enrollments
+    lookups = []
+    user = mock.Mock(id=1)
+
+    for country_code in ("US", "PK"):
+        courses = result_cache.get_filtered_recommendations(
+            "dashboard", user, "model", COURSE_KEYS, _lazy_country_code(country_code, lookups)
+        )
+        assert [course["key"] for course in courses] == COURSE_KEYS
+
+    assert not lookups
+    assert get_courses_data.call_count == 1
+
+
+def test_restricted_results_are_cached_per_country(enrollments):
+    """
+    Results that read the country are cached for that country only.
+    """
+    _, get_courses_data = enrollments
+    user = mock.Mock(id=1)
+
+    def filtered_keys(country_code):
+        courses = result_cache.get_filtered_recommendations(
+            "dashboard", user, "model", RESTRICTED_COURSE_KEYS, country_code
+        )
+        return [course["key"] for course in courses]
+
+    assert filtered_keys("PK") == ["edX+A"]
+    assert filtered_keys("US") == RESTRICTED_COURSE_KEYS
+    assert filtered_keys("PK") == ["edX+A"]
+    assert filtered_keys("US") == RESTRICTED_COURSE_KEYS
+    assert get_courses_data.call_count == 2
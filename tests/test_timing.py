@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` timing module.
+"""
+from unittest import mock
+
+import pytest
+from django.http import HttpResponse
+
+from edx_recommendations.api import timing
+from edx_recommendations.api.concurrency import get_executor, submit
+
+
+class _View:
+    """
+    Stand-in for an APIView whose handler records stages and counters.
+    """
+
+    @timing.timed_view
+    def get(self, request):  # pylint: disable=unused-argument
+        with timing.timed("catalog"):
+            pass
+        with timing.timed("catalog"):
+            pass
+        timing.increment("candidates_examined", 3)
+        timing.increment("rejected_enrolled")
+        timing.increment("rejected_enrolled", 0)
+        submit(get_executor("test_timing", 1), timing.increment, "catalog_lookups", 2).result()
+        return HttpResponse()
+
+
+@pytest.fixture
+def custom_attributes():
+    with mock.patch.object(timing, "set_custom_attribute") as set_custom_attribute:
+        yield set_custom_attribute
+
+
+def _reported(set_custom_attribute):
+    return {call.args[0]: call.args[1] for call in set_custom_attribute.call_args_list}
+
+
+def test_timed_view_reports_stages_and_counters(settings, custom_attributes):
+    """
+    Stages and counters recorded by the handler, including in pool threads, are reported once.
+    """
+    settings.RECOMMENDATIONS_SERVER_TIMING_HEADER = False
+
+    response = _View().get(None)
+
+    reported = _reported(custom_attributes)
+    assert set(reported) == {
+        "recommendations_total_ms",
+        "recommendations_catalog_ms",
+        "recommendations_candidates_examined",
+        "recommendations_rejected_enrolled",
+        "recommendations_catalog_lookups",
+    }
+    assert reported["recommendations_candidates_examined"] == 3
+    assert reported["recommendations_rejected_enrolled"] == 1
+    assert reported["recommendations_catalog_lookups"] == 2
+    assert reported["recommendations_catalog_ms"] <= reported["recommendations_total_ms"]
+    assert not response.has_header("Server-Timing")
+
+
+def test_timed_view_server_timing_header(settings, custom_attributes):  # pylint: disable=unused-argument
+    """
+    The Server-Timing header lists every stage when enabled.
+    """
+    settings.RECOMMENDATIONS_SERVER_TIMING_HEADER = True
+
+    response = _View().get(None)
+
+    stages = [entry.split(";dur=") for entry in response["Server-Timing"].split(", ")]
+    assert [stage for stage, _ in stages] == ["catalog", "total"]
+    assert all(float(duration) >= 0 for _, duration in stages)
+
+
+def test_timing_outside_a_view_is_a_no_op(custom_attributes):
+    """
+    Instrumented code called outside a timed view records and reports nothing.
+    """
+    with timing.timed("catalog"):
+        timing.increment("candidates_examined")
+
+    assert timing._request_timing.get() is None  # pylint: disable=protected-access
+    custom_attributes.assert_not_called()
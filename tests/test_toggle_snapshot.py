@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` toggle_snapshot module.
+"""
+from unittest import mock
+
+import crum
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory
+from edx_django_utils.cache import RequestCache
+from edx_toggles.toggles.testutils import override_waffle_flag
+from waffle.models import Flag
+
+from edx_recommendations import toggle_snapshot, toggles
+
+FLAG_NAMES = ("edx_recommendations.enabled", "edx_recommendations.disabled", "edx_recommendations.missing")
+
+
+@pytest.fixture(autouse=True)
+def request_context(settings):
+    settings.RECOMMENDATIONS_TOGGLE_SNAPSHOT_TIMEOUT = 0
+    request = RequestFactory().get("/")
+    request.user = AnonymousUser()
+    crum.set_current_request(request)
+    yield request
+    crum.set_current_request(None)
+    RequestCache.clear_all_namespaces()
+    toggle_snapshot.clear_local_flags()
+    cache.clear()
+
+
+@pytest.fixture
+def flags(db):  # pylint: disable=unused-argument
+    Flag.objects.create(name="edx_recommendations.enabled", everyone=True)
+    Flag.objects.create(name="edx_recommendations.disabled", everyone=False)
+    cache.clear()
+
+
+def _new_request():
+    RequestCache.clear_all_namespaces()
+
+
+def test_snapshot_evaluates_flags(flags):  # pylint: disable=unused-argument
+    """
+    Flags are evaluated like waffle evaluates them, and flags missing from the database are disabled.
+    """
+    snapshot = toggle_snapshot.get_toggle_snapshot(FLAG_NAMES)
+
+    assert snapshot.is_enabled("edx_recommendations.enabled") is True
+    assert snapshot.is_enabled("edx_recommendations.disabled") is False
+    assert snapshot.is_enabled("edx_recommendations.missing") is False
+
+
+def test_snapshot_fetches_flags_once_per_request(flags, django_assert_num_queries):  # pylint: disable=unused-argument
+    """
+    A request fetches every flag with one query on a cold cache, then from the cache with no query.
+    """
+    with django_assert_num_queries(1):
+        toggle_snapshot.get_toggle_snapshot(FLAG_NAMES).is_enabled("edx_recommendations.enabled")
+        assert toggle_snapshot.get_toggle_snapshot(FLAG_NAMES).is_enabled("edx_recommendations.disabled") is False
+
+    _new_request()
+    with mock.patch.object(toggle_snapshot, "increment") as increment:
+        with django_assert_num_queries(0):
+            snapshot = toggle_snapshot.get_toggle_snapshot(FLAG_NAMES)
+            assert snapshot.is_enabled("edx_recommendations.enabled") is True
+            assert snapshot.is_enabled("edx_recommendations.missing") is False
+    increment.assert_called_once_with("toggle_cache_round_trips")
+
+
+def test_snapshot_reuses_flags_within_the_local_timeout(settings, flags):  # pylint: disable=unused-argument
+    """
+    With a process-local timeout, later requests make no cache round trip until it runs out.
+    """
+    settings.RECOMMENDATIONS_TOGGLE_SNAPSHOT_TIMEOUT = 60
+    toggle_snapshot.get_toggle_snapshot(FLAG_NAMES)
+
+    _new_request()
+    with mock.patch.object(toggle_snapshot, "increment") as increment:
+        with mock.patch.object(toggle_snapshot.time, "monotonic", return_value=toggle_snapshot.time.monotonic()):
+            assert toggle_snapshot.get_toggle_snapshot(FLAG_NAMES).is_enabled("edx_recommendations.enabled") is True
+        increment.assert_not_called()
+
+        _new_request()
+        with mock.patch.object(toggle_snapshot.time, "monotonic", return_value=toggle_snapshot.time.monotonic() + 61):
+            toggle_snapshot.get_toggle_snapshot(FLAG_NAMES)
+        increment.assert_called_once_with("toggle_cache_round_trips")
+
+
+@pytest.mark.django_db
+def test_is_enabled_honors_waffle_flag_overrides():
+    """
+    override_waffle_flag values in the flag's request cache win over the snapshot, like they do for WaffleFlag.
+    """
+    flag = toggles.ENABLE_DASHBOARD_RECOMMENDATIONS
+    Flag.objects.create(name=toggles.FALLBACK_RECOMMENDATIONS.name, everyone=True)
+
+    with override_waffle_flag(flag, active=True):
+        assert toggles.is_enabled(flag) is True
+    with override_waffle_flag(toggles.FALLBACK_RECOMMENDATIONS, active=False):
+        assert toggles.is_enabled(toggles.FALLBACK_RECOMMENDATIONS) is False
+    assert toggles.is_enabled(flag) is False
+    assert toggles.is_enabled(toggles.FALLBACK_RECOMMENDATIONS) is True
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Tests for the `edx-recommendations` UT Austin masters program check.
+"""
+from unittest import mock
+
+import pytest
+from edx_django_utils.plugins.constants import PluginSignals
+
+from edx_recommendations.apps import EdxRecommendationsConfig
+
+utils = pytest.importorskip("edx_recommendations.api.utils")
+
+UT_AUSTIN_MASTERS = {"type": "Masters", "authoring_organizations": [{"key": "UTAustinX"}]}
+OTHER_MASTERS = {"type": "Masters", "authoring_organizations": [{"key": "edX"}]}
+
+
+@pytest.fixture
+def program_enrollments():
+    """
+    Patches the program lookups, with every user enrolled in one UT Austin masters program by default.
+    """
+    with mock.patch.object(
+        utils, "fetch_program_enrollments_by_student", return_value=[mock.Mock(program_uuid="uuid")]
+    ) as fetch_program_enrollments_by_student:
+        with mock.patch.object(utils, "get_programs", return_value=[UT_AUSTIN_MASTERS]) as get_programs:
+            yield fetch_program_enrollments_by_student, get_programs
+
+
+def _user(user_id):
+    return mock.Mock(id=user_id)
+
+
+@pytest.mark.parametrize("programs, is_enrolled", [
+    ([UT_AUSTIN_MASTERS], True),
+    ([OTHER_MASTERS, {"type": "MicroMasters", "authoring_organizations": [{"key": "UTAustinX"}]}], False),
+    (None, False),
+])
+def test_only_ut_austin_masters_programs_count(program_enrollments, programs, is_enrolled):
+    """
+    Only masters programs authored by UTAustinX count.
+    """
+    program_enrollments[1].return_value = programs
+
+    assert utils.is_user_enrolled_in_ut_austin_masters_program(_user(1)) is is_enrolled
+
+
+def test_check_is_cached_per_user(program_enrollments):
+    """
+    Each user's answer is looked up once and then served from the cache.
+    """
+    fetch_program_enrollments_by_student, get_programs = program_enrollments
+
+    assert utils.is_user_enrolled_in_ut_austin_masters_program(_user(1)) is True
+    assert utils.is_user_enrolled_in_ut_austin_masters_program(_user(1)) is True
+    get_programs.return_value = [OTHER_MASTERS]
+    assert utils.is_user_enrolled_in_ut_austin_masters_program(_user(2)) is False
+
+    assert fetch_program_enrollments_by_student.call_count == 2
+    assert get_programs.call_count == 2
+
+
+def test_check_is_not_cached_without_a_timeout(settings, program_enrollments):
+    """
+    With RECOMMENDATIONS_UT_AUSTIN_CACHE_TIMEOUT at 0 every check looks the programs up.
+    """
+    settings.RECOMMENDATIONS_UT_AUSTIN_CACHE_TIMEOUT = 0
+
+    utils.is_user_enrolled_in_ut_austin_masters_program(_user(1))
+    utils.is_user_enrolled_in_ut_austin_masters_program(_user(1))
+
+    assert program_enrollments[0].call_count == 2
+
+
+def test_users_without_program_enrollments_skip_the_programs_lookup(program_enrollments):
+    """
+    get_programs returns every program when given no uuids, so it is not called for users without
+    active program enrollments; their answer is cached like any other.
+    """
+    fetch_program_enrollments_by_student, get_programs = program_enrollments
+    fetch_program_enrollments_by_student.return_value = []
+
+    assert utils.is_user_enrolled_in_ut_austin_masters_program(_user(1)) is False
+    assert utils.is_user_enrolled_in_ut_austin_masters_program(_user(1)) is False
+
+    get_programs.assert_not_called()
+    assert fetch_program_enrollments_by_student.call_count == 1
+
+
+def test_program_enrollment_changes_invalidate_the_check(program_enrollments):
+    """
+    Saving or deleting a ProgramEnrollment forgets the cached answer of its user only.
+    """
+    pytest.importorskip("edx_rest_framework_extensions")
+    pytest.importorskip("opaque_keys")
+    from edx_recommendations import signals  # pylint: disable=import-outside-toplevel
+
+    fetch_program_enrollments_by_student, _ = program_enrollments
+    utils.is_user_enrolled_in_ut_austin_masters_program(_user(1))
+    utils.is_user_enrolled_in_ut_austin_masters_program(_user(2))
+
+    signals.invalidate_ut_austin_masters_program_cache_on_change(sender=None, instance=mock.Mock(user_id=1))
+    signals.invalidate_ut_austin_masters_program_cache_on_change(sender=None, instance=mock.Mock(user_id=None))
+    utils.is_user_enrolled_in_ut_austin_masters_program(_user(1))
+    utils.is_user_enrolled_in_ut_austin_masters_program(_user(2))
+
+    assert [call.kwargs["user"].id for call in fetch_program_enrollments_by_student.call_args_list] == [1, 2, 1]
+
+
+def test_invalidation_is_wired_to_program_enrollment_changes():
+    """
+    The plugin signals config connects the invalidation to ProgramEnrollment saves and deletes.
+    """
+    receivers = EdxRecommendationsConfig.plugin_app[PluginSignals.CONFIG]["lms.djangoapp"][PluginSignals.RECEIVERS]
+    wired = {
+        (receiver[PluginSignals.SIGNAL_PATH], receiver.get(PluginSignals.SENDER_PATH))
+        for receiver in receivers
+        if receiver[PluginSignals.RECEIVER_FUNC_NAME] == "invalidate_ut_austin_masters_program_cache_on_change"
+    }
+
+    assert wired == {
+        ("django.db.models.signals.post_save", "lms.djangoapps.program_enrollments.models.ProgramEnrollment"),
+        ("django.db.models.signals.post_delete", "lms.djangoapps.program_enrollments.models.ProgramEnrollment"),
+    }